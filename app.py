@@ -1,11 +1,24 @@
 import streamlit as st
 import pandas as pd
-import hashlib
-import time
-import random
+import os
+import uuid
 from datetime import datetime
 from streamlit_option_menu import option_menu 
 
+from eco_core import metrics
+from eco_core.balances import FACTOR_CO2_BOTELLA, movement_from_tx
+from eco_core.dedupe import DedupeIndex
+from eco_core.geo import PUNTOS_GUAYAQUIL, GridIndex, bbox_for_view, load_points_csv
+from eco_core.ingest import CONFIRMADO, RECHAZADO, IngestionService, SimulatedSensorFeed, reading_to_tx
+from eco_core.leaderboard import calcular_nivel
+from eco_core.ledger import EcoBlockchain
+from eco_core.redemption import AGOTADO, CANJEADO, CATALOGO, CONFLICTO, RedemptionEngine
+from eco_core.store import LedgerStore
+from eco_core.telemetry import COLOR_ESTADO, DISPONIBLE, LLENO, SimulatedFillFeed, TelemetryStore
+
+# Métricas opcionales (ECOG_METRICS_FILE / ECOG_METRICS_PORT)
+inicio_recarga = metrics.clock()
+
 # ==========================================
 # 1. CONFIGURACIÓN DE LA PÁGINA
 # ==========================================
@@ -17,7 +30,8 @@ st.set_page_config(
 )
 
 # Estilos CSS (VISUALES)
-st.markdown("""
+with metrics.timer("ecog_section_seconds", app="app", section="css"):
+    st.markdown("""
     <style>
     /* Ocultar elementos de Streamlit */
     #MainMenu {visibility: hidden;}
@@ -82,31 +96,77 @@ st.markdown("""
 # 2. BACKEND (Lógica y Blockchain)
 # ==========================================
 
-class EcoBlock:
-    def __init__(self, index, transaction, amount, prev_hash):
-        self.index = index
-        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.transaction = transaction
-        self.amount = amount 
-        self.prev_hash = prev_hash
-        self.hash = self.calculate_hash()
+USUARIO = "Francisco"
+
+def ahora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def registrar_bloque(ledger, tx):
+    # Un bloque por transacción; el índice y el enlace se asignan bajo el
+    # candado de escritura del ledger
+    return ledger.add_transaction_block(tx, ahora())
+
+def confirmar_lecturas(ledger, lecturas):
+    return [registrar_bloque(ledger, reading_to_tx(lectura)) for lectura in lecturas]
+
+# Un solo ledger (y una sola ingesta IoT) por proceso, compartido por todas
+# las sesiones. Con ECOG_LEDGER_DIR definido, la cadena persiste en disco.
+@st.cache_resource
+def obtener_ledger():
+    ruta_ledger = os.environ.get("ECOG_LEDGER_DIR")
+    store = LedgerStore(os.path.join(ruta_ledger, "app")) if ruta_ledger else None
+    return EcoBlockchain(store, genesis_data={"usuario": USUARIO, "accion": "Saldo Inicial", "tokens": 12.50})
 
-    def calculate_hash(self):
-        block_string = f"{self.index}{self.timestamp}{self.transaction}{self.amount}{self.prev_hash}"
-        return hashlib.sha256(block_string.encode()).hexdigest()
+@st.cache_resource
+def obtener_ingesta(_ledger):
+    # Servicio de ingesta IoT: confirma las lecturas en segundo plano
+    # Las lecturas repetidas de un contenedor que reintenta se rechazan al llegar
+    return IngestionService(lambda lecturas: confirmar_lecturas(_ledger, lecturas), dedupe=DedupeIndex()).start()
 
-if 'chain' not in st.session_state:
-    genesis = EcoBlock(0, "Saldo Inicial", 12.50, "0")
-    st.session_state.chain = [genesis]
+@st.cache_resource
+def obtener_puntos():
+    # Índice espacial de contenedores; ECOG_PUNTOS_CSV permite cargar la red completa
+    ruta_puntos = os.environ.get("ECOG_PUNTOS_CSV")
+    return GridIndex(load_points_csv(ruta_puntos) if ruta_puntos else PUNTOS_GUAYAQUIL)
+
+@st.cache_resource
+def obtener_telemetria(_puntos):
+    # Nivel de llenado de los contenedores; uno lleno deja de ofrecerse como disponible
+    def actualizar_punto(contenedor, estado):
+        if _puntos.get(contenedor) is not None:
+            _puntos.set_available(contenedor, estado != LLENO)
+    return TelemetryStore(on_change=actualizar_punto)
+
+@st.cache_resource
+def obtener_llenado(_puntos, _telemetria):
+    # Sin contenedores reales conectados, su llenado se simula en segundo plano
+    return SimulatedFillFeed([p.id for p in _puntos]).start(_telemetria)
+
+@st.cache_resource
+def obtener_canjes(_ledger):
+    # Cada canje es un bloque propio, registrado bajo el mismo candado que valida el saldo
+    return RedemptionEngine(_ledger, [p for p in CATALOGO if p.id in ("metrovia", "cafe")],
+                            submit=lambda tx: registrar_bloque(_ledger, tx))
+
+ledger = obtener_ledger()
+canjes = obtener_canjes(ledger)
+puntos = obtener_puntos()
+telemetria = obtener_telemetria(puntos)
+obtener_llenado(puntos, telemetria)
+ingesta = obtener_ingesta(ledger)
+# Vista de la cadena a altura fija para esta recarga (lectura sin candado)
+vista = ledger.snapshot()
 
 if 'user' not in st.session_state:
     st.session_state.user = {
-        'name': 'Francisco',
-        'tokens': 12.50,
-        'botellas': 120,
-        'nivel': 'Explorador'
+        'name': USUARIO,
+        'botellas': 120,  # historial previo a la cadena
     }
 
+if 'tickets' not in st.session_state:
+    st.session_state.sensores = SimulatedSensorFeed(["Sensor_ITSO_01"])
+    st.session_state.tickets = []
+
 # ==========================================
 # 3. BARRA DE NAVEGACIÓN
 # ==========================================
@@ -128,24 +188,32 @@ selected = option_menu(
 # 4. PANTALLAS
 # ==========================================
 
+inicio_pagina = metrics.clock()
 # --- INICIO (CORREGIDO) ---
 if selected == "Inicio":
     # Encabezado oscuro para que se lea bien sobre fondo claro
     st.markdown(f"<h3 style='color:#37474F;'>Hola, {st.session_state.user['name']} 👋</h3>", unsafe_allow_html=True)
     
+    stats = vista.totals(USUARIO)
+    botellas = st.session_state.user['botellas'] + stats.botellas
+    co2 = st.session_state.user['botellas'] * FACTOR_CO2_BOTELLA + stats.co2
+    nivel, meta = calcular_nivel(botellas)
+
     # Tarjeta de Saldo Principal (Fondo Verde, Texto Blanco)
     st.markdown(f"""
     <div style="background: linear-gradient(135deg, #2E7D32 0%, #1B5E20 100%); padding: 25px; border-radius: 20px; color: white; margin-bottom: 20px; text-align: center; box-shadow: 0 10px 20px rgba(46, 125, 50, 0.3);">
         <small style="opacity: 0.9; color: #E8F5E9;">Saldo Disponible</small>
-        <h1 style="margin: 5px 0; font-size: 42px; color: white;">{st.session_state.user['tokens']:.2f} ECOG</h1>
+        <h1 style="margin: 5px 0; font-size: 42px; color: white;">{vista.balance(USUARIO):.2f} ECOG</h1>
         <div style="background: rgba(255,255,255,0.2); display: inline-block; padding: 5px 15px; border-radius: 15px; margin-top: 10px;">
-            <small style="color: white; font-weight: bold;">Nivel: {st.session_state.user['nivel']}</small>
+            <small style="color: white; font-weight: bold;">Nivel: {nivel}</small>
         </div>
     </div>
     """, unsafe_allow_html=True)
 
-    botellas = st.session_state.user['botellas']
-    st.progress(min(botellas/200, 1.0), text=f"Meta Nivel: {botellas}/200 Botellas")
+    st.progress(min(botellas/meta, 1.0), text=f"Meta Nivel: {botellas}/{meta} Botellas")
+    puesto = ledger.leaderboard.rank(USUARIO)
+    if puesto:
+        st.caption(f"🏆 Puesto {puesto[0]} de {puesto[1]} recicladores en Guayaquil")
     
     # Tarjetas de Métricas (Fondo Blanco, Texto Oscuro)
     c1, c2 = st.columns(2)
@@ -159,7 +227,7 @@ if selected == "Inicio":
     with c2:
         st.markdown(f"""
         <div class='metric-card'>
-            <h3>🌳 {botellas*0.03:.1f}kg</h3>
+            <h3>🌳 {co2:.1f}kg</h3>
             <small>CO2 Ahorrado</small>
         </div>
         """, unsafe_allow_html=True)
@@ -174,105 +242,107 @@ elif selected == "Escanear":
         st.image("https://cdn-icons-png.flaticon.com/512/3415/3415054.png", width=150)
     
     if st.button("SIMULAR DEPÓSITO"):
-        with st.spinner("Leyendo sensores de peso..."):
-            time.sleep(1.5)
-            cant = random.randint(3, 12)
-            puntos = cant * 0.5
-            
-            st.session_state.user['botellas'] += cant
-            st.session_state.user['tokens'] += puntos
-            
-            prev = st.session_state.chain[-1]
-            block = EcoBlock(len(st.session_state.chain), f"Reciclaje: {cant} PET", puntos, prev.hash)
-            st.session_state.chain.append(block)
-            
-            st.balloons()
-            st.success(f"¡Procesado! +{cant} Botellas (+{puntos} ECOG)")
+        lectura = st.session_state.sensores.read(USUARIO)
+        st.session_state.tickets.append(ingesta.submit(lectura))
+
+    # Estado de los depósitos enviados (se consulta sin bloquear la página)
+    if st.session_state.tickets:
+        ticket = ingesta.status(st.session_state.tickets[-1])
+        if ticket is not None and ticket.status == CONFIRMADO:
+            tx = reading_to_tx(ticket.reading)
+            st.success(f"¡Procesado! +{tx['cantidad']} Botellas (+{tx['tokens']} ECOG)")
+        elif ticket is not None and ticket.status == RECHAZADO:
+            st.error(f"Depósito rechazado: {ticket.error}")
+        elif ticket is not None:
+            st.info("Leyendo sensores de peso...")
+            st.button("🔄 Actualizar")
 
 # --- MAPA ---
 elif selected == "Mapa":
     st.subheader("📍 Puntos Cercanos")
+    # Ubicación del usuario (ITSO por defecto); solo se dibuja lo visible
+    ubicacion = (-2.1980, -79.8950)
+    zoom = 12
+    visibles = puntos.in_bbox(*bbox_for_view(*ubicacion, zoom))
     map_data = pd.DataFrame({
-        'lat': [-2.1894, -2.1450, -2.1500, -2.1980],
-        'lon': [-79.8891, -79.9000, -79.8900, -79.8950],
-        'color': ['#2E7D32', '#2E7D32', '#FF0000', '#2E7D32']
+        'lat': [p.lat for p in visibles],
+        'lon': [p.lon for p in visibles],
+        'color': [telemetria.color(p.id, default=COLOR_ESTADO[DISPONIBLE if p.disponible else LLENO]) for p in visibles]
     })
-    st.map(map_data, zoom=12, color='color')
+    st.map(map_data, zoom=zoom, color='color')
     
     # Leyenda manual
     st.markdown("""
     <div style="display:flex; justify-content:center; gap:20px; margin-top:10px;">
         <span style="color:#2E7D32;">● Disponible</span>
+        <span style="color:#F9A825;">● Casi lleno</span>
         <span style="color:#FF0000;">● Lleno</span>
+        <span style="color:#9E9E9E;">● Sin señal</span>
     </div>
     """, unsafe_allow_html=True)
 
+    for distancia, punto in puntos.nearest(*ubicacion, k=3):
+        st.markdown(f"**{punto.nombre}** · {distancia / 1000:.1f} km")
+
 # --- CANJEAR ---
 elif selected == "Canjear":
     st.subheader("🛒 Marketplace")
     
     col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        <div class='metric-card'>
-            <h1>🚌</h1>
-            <h4>Metrovía</h4>
-            <p style='color:#2E7D32; font-weight:bold;'>3.00 ECOG</p>
-        </div>
-        """, unsafe_allow_html=True)
-        if st.button("Canjear Pasaje"):
-            if st.session_state.user['tokens'] >= 3:
-                st.session_state.user['tokens'] -= 3
-                prev = st.session_state.chain[-1]
-                st.session_state.chain.append(EcoBlock(len(st.session_state.chain), "Canje: Metro", -3.00, prev.hash))
-                st.success("¡QR Generado!")
-            else:
-                st.error("Saldo insuficiente")
-                
-    with col2:
-        st.markdown("""
-        <div class='metric-card'>
-            <h1>☕</h1>
-            <h4>Café</h4>
-            <p style='color:#2E7D32; font-weight:bold;'>8.00 ECOG</p>
-        </div>
-        """, unsafe_allow_html=True)
-        if st.button("Canjear Café"):
-            if st.session_state.user['tokens'] >= 8:
-                st.session_state.user['tokens'] -= 8
-                prev = st.session_state.chain[-1]
-                st.session_state.chain.append(EcoBlock(len(st.session_state.chain), "Canje: Café", -8.00, prev.hash))
-                st.success("¡Disfruta!")
-            else:
-                st.error("Saldo insuficiente")
+    mensajes = {"metrovia": "¡QR Generado!", "cafe": "¡Disfruta!"}
+    version_vista = st.session_state.get("version_canjes", canjes.version(USUARIO))
+    claves = st.session_state.setdefault("claves_canje", {})
+
+    for col, premio in zip((col1, col2), canjes.catalog.values()):
+        with col:
+            st.markdown(f"""
+            <div class='metric-card'>
+                <h1>{premio.icon}</h1>
+                <h4>{premio.nombre}</h4>
+                <p style='color:#2E7D32; font-weight:bold;'>{premio.costo:.2f} ECOG</p>
+            </div>
+            """, unsafe_allow_html=True)
+            # Clave de idempotencia por intento; saldo, stock y débito se
+            # resuelven juntos en el motor de canjes
+            clave = claves.setdefault(premio.id, uuid.uuid4().hex)
+            if st.button(f"Canjear {premio.nombre}"):
+                resultado = canjes.redeem(USUARIO, premio.id, clave, version_vista)
+                if resultado.estado == CANJEADO:
+                    del claves[premio.id]
+                    st.success(mensajes[premio.id])
+                elif resultado.estado == CONFLICTO:
+                    st.warning("Tu saldo cambió, intenta de nuevo")
+                elif resultado.estado == AGOTADO:
+                    st.error("Agotado")
+                else:
+                    st.error("Saldo insuficiente")
+
+    st.session_state.version_canjes = canjes.version(USUARIO)
 
 # --- WALLET ---
 elif selected == "Wallet":
     st.subheader("🔗 Billetera Blockchain")
     
     st.markdown("##### 📈 Evolución de Saldo")
-    chart_data = []
-    saldo_acumulado = 0
-    for block in st.session_state.chain:
-        saldo_acumulado += block.amount if block.index > 0 else 12.50
-        chart_data.append({"Bloque": block.index, "Saldo": saldo_acumulado})
-    
-    st.line_chart(pd.DataFrame(chart_data).set_index("Bloque"))
+    alturas, saldos = vista.series(USUARIO)
+    st.line_chart(pd.DataFrame({"Bloque": alturas, "Saldo": saldos}).set_index("Bloque"))
 
     st.markdown("##### 📜 Ledger de Transacciones")
-    if len(st.session_state.chain) > 0:
-        chain_data = []
-        for block in reversed(st.session_state.chain):
-            chain_data.append({
+    if len(vista) > 0:
+        # Página visible del ledger (más recientes primero), solo esas filas
+        pagina = vista.page(
+            st.session_state.get("pagina_wallet", 1) - 1,
+            20,
+            lambda block: {
                 "ID": block.index,
                 "Fecha": block.timestamp,
-                "Detalle": block.transaction,
-                "Monto": f"{block.amount:+.2f}",
+                "Detalle": block.data["accion"],
+                "Monto": f"{movement_from_tx(block.data).tokens:+.2f}",
                 "Hash": block.hash
-            })
+            },
+        )
         
-        df = pd.DataFrame(chain_data)
+        df = pd.DataFrame(pagina.columns)
         st.dataframe(
             df,
             use_container_width=True,
@@ -282,3 +352,9 @@ elif selected == "Wallet":
                 "Monto": st.column_config.TextColumn("Tokens", width="small"),
             }
         )
+        st.session_state.pagina_wallet = pagina.page + 1  # ajustada si cambió el filtro
+        st.number_input(f"Página (de {pagina.pages})", min_value=1, max_value=pagina.pages, key="pagina_wallet")
+
+metrics.observe_since("ecog_page_seconds", inicio_pagina, app="app", page=selected)
+metrics.observe_since("ecog_rerun_seconds", inicio_recarga, app="app", page=selected)
+metrics.export()
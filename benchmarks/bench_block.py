@@ -0,0 +1,126 @@
+# ==========================================
+# BENCHMARK: BLOQUE COMPARTIDO VS. BLOQUES ANTERIORES
+# ==========================================
+# Compara memoria por bloque y tiempo de hash entre el EcoBlock compartido
+# (__slots__ + codificación binaria canónica) y las dos clases que tenían
+# eco_guayaquil.py (JSON de __dict__) y app.py (concatenación de campos).
+#
+#   python -m benchmarks.bench_block --blocks 1000000
+import argparse
+import gc
+import hashlib
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from eco_core.block import EcoBlock
+
+TX = {
+    "usuario": "Francisco Cevallos",
+    "accion": "Reciclaje PET",
+    "cantidad": 24,
+    "peso_kg": 1.2,
+    "tokens": 12.0,
+    "ubicacion": "Sensor_ITSO_01",
+}
+HASH = "0" * 64
+
+
+class LegacyDictBlock:
+    # Bloque de eco_guayaquil.py antes del tipo compartido
+    def __init__(self, index, timestamp, data, previous_hash):
+        self.index = index
+        self.timestamp = str(timestamp)
+        self.data = data
+        self.previous_hash = previous_hash
+        self.hash = self.calculate_hash()
+
+    def calculate_hash(self):
+        campos = {k: v for k, v in self.__dict__.items() if k != 'hash'}
+        return hashlib.sha256(json.dumps(campos, sort_keys=True).encode()).hexdigest()
+
+
+class LegacyConcatBlock:
+    # Bloque de app.py antes del tipo compartido
+    def __init__(self, index, transaction, amount, prev_hash):
+        self.index = index
+        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.transaction = transaction
+        self.amount = amount
+        self.prev_hash = prev_hash
+        self.hash = self.calculate_hash()
+
+    def calculate_hash(self):
+        block_string = f"{self.index}{self.timestamp}{self.transaction}{self.amount}{self.prev_hash}"
+        return hashlib.sha256(block_string.encode()).hexdigest()
+
+
+MEMORY_SAMPLE = 100_000
+
+
+def build(factory, n):
+    # Segundos de construcción, incluido el primer cálculo del hash (sin el
+    # recolector cíclico, que con millones de objetos domina la medición)
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        blocks = [factory(i) for i in range(n)]
+        for block in blocks:
+            block.hash
+        return blocks, time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def rehash(blocks):
+    start = time.perf_counter()
+    for block in blocks:
+        block.calculate_hash()
+    return time.perf_counter() - start
+
+
+def bytes_per_block(factory, n):
+    # Memoria por bloque medida sobre una muestra (tracemalloc ralentiza
+    # mucho la construcción); la transacción es compartida y no se cuenta
+    n = min(n, MEMORY_SAMPLE)
+    gc.collect()
+    tracemalloc.start()
+    blocks = [factory(i) for i in range(n)]
+    for block in blocks:
+        block.hash
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del blocks
+    return size / n
+
+
+def run(n):
+    timestamp = str(datetime.now())
+    cases = {
+        "eco_guayaquil (dict + JSON)": lambda i: LegacyDictBlock(i, timestamp, TX, HASH),
+        "app (concatenación)": lambda i: LegacyConcatBlock(i, "Reciclaje: 24 PET", 12.0, HASH),
+        "EcoBlock compartido": lambda i: EcoBlock(i, timestamp, TX, HASH),
+    }
+    results = {}
+    for name, factory in cases.items():
+        blocks, built = build(factory, n)
+        rehashed = rehash(blocks)
+        del blocks
+        results[name] = (bytes_per_block(factory, n), built, rehashed)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(f"{args.blocks:,} bloques")
+    print(f"{'tipo':30} {'bytes/bloque':>12} {'crear+hash (s)':>15} {'rehash (s)':>11} {'bloques/s':>11}")
+    for name, (per_block, built, rehashed) in run(args.blocks).items():
+        print(f"{name:30} {per_block:12.0f} {built:15.2f} {rehashed:11.2f} {args.blocks / rehashed:11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# ==========================================
+# PRUEBA DE CARGA: CANJES CONCURRENTES
+# ==========================================
+# Muchos hilos canjean a la vez contra un mismo ledger, con reintentos que
+# repiten la clave de idempotencia. Al final se comprueba que no hubo doble
+# gasto: ningún saldo negativo, ningún premio bajo cero y exactamente una
+# transacción de canje en la cadena por cada canje aceptado.
+#
+#   python -m benchmarks.bench_redemption --threads 32 --redemptions 20000 --saldo 300
+import argparse
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from eco_core.ledger import EcoBlockchain
+from eco_core.redemption import CANJEADO, CATALOGO, RedemptionEngine
+
+REINTENTO = "reintento"
+REPETIDO = "reintento repetido"
+
+
+def aceptados(estados):
+    # Canjes que debitaron: los aceptados al primer intento y los rechazados
+    # que un reintento no repetido terminó aceptando
+    return estados[CANJEADO] + estados[f"{REINTENTO} {CANJEADO}"]
+
+
+def run(threads, redemptions, users, block_per_tx, seed=0, saldo=300.0):
+    ledger = EcoBlockchain()
+    # Con el saldo por defecto la mayoría de los canjes se aceptan y los
+    # últimos de cada usuario chocan con el límite; el inventario de los
+    # premios limitados se escala con la corrida para que no se agote al inicio
+    ledger.commit_batch([{"usuario": f"u{i}", "accion": "Reciclaje PET", "cantidad": int(saldo * 2),
+                          "tokens": saldo} for i in range(users)])
+    catalogo = [p if p.stock is None else p._replace(stock=max(p.stock, redemptions // 5)) for p in CATALOGO]
+    submit = None
+    if block_per_tx:
+        # Como registrar_bloque en app.py: el bloque lleva la hora local en ISO
+        submit = ledger.add_transaction_block
+    engine = RedemptionEngine(ledger, catalogo, submit=submit)
+    premios = [p.id for p in catalogo]
+    estados = Counter()
+    contador = threading.Lock()
+    por_hilo = redemptions // threads
+
+    def worker(n):
+        rnd = random.Random(seed + n)
+        local = Counter()
+        vistas = {}   # última versión que este "cliente" vio de cada usuario
+        for _ in range(por_hilo):
+            usuario = f"u{rnd.randrange(users)}"
+            clave = uuid.uuid4().hex
+            result = engine.redeem(usuario, rnd.choice(premios), clave, vistas.get(usuario, engine.version(usuario)))
+            vistas[usuario] = engine.version(usuario)
+            local[result.estado] += 1
+            if rnd.random() < 0.1:
+                # Reintento del mismo canje (sin versión, como un cliente que
+                # reenvía): si el primero se aceptó no debe debitar otra vez;
+                # si se rechazó, se evalúa de nuevo y puede aceptarse
+                reintento = engine.redeem(usuario, result.premio, clave)
+                if reintento.repetido:
+                    local[REPETIDO] += 1
+                else:
+                    local[f"{REINTENTO} {reintento.estado}"] += 1
+                    vistas[usuario] = engine.version(usuario)
+        with contador:
+            estados.update(local)
+
+    hilos = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    ledger.seal_block()
+    elapsed = time.perf_counter() - start
+
+    canjes = [tx for block in ledger.chain for tx in block.transactions()
+              if isinstance(tx, dict) and "premio" in tx]
+    claves = Counter(tx["clave"] for tx in canjes)
+    saldos = [ledger.balances.balance(f"u{i}") for i in range(users)]
+    problemas = []
+    if len(canjes) != aceptados(estados):
+        problemas.append(f"{len(canjes)} canjes en la cadena vs {aceptados(estados)} aceptados")
+    if claves and max(claves.values()) > 1:
+        problemas.append("clave de idempotencia debitada dos veces")
+    if min(saldos) < -1e-9:
+        problemas.append(f"saldo negativo: {min(saldos):.2f}")
+    agotados = [p.id for p in catalogo if p.stock is not None and engine.stock(p.id) < 0]
+    if agotados:
+        problemas.append(f"inventario negativo: {agotados}")
+    return estados, elapsed, len(ledger.chain), problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del motor de canjes")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--redemptions", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--saldo", type=float, default=300.0, help="tokens iniciales de cada usuario")
+    args = parser.parse_args()
+    fallo = False
+    for block_per_tx, nombre in ((False, "lotes (eco_guayaquil)"), (True, "un bloque por canje (app)")):
+        estados, elapsed, bloques, problemas = run(args.threads, args.redemptions, args.users, block_per_tx,
+                                                   saldo=args.saldo)
+        total = sum(v for k, v in estados.items() if not k.startswith(REINTENTO))
+        print(f"{nombre}: {total:,} canjes en {elapsed:.2f} s ({total / elapsed:,.0f}/s), "
+              f"{aceptados(estados):,} aceptados ({aceptados(estados) / elapsed:,.0f}/s), {bloques:,} bloques")
+        print("  " + ", ".join(f"{k}: {v:,}" for k, v in sorted(estados.items())))
+        for problema in problemas:
+            print(f"  ERROR: {problema}")
+        fallo = fallo or bool(problemas)
+    raise SystemExit(1 if fallo else 0)
+
+
+if __name__ == "__main__":
+    main()
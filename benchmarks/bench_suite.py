@@ -0,0 +1,167 @@
+# ==========================================
+# SUITE DE BENCHMARKS DEL LEDGER Y LAS PÁGINAS
+# ==========================================
+# Mide, para cada formato de bloque (eco_guayaquil.py: lotes de
+# transacciones con raíz de Merkle; app.py: una transacción por bloque) y
+# cada tamaño de cadena:
+#   - add_block: construir la cadena (incluye mantener los índices)
+#   - calculate_hash: recalcular el hash de todos los bloques
+#   - is_chain_valid: validación completa e incremental tras un bloque nuevo
+#   - página: una recarga completa de Billetera / Wallet con Streamlit simulado
+# Los resultados se guardan en JSON; con --compare se comparan con otra corrida.
+#
+#   python -m benchmarks.bench_suite --sizes 1000 100000 1000000 --out bench.json
+#   python -m benchmarks.bench_suite --sizes 1000 --compare bench.json
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import st_stub
+from eco_core.block import EcoBlock
+from eco_core.ledger import EcoBlockchain
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TXS_POR_BLOQUE = 8
+RECARGAS = 5
+USUARIOS = ["Ana", "Luis", "María", "Jorge", "Carla", "Pedro", "Sofía"]
+
+FORMATOS = {
+    # formato: (script, usuario de la app, selección del menú, génesis)
+    "eco_guayaquil": ("eco_guayaquil.py", "Francisco Cevallos",
+                      {"Navegación": "💰 Billetera Token"}, "Bloque Génesis - EcoGuayaquil"),
+    "app": ("app.py", "Francisco", {"option_menu": "Wallet"},
+            {"usuario": "Francisco", "accion": "Saldo Inicial", "tokens": 12.50}),
+}
+
+
+def _tx(i, usuario):
+    # Transacciones de un repertorio pequeño y compartido: la memoria de la
+    # cadena en 1M bloques la dominan los bloques, no los diccionarios
+    if i % 10 == 9:
+        return {"usuario": usuario, "accion": "Canje: Metro", "costo": -3.0}
+    cantidad = 5 + i % 20
+    return {"usuario": usuario, "accion": "Reciclaje PET", "cantidad": cantidad,
+            "peso_kg": round(cantidad / 20, 2), "tokens": cantidad * 0.5,
+            "ubicacion": f"Sensor_{i % 4:02d}"}
+
+
+def make_blocks(formato, n, usuario):
+    usuarios = USUARIOS + [usuario]
+    repertorio = [_tx(i, usuarios[i % len(usuarios)]) for i in range(len(usuarios) * 20)]
+    inicio = datetime(2026, 1, 1)
+    bloques = []
+    for i in range(1, n):
+        timestamp = str(inicio + timedelta(seconds=i))
+        if formato == "eco_guayaquil":
+            data = [repertorio[(i * TXS_POR_BLOQUE + j) % len(repertorio)] for j in range(TXS_POR_BLOQUE)]
+        else:
+            data = repertorio[i % len(repertorio)]
+        bloques.append(EcoBlock(None, timestamp, data))
+    return bloques
+
+
+def cronometrar(func):
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_page(formato, ledger):
+    # Una recarga del script completo con Streamlit simulado; se devuelve la
+    # mediana de varias recargas tras una de calentamiento (cachés, canjes)
+    script, _, choices, _ = FORMATOS[formato]
+    path = os.path.join(RAIZ, script)
+    with open(path, encoding="utf-8") as f:
+        code = compile(f.read(), path, "exec")
+    stub = st_stub.install(st_stub.StreamlitStub(choices, {"obtener_ledger": ledger,
+                                                           "obtener_ingesta": None}))
+    tiempos = []
+    for _ in range(RECARGAS + 1):
+        tiempos.append(cronometrar(lambda: exec(code, {"__name__": "__main__", "__file__": path})))
+    del stub
+    return statistics.median(tiempos[1:])
+
+
+def run(formato, n, paginas=True):
+    _, usuario, _, genesis = FORMATOS[formato]
+    bloques = make_blocks(formato, n, usuario)
+    ledger = EcoBlockchain(genesis_data=genesis)
+    out = {}
+
+    def construir():
+        for bloque in bloques:
+            ledger.add_block(bloque)
+    out["add_block"] = (cronometrar(construir), n - 1)
+
+    def rehash():
+        for bloque in ledger.chain:
+            bloque.calculate_hash()
+    out["calculate_hash"] = (cronometrar(rehash), n)
+    out["is_chain_valid (completa)"] = (cronometrar(lambda: ledger.is_chain_valid(full=True)), n)
+    ledger.add_block(EcoBlock(None, str(datetime(2027, 1, 1)), _tx(0, usuario)))
+    out["is_chain_valid (incremental)"] = (cronometrar(ledger.is_chain_valid), 1)
+    if paginas:
+        out["página"] = (run_page(formato, ledger), 1)
+    return out
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(actual, previo):
+    anteriores = {(r["formato"], r["bloques"], r["caso"]): r["segundos"] for r in previo["resultados"]}
+    for r in actual["resultados"]:
+        antes = anteriores.get((r["formato"], r["bloques"], r["caso"]))
+        if antes:
+            cambio = (r["segundos"] - antes) / antes * 100
+            aviso = "  <-- más lento" if cambio > 10 else ""
+            print(f"{r['formato']:14} {r['bloques']:>10,} {r['caso']:30} {antes:10.4f} -> {r['segundos']:10.4f} s "
+                  f"({cambio:+.1f} %){aviso}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del ledger y de las páginas de la billetera")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATOS), default=list(FORMATOS))
+    parser.add_argument("--no-pages", action="store_true", help="omite la recarga de páginas con Streamlit simulado")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": [],
+    }
+    for formato in args.formats:
+        for n in args.sizes:
+            for caso, (segundos, operaciones) in run(formato, n, not args.no_pages).items():
+                resultado["resultados"].append({
+                    "formato": formato, "bloques": n, "caso": caso, "segundos": segundos,
+                    "ops_por_segundo": operaciones / segundos if segundos else None,
+                })
+                print(f"{formato:14} {n:>10,} {caso:30} {segundos:10.4f} s")
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados en {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(resultado, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# ==========================================
+# GENERADOR DE CARGA DETERMINISTA Y REPRODUCCIÓN DE TRAZAS
+# ==========================================
+# Simula N contenedores y M ciudadanos que depositan y canjean a una tasa
+# configurable. Con la misma semilla se obtiene siempre la misma secuencia
+# de eventos, que puede grabarse en una traza JSONL y reproducirse después
+# (o en otra máquina). Los eventos se envían directamente al backend, sin
+# Streamlit, en uno de tres modos:
+#   lotes    add_transaction con la política de sellado (eco_guayaquil.py)
+#   bloque   un bloque por transacción (app.py)
+#   ingesta  IngestionService + commit_batch; latencia hasta la confirmación
+# Al final se informan percentiles de latencia por tipo de evento y el
+# crecimiento del ledger (bloques, transacciones y, con --ledger-dir, bytes).
+#
+#   python -m benchmarks.load_gen run --seed 7 --containers 200 --citizens 5000 --events 100000 --speed 0
+#   python -m benchmarks.load_gen run --seed 7 --rate 2000 --duration 30 --record traza.jsonl
+#   python -m benchmarks.load_gen replay traza.jsonl --mode bloque --speed 0 --out carga.json
+import argparse
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from array import array
+from collections import Counter, namedtuple
+from datetime import datetime
+
+from eco_core.ingest import IngestionService, SensorReading, reading_to_tx, validate_reading
+from eco_core.ledger import EcoBlockchain
+from eco_core.redemption import CANJEADO, CATALOGO, RedemptionEngine
+from eco_core.store import LedgerStore
+
+# t: segundos desde el inicio de la corrida
+Event = namedtuple("Event", ["t", "tipo", "usuario", "sensor", "peso_kg", "cantidad", "premio", "clave"])
+
+DEPOSITO = "deposito"
+CANJE = "canje"
+MODOS = ("lotes", "bloque", "ingesta")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def generate(seed=0, containers=100, citizens=1000, rate=1000.0, events=None, duration=None,
+             redeem_ratio=0.05, bottles=False):
+    # Eventos con llegadas de Poisson a `rate` por segundo, hasta `events`
+    # eventos o `duration` segundos. La actividad de los ciudadanos sigue una
+    # ley de Zipf (unos pocos reciclan mucho). bottles=True usa el formato de
+    # app.py (cantidad entera de botellas) en vez de solo el peso.
+    if events is None and duration is None:
+        raise ValueError("indique events o duration")
+    rnd = random.Random(seed)
+    sensores = [f"Sensor_{i:05d}" for i in range(containers)]
+    usuarios = [f"Ciudadano_{i:06d}" for i in range(citizens)]
+    acumulado = list(itertools.accumulate(1 / (i + 1) for i in range(citizens)))
+    premios = [p.id for p in CATALOGO]
+    t = 0.0
+    for n in itertools.count():
+        if events is not None and n >= events:
+            return
+        t += rnd.expovariate(rate)
+        if duration is not None and t > duration:
+            return
+        usuario = rnd.choices(usuarios, cum_weights=acumulado)[0]
+        if rnd.random() < redeem_ratio:
+            yield Event(t, CANJE, usuario, None, None, None, rnd.choice(premios), f"{seed}-{n}")
+        else:
+            cantidad = rnd.randint(3, 12) if bottles else None
+            yield Event(t, DEPOSITO, usuario, rnd.choice(sensores), round(rnd.uniform(0.1, 2.0), 2), cantidad,
+                        None, None)
+
+
+# --- Trazas: una línea de cabecera con los parámetros y un evento por línea ---
+def record(events, path, params=None):
+    # Escribe los eventos a medida que pasan y los vuelve a entregar
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"traza": 1, "parametros": params or {}}) + "\n")
+        for event in events:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+            yield event
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        cabecera = json.loads(f.readline())
+        if cabecera.get("traza") != 1:
+            raise ValueError(f"{path}: no es una traza del generador de carga")
+        for line in f:
+            yield Event(*json.loads(line))
+
+
+# --- Conducción del backend ---
+def _percentil(ordenados, p):
+    if not ordenados:
+        return None
+    return ordenados[min(int(len(ordenados) * p / 100), len(ordenados) - 1)]
+
+
+def _tamano(path):
+    return sum(os.path.getsize(os.path.join(raiz, name))
+               for raiz, _, names in os.walk(path) for name in names)
+
+
+class LoadRunner:
+    def __init__(self, mode="lotes", ledger_dir=None, speed=1.0):
+        # speed: 1 = a la tasa de la traza, 2 = el doble, 0 = sin pausas
+        if mode not in MODOS:
+            raise ValueError(f"Modo desconocido: {mode}")
+        self.mode = mode
+        self.speed = speed
+        self.ledger_dir = ledger_dir
+        store = LedgerStore(ledger_dir) if ledger_dir else None
+        self.ledger = EcoBlockchain(store)
+        submit = self._block_tx if mode == "bloque" else None
+        self.engine = RedemptionEngine(self.ledger, submit=submit)
+        self.latencias = {DEPOSITO: array("d"), CANJE: array("d")}
+        self.resultados = Counter()
+        self.crecimiento = []   # (segundos, altura, transacciones)
+        self._transacciones = 0
+        self._lock = threading.Lock()
+        self._service = None
+        self._enviadas = {}     # id(lectura) -> instante programado (modo ingesta)
+
+    def _count_tx(self, n=1):
+        with self._lock:
+            self._transacciones += n
+
+    def _block_tx(self, tx):
+        self._count_tx()
+        return self.ledger.add_transaction_block(tx)
+
+    def _commit_readings(self, lecturas):
+        # Hilo escritor de la ingesta: la latencia de cada lectura termina al confirmarse su lote
+        block = self.ledger.commit_batch([reading_to_tx(r) for r in lecturas])
+        ahora = time.perf_counter()
+        for lectura in lecturas:
+            self.latencias[DEPOSITO].append(ahora - self._enviadas.pop(id(lectura)))
+        self._count_tx(len(lecturas))
+        return block
+
+    def _deposit(self, event, programado):
+        # True si el depósito quedó registrado ya (su latencia se mide aquí)
+        lectura = SensorReading(event.sensor, event.usuario, event.peso_kg, event.cantidad, str(datetime.now()))
+        if validate_reading(lectura) is not None:
+            self.resultados["deposito rechazado"] += 1
+            return False
+        self.resultados["deposito"] += 1
+        if self.mode == "ingesta":
+            # Se anota antes de encolar: el hilo escritor puede confirmarla de inmediato
+            self._enviadas[id(lectura)] = programado
+            ticket = self._service.status(self._service.submit(lectura))
+            if ticket is not None and ticket.error is not None:
+                self._enviadas.pop(id(lectura), None)
+                self.resultados["deposito"] -= 1
+                self.resultados["deposito rechazado"] += 1
+            return False
+        if self.mode == "bloque":
+            self._block_tx(reading_to_tx(lectura))
+        else:
+            self._count_tx()
+            self.ledger.add_transaction(reading_to_tx(lectura))
+        return True
+
+    def _redeem(self, event):
+        resultado = self.engine.redeem(event.usuario, event.premio, event.clave)
+        self.resultados[f"canje {resultado.estado}"] += 1
+        if resultado.estado == CANJEADO and self.mode != "bloque":
+            self._count_tx()
+        return True
+
+    def run(self, events):
+        altura_inicial = self.ledger.height
+        if self.mode == "ingesta":
+            self._service = IngestionService(self._commit_readings, batch_wait=0.05).start()
+        start = time.perf_counter()
+        proxima_muestra = 1.0
+        n = 0
+        for n, event in enumerate(events, 1):
+            programado = start + event.t / self.speed if self.speed else time.perf_counter()
+            espera = programado - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            if event.tipo == CANJE:
+                medido = self._redeem(event)
+            else:
+                medido = self._deposit(event, programado)
+            ahora = time.perf_counter()
+            if medido:
+                # Latencia desde el instante programado: una pausa del backend
+                # también retrasa a los eventos que esperaban detrás
+                self.latencias[event.tipo].append(ahora - programado)
+            if ahora - start >= proxima_muestra:
+                self.crecimiento.append((round(ahora - start, 3), self.ledger.height, self._transacciones))
+                proxima_muestra += 1.0
+        if self._service is not None:
+            self._service.stop()
+        self.ledger.seal_block()
+        elapsed = time.perf_counter() - start
+        self.crecimiento.append((round(elapsed, 3), self.ledger.height, self._transacciones))
+        return self.report(n, elapsed, altura_inicial)
+
+    def report(self, eventos, elapsed, altura_inicial):
+        latencias = {}
+        for tipo, valores in self.latencias.items():
+            ordenados = sorted(valores)
+            if ordenados:
+                latencias[tipo] = {f"p{p:g}": _percentil(ordenados, p) for p in PERCENTILES}
+                latencias[tipo]["max"] = ordenados[-1]
+                latencias[tipo]["eventos"] = len(ordenados)
+        bloques = self.ledger.height - altura_inicial
+        canjes = self.resultados[f"canje {CANJEADO}"]
+        out = {
+            "modo": self.mode,
+            "eventos": eventos,
+            "segundos": elapsed,
+            "eventos_por_segundo": eventos / elapsed if elapsed else None,
+            # Los canjes rechazados (saldo, inventario) son baratos: se informan aparte
+            "canjes_aceptados_por_segundo": canjes / elapsed if elapsed else None,
+            "resultados": dict(self.resultados),
+            "latencia_s": latencias,
+            "bloques_nuevos": bloques,
+            "transacciones": self._transacciones,
+            "crecimiento": self.crecimiento,
+        }
+        if self.ledger_dir:
+            self.ledger.store.flush()
+            out["bytes_en_disco"] = _tamano(self.ledger_dir)
+            out["bytes_por_evento"] = out["bytes_en_disco"] / eventos if eventos else None
+        return out
+
+
+def print_report(r):
+    print(f"modo {r['modo']}: {r['eventos']:,} eventos en {r['segundos']:.2f} s "
+          f"({r['eventos_por_segundo'] or 0:,.0f}/s), canjes aceptados {r['canjes_aceptados_por_segundo'] or 0:,.0f}/s")
+    print(f"  ledger: +{r['bloques_nuevos']:,} bloques, {r['transacciones']:,} transacciones"
+          + (f", {r['bytes_en_disco'] / 1e6:,.1f} MB en disco ({r['bytes_por_evento']:.0f} B/evento)"
+             if "bytes_en_disco" in r else ""))
+    print("  " + ", ".join(f"{k}: {v:,}" for k, v in sorted(r["resultados"].items())))
+    for tipo, lat in r["latencia_s"].items():
+        valores = "  ".join(f"{k} {v * 1e3:8.3f} ms" for k, v in lat.items() if k != "eventos")
+        print(f"  {tipo:9} {valores}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga determinista para el backend del ledger")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    run_p = sub.add_parser("run", help="genera eventos con una semilla y los envía al backend")
+    run_p.add_argument("--seed", type=int, default=0)
+    run_p.add_argument("--containers", type=int, default=100)
+    run_p.add_argument("--citizens", type=int, default=1000)
+    run_p.add_argument("--rate", type=float, default=1000.0, help="eventos por segundo")
+    run_p.add_argument("--events", type=int)
+    run_p.add_argument("--duration", type=float, help="segundos de carga (si no se da --events)")
+    run_p.add_argument("--redeem-ratio", type=float, default=0.05)
+    run_p.add_argument("--bottles", action="store_true", help="depósitos con cantidad de botellas (app.py)")
+    run_p.add_argument("--record", help="graba la traza JSONL mientras se envía")
+    replay_p = sub.add_parser("replay", help="reproduce una traza grabada")
+    replay_p.add_argument("trace")
+    for p in (run_p, replay_p):
+        p.add_argument("--mode", choices=MODOS, default="lotes")
+        p.add_argument("--speed", type=float, default=1.0, help="1 = tasa original, 0 = sin pausas")
+        p.add_argument("--ledger-dir", help="usa un ledger persistente en este directorio (mide bytes en disco)")
+        p.add_argument("--out", help="guarda el informe en JSON")
+    args = parser.parse_args()
+
+    if args.comando == "run":
+        if args.events is None and args.duration is None:
+            args.events = 10_000
+        params = {k: getattr(args, k) for k in ("seed", "containers", "citizens", "rate", "events", "duration",
+                                                 "redeem_ratio", "bottles")}
+        events = generate(params["seed"], args.containers, args.citizens, args.rate, args.events, args.duration,
+                          args.redeem_ratio, args.bottles)
+        if args.record:
+            events = record(events, args.record, params)
+    else:
+        events = load(args.trace)
+    runner = LoadRunner(args.mode, args.ledger_dir, args.speed)
+    reporte = runner.run(events)
+    print_report(reporte)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
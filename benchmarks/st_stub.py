@@ -0,0 +1,137 @@
+# ==========================================
+# STREAMLIT SIMULADO PARA BENCHMARKS
+# ==========================================
+# Sustituye streamlit y streamlit_option_menu en sys.modules para ejecutar
+# los scripts de las apps sin servidor: los widgets devuelven su valor por
+# defecto (o el elegido en `choices`), todo lo que solo dibuja es un no-op y
+# st.cache_resource devuelve los objetos de `resources` por nombre de función.
+import sys
+import types
+
+
+class _NoOp:
+    # Cualquier llamada, atributo o bloque `with` sobre él no hace nada
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, name):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class SessionState(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        del self[name]
+
+
+class StreamlitStub:
+    def __init__(self, choices=None, resources=None):
+        # choices: {etiqueta del widget (u "option_menu"): valor};
+        # resources: {nombre de la función cacheada: objeto}
+        self.choices = dict(choices or {})
+        self.resources = dict(resources or {})
+        self.session_state = SessionState()
+        self._cache = {}
+
+    def __getattr__(self, name):
+        return _NoOp()
+
+    # --- contenedores ---
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, labels):
+        return [self] * len(labels)
+
+    @property
+    def sidebar(self):
+        return self
+
+    def expander(self, *args, **kwargs):
+        return self
+
+    def container(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    # --- caché ---
+    def cache_resource(self, func=None, **kwargs):
+        if func is None:
+            return self.cache_resource
+
+        def cached(*args, **kw):
+            if func.__name__ in self.resources:
+                return self.resources[func.__name__]
+            if func.__name__ not in self._cache:
+                self._cache[func.__name__] = func(*args, **kw)
+            return self._cache[func.__name__]
+        return cached
+
+    cache_data = cache_resource
+
+    # --- widgets ---
+    def _value(self, label, key, default):
+        if key is not None and key in self.session_state:
+            return self.session_state[key]
+        value = self.choices.get(label, default)
+        if key is not None:
+            self.session_state[key] = value
+        return value
+
+    def radio(self, label, options, index=0, key=None, **kwargs):
+        return self._value(label, key, list(options)[index])
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        return self._value(label, key, list(options)[index])
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        default = value if value is not None else (min_value if min_value is not None else 0)
+        return self._value(label, key, default)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return self._value(label, key, value if value is not None else min_value)
+
+    def date_input(self, label, value=None, key=None, **kwargs):
+        return self._value(label, key, value)
+
+    def text_input(self, label, value="", key=None, **kwargs):
+        return self._value(label, key, value)
+
+    def checkbox(self, label, value=False, key=None, **kwargs):
+        return self._value(label, key, value)
+
+    def button(self, label, key=None, **kwargs):
+        return self.choices.get(label, False)
+
+
+def install(stub):
+    # Registra el stub como `streamlit` (y option_menu) y lo devuelve
+    streamlit = types.ModuleType("streamlit")
+    streamlit.__getattr__ = lambda name: getattr(stub, name)
+    option_menu = types.ModuleType("streamlit_option_menu")
+
+    def _option_menu(menu_title, options, default_index=0, **kwargs):
+        return stub.choices.get("option_menu", options[default_index])
+    option_menu.option_menu = _option_menu
+    sys.modules["streamlit"] = streamlit
+    sys.modules["streamlit_option_menu"] = option_menu
+    return stub
@@ -0,0 +1,2 @@
+# Raíz del repositorio para pytest: permite `pytest` además de
+# `python -m pytest` sin instalar eco_core como paquete.
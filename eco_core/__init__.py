@@ -0,0 +1,48 @@
+# ==========================================
+# NÚCLEO DE ECOGUAYAQUIL (sin interfaz de usuario)
+# ==========================================
+# Módulos de backend compartidos por eco_guayaquil.py y app.py. Ninguno
+# importa streamlit, de modo que pueden usarse desde scripts y trabajos
+# en segundo plano. Los nombres de abajo se importan bajo demanda
+# (`from eco_core import EcoBlockchain` solo carga lo necesario) y numpy y
+# pandas solo se cargan al pedir analítica, así un worker o una auditoría
+# arrancan en milisegundos.
+import importlib
+
+_EXPORTS = {
+    "EcoBlock": "eco_core.block",
+    "EcoBlockchain": "eco_core.ledger",
+    "LedgerSnapshot": "eco_core.ledger",
+    "LedgerStore": "eco_core.store",
+    "BalanceIndex": "eco_core.balances",
+    "BlockExplorer": "eco_core.explorer",
+    "Leaderboard": "eco_core.leaderboard",
+    "calcular_nivel": "eco_core.leaderboard",
+    "NIVELES": "eco_core.leaderboard",
+    "ImpactAnalytics": "eco_core.analytics",
+    "IngestionService": "eco_core.ingest",
+    "SensorReading": "eco_core.ingest",
+    "DedupeIndex": "eco_core.dedupe",
+    "RedemptionEngine": "eco_core.redemption",
+    "Follower": "eco_core.replication",
+    "GridIndex": "eco_core.geo",
+    "TelemetryStore": "eco_core.telemetry",
+    "merkle_root": "eco_core.merkle",
+    "verify_inclusion": "eco_core.block",
+    "verify_proof": "eco_core.merkle",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,190 @@
+# ==========================================
+# ANALÍTICA DE IMPACTO (COLUMNAR Y VECTORIZADA)
+# ==========================================
+# Cada transacción de la cadena se guarda como una fila en columnas
+# compactas (array) con el usuario, el sensor y el día codificados como
+# enteros. Los agregados por usuario, sensor y día (kg, botellas, CO2 y
+# tokens) se calculan con numpy.bincount y se guardan por dimensión junto con
+# las filas ya sumadas: una consulta tras nuevos bloques solo suma las filas
+# nuevas. Los resultados quedan en caché por altura de la cadena.
+# numpy (y pandas, en frame) se importan en la primera consulta: mantener el
+# índice al añadir bloques solo usa array, así el ledger arranca sin ellos.
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime
+
+from eco_core.balances import movement_from_tx
+from eco_core.metrics import timed
+
+DIMENSIONES = ("usuario", "sensor", "dia")
+METRICAS = ("peso_kg", "botellas", "co2", "tokens")
+SIN_SENSOR = "(manual)"
+CACHE_RESULTADOS = 16
+
+Aggregate = namedtuple("Aggregate", ("claves", "transacciones") + METRICAS)
+
+_TIPOS = {"peso_kg": "d", "botellas": "q", "co2": "d", "tokens": "d"}
+
+
+def dia_de(timestamp):
+    try:
+        return datetime.fromisoformat(str(timestamp)[:19]).date()
+    except ValueError:
+        return None
+
+
+class _Codes:
+    # Valor -> entero consecutivo, y la lista inversa
+    __slots__ = ("codes", "values")
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ImpactAnalytics:
+    def __init__(self):
+        self.height = 0
+        self._alturas = array("Q")
+        self._dims = {d: (array("i"), _Codes()) for d in DIMENSIONES}
+        self._metricas = {m: array(t) for m, t in _TIPOS.items()}
+        # dimensión -> [filas ya sumadas, {métrica: sumas por código}]
+        self._acumulado = {d: [0, {}] for d in DIMENSIONES}
+        self._cache = OrderedDict()   # (dimensión, altura) -> Aggregate
+        self._lock = threading.Lock()
+
+    def apply(self, block):
+        if block.index < self.height:
+            return
+        movimientos = [(tx, movement_from_tx(tx)) for tx in block.transactions()]
+        movimientos = [(tx, m) for tx, m in movimientos if m]
+        if movimientos:
+            dia = dia_de(block.timestamp)
+            with self._lock:
+                for tx, m in movimientos:
+                    self._alturas.append(block.index)
+                    for dimension, valor in (("usuario", m.usuario),
+                                             ("sensor", tx.get("ubicacion") or SIN_SENSOR),
+                                             ("dia", dia)):
+                        codigos, diccionario = self._dims[dimension]
+                        codigos.append(diccionario.encode(valor))
+                    for metrica in METRICAS:
+                        self._metricas[metrica].append(getattr(m, metrica))
+        self.height = block.index + 1
+
+    def state(self):
+        with self._lock:
+            return {
+                "height": self.height,
+                "alturas": self._alturas[:],
+                "dims": {d: (c[:], list(v.values)) for d, (c, v) in self._dims.items()},
+                "metricas": {m: a[:] for m, a in self._metricas.items()},
+            }
+
+    def load_state(self, state):
+        # Las sumas acumuladas y la caché se recalculan en la primera consulta
+        with self._lock:
+            self._alturas = state["alturas"]
+            self._dims = {}
+            for dimension, (codigos, valores) in state["dims"].items():
+                diccionario = _Codes()
+                for valor in valores:
+                    diccionario.encode(valor)
+                self._dims[dimension] = (codigos, diccionario)
+            self._metricas = state["metricas"]
+            self._acumulado = {d: [0, {}] for d in DIMENSIONES}
+            self._cache.clear()
+            self.height = state["height"]
+
+    def _filas(self, height):
+        # Número de filas que pertenecen a los bloques [0, height)
+        return bisect_left(self._alturas, height)
+
+    def _columna(self, valores, lo, hi):
+        # Copia del tramo [lo, hi): un numpy.frombuffer directo sobre el array
+        # impediría que siga creciendo
+        import numpy as np
+
+        return np.frombuffer(valores[lo:hi], dtype=valores.typecode)
+
+    def _sumar(self, dimension, lo, hi, sumas):
+        # Suma las filas [lo, hi) a las sumas previas ({métrica: array por código})
+        import numpy as np
+
+        codigos = self._columna(self._dims[dimension][0], lo, hi)
+        n = len(self._dims[dimension][1].values)
+        out = {}
+        for metrica in ("transacciones",) + METRICAS:
+            pesos = None
+            if metrica != "transacciones":
+                pesos = self._columna(self._metricas[metrica], lo, hi)
+            parcial = np.bincount(codigos, weights=pesos, minlength=n).astype(np.float64)
+            previo = sumas.get(metrica)
+            if previo is not None:
+                parcial[:len(previo)] += previo
+            out[metrica] = parcial
+        return out
+
+    @timed("analytics_aggregate")
+    def aggregate(self, dimension, height=None):
+        # Totales por usuario, sensor o día considerando los bloques [0, height)
+        if dimension not in DIMENSIONES:
+            raise ValueError(f"Dimensión desconocida: {dimension}")
+        with self._lock:
+            height = self.height if height is None else min(height, self.height)
+            clave = (dimension, height)
+            if clave in self._cache:
+                self._cache.move_to_end(clave)
+                return self._cache[clave]
+            filas = self._filas(height)
+            acumulado = self._acumulado[dimension]
+            if filas >= acumulado[0]:
+                # Caso normal: solo se suman las filas nuevas
+                sumas = self._sumar(dimension, acumulado[0], filas, acumulado[1])
+                acumulado[:] = [filas, sumas]
+            else:
+                # Altura anterior a lo ya acumulado (snapshot antiguo): desde cero
+                sumas = self._sumar(dimension, 0, filas, {})
+            resultado = self._resultado(dimension, sumas)
+            self._cache[clave] = resultado
+            while len(self._cache) > CACHE_RESULTADOS:
+                self._cache.popitem(last=False)
+            return resultado
+
+    def _resultado(self, dimension, sumas):
+        # Solo las claves con transacciones hasta esa altura
+        import numpy as np
+
+        claves = self._dims[dimension][1].values
+        orden = np.flatnonzero(sumas["transacciones"])
+        if dimension == "dia":
+            # Cronológico; los días que no se pudieron leer van al final
+            orden = np.array(sorted(orden, key=lambda i: (claves[i] is None, claves[i] or date.min)),
+                             dtype=np.intp)
+        enteros = ("transacciones", "botellas")
+        return Aggregate(
+            [claves[i] for i in orden],
+            *(sumas[m][orden].astype(np.int64) if m in enteros else sumas[m][orden]
+              for m in ("transacciones",) + METRICAS),
+        )
+
+    def frame(self, dimension, height=None):
+        # El mismo agregado como DataFrame de pandas (importado solo aquí)
+        import pandas as pd
+
+        resultado = self.aggregate(dimension, height)
+        return pd.DataFrame(resultado._asdict()).rename(columns={"claves": dimension}).set_index(dimension)
+
+    def totals(self, height=None):
+        # Totales de toda la ciudad
+        resultado = self.aggregate("sensor", height)
+        return {m: getattr(resultado, m).sum().item() for m in METRICAS}
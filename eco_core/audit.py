@@ -0,0 +1,92 @@
+# ==========================================
+# AUDITORÍA COMPLETA DE LA CADENA (MULTINÚCLEO)
+# ==========================================
+# Verifica todo el ledger persistido, no solo la punta. La cadena se parte
+# en rangos de alturas; cada proceso del pool abre el almacén en solo
+# lectura (mmap), recalcula los hashes de su rango directamente desde el
+# JSON canónico guardado (sin crear objetos EcoBlock) y comprueba los
+# enlaces internos. El proceso principal solo verifica los enlaces entre
+# rangos.
+#
+#   python -m eco_core.audit RUTA_LEDGER [--workers N] [--chunk BLOQUES]
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from eco_core.block import hash_raw
+from eco_core.store import LedgerStore
+
+AuditReport = namedtuple("AuditReport", ["valid", "blocks", "first_invalid", "seconds", "blocks_per_second"])
+
+# (inicio, fin, primer bloque inválido o None, previous_hash del inicio, hash del último)
+_RangeResult = namedtuple("_RangeResult", ["start", "stop", "first_invalid", "first_previous", "last_hash"])
+
+_store = None
+
+
+def _open_store(path):
+    # Un almacén por proceso del pool, abierto una sola vez
+    global _store
+    _store = LedgerStore(path, readonly=True)
+
+
+def _audit_range(start, stop):
+    previous = None
+    first_previous = None
+    for height in range(start, stop):
+        raw = _store.get_raw(height)
+        if height == start:
+            first_previous = raw.previous_hash
+        elif raw.previous_hash != previous:
+            return _RangeResult(start, stop, height, first_previous, None)
+        if raw.index != height or raw.hash != hash_raw(raw.index, raw.timestamp, raw.previous_hash, raw.payload):
+            return _RangeResult(start, stop, height, first_previous, None)
+        previous = raw.hash
+    return _RangeResult(start, stop, None, first_previous, previous)
+
+
+def audit(path, workers=None, chunk=50_000):
+    workers = workers or os.cpu_count() or 1
+    began = time.perf_counter()
+    with LedgerStore(path, readonly=True) as store:
+        height = len(store)
+    ranges = [(start, min(start + chunk, height)) for start in range(0, height, chunk)]
+    first_invalid = None
+    with ProcessPoolExecutor(workers, initializer=_open_store, initargs=(path,)) as pool:
+        results = pool.map(_audit_range, *zip(*ranges)) if ranges else []
+        previous = None
+        for result in results:
+            # Los rangos llegan en orden: el primer fallo encontrado es el primero de la cadena
+            if result.start > 0 and result.first_previous != previous:
+                first_invalid = result.start
+            elif result.first_invalid is not None:
+                first_invalid = result.first_invalid
+            if first_invalid is not None:
+                pool.shutdown(cancel_futures=True)
+                break
+            previous = result.last_hash
+    seconds = time.perf_counter() - began
+    checked = height if first_invalid is None else first_invalid
+    return AuditReport(first_invalid is None, height, first_invalid, seconds, checked / seconds if seconds else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auditoría completa y paralela de un ledger EcoGuayaquil")
+    parser.add_argument("ledger", help="directorio del ledger (p. ej. $ECOG_LEDGER_DIR/eco_guayaquil)")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--chunk", type=int, default=50_000, help="bloques por rango")
+    args = parser.parse_args()
+    report = audit(args.ledger, args.workers, args.chunk)
+    print(f"Bloques: {report.blocks:,}")
+    print(f"Tiempo: {report.seconds:.2f} s ({report.blocks_per_second:,.0f} bloques/s)")
+    if report.valid:
+        print("Resultado: ✅ cadena válida")
+    else:
+        print(f"Resultado: ❌ primer bloque inválido: {report.first_invalid}")
+    raise SystemExit(0 if report.valid else 1)
+
+
+if __name__ == "__main__":
+    main()
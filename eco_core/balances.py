@@ -0,0 +1,118 @@
+# ==========================================
+# ÍNDICE MATERIALIZADO DE SALDOS Y AGREGADOS
+# ==========================================
+# Mantiene por usuario tokens, botellas, kg y CO2, actualizado bloque a
+# bloque al añadirlo a la cadena. Las consultas puntuales son O(1) y la
+# serie de saldo por altura se guarda a medida que crece, así que la
+# Billetera no necesita recorrer la cadena en cada recarga.
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+# Factores de conversión a CO2 evitado
+FACTOR_CO2_KG = 1.5         # kg de CO2 por kg de PET (eco_guayaquil.py)
+FACTOR_CO2_BOTELLA = 0.03   # kg de CO2 por botella cuando no hay peso (app.py)
+
+Movement = namedtuple("Movement", ["usuario", "tokens", "botellas", "peso_kg", "co2"])
+Totals = namedtuple("Totals", ["tokens", "botellas", "peso_kg", "co2"])
+
+_EMPTY = Totals(0.0, 0, 0.0, 0.0)
+
+
+def _new_series():
+    return array("Q"), array("d"), array("d"), array("d"), array("d")
+
+
+def movement_from_tx(tx):
+    # Transacción en formato diccionario: depósitos ("tokens", "cantidad",
+    # "peso_kg") o canjes ("costo", negativo)
+    if not isinstance(tx, dict) or "usuario" not in tx:
+        return None
+    botellas = tx.get("cantidad", 0)
+    peso_kg = tx.get("peso_kg", 0.0)
+    co2 = peso_kg * FACTOR_CO2_KG if peso_kg else botellas * FACTOR_CO2_BOTELLA
+    return Movement(tx["usuario"], tx.get("tokens", 0.0) + tx.get("costo", 0.0), botellas, peso_kg, co2)
+
+
+def block_movements(block):
+    movements = (movement_from_tx(tx) for tx in block.transactions())
+    return [m for m in movements if m]
+
+
+class BalanceIndex:
+    def __init__(self, extract):
+        # extract(block) -> iterable de Movement
+        self.extract = extract
+        self.height = 0
+        self._totals = {}
+        self._series = {}   # usuario -> (alturas, tokens, botellas, kg, co2) tras cada cambio
+
+    def apply(self, block):
+        if block.index < self.height:
+            return
+        for m in self.extract(block):
+            t = self._totals.get(m.usuario, _EMPTY)
+            t = Totals(t.tokens + m.tokens, t.botellas + m.botellas, t.peso_kg + m.peso_kg, t.co2 + m.co2)
+            self._totals[m.usuario] = t
+            heights, *columns = self._series.setdefault(m.usuario, _new_series())
+            if heights and heights[-1] == block.index:
+                for column, value in zip(columns, t):
+                    column[-1] = value
+            else:
+                heights.append(block.index)
+                for column, value in zip(columns, t):
+                    column.append(value)
+        self.height = block.index + 1
+
+    def rebuild(self, chain):
+        # Una sola pasada en streaming sobre el ledger
+        self.height = 0
+        self._totals.clear()
+        self._series.clear()
+        for block in chain:
+            self.apply(block)
+        return self
+
+    def state(self):
+        # Copia del estado para un snapshot (se toma bajo el candado de escritura)
+        return {
+            "height": self.height,
+            "totals": dict(self._totals),
+            "series": {u: tuple(column[:] for column in series) for u, series in self._series.items()},
+        }
+
+    def load_state(self, state):
+        self.height = state["height"]
+        self._totals = state["totals"]
+        self._series = state["series"]
+
+    def get(self, usuario):
+        return self._totals.get(usuario, _EMPTY)
+
+    def balance(self, usuario):
+        return self.get(usuario).tokens
+
+    def users(self):
+        return self._totals.keys()
+
+    def balance_at(self, usuario, height):
+        # Saldo del usuario considerando solo los bloques [0, height)
+        return self.get_at(usuario, height).tokens
+
+    def get_at(self, usuario, height):
+        # Totales del usuario considerando solo los bloques [0, height)
+        series = self._series.get(usuario)
+        i = bisect_left(series[0], height) if series is not None else 0
+        if not i:
+            return _EMPTY
+        tokens, botellas, peso_kg, co2 = (column[i - 1] for column in series[1:])
+        return Totals(tokens, int(botellas) if botellas.is_integer() else botellas, peso_kg, co2)
+
+    def series(self, usuario, height=None):
+        # (alturas, saldos) tras cada bloque que movió el saldo del usuario,
+        # opcionalmente recortada a los bloques [0, height)
+        heights, balances = self._series.get(usuario, _new_series())[:2]
+        if height is None:
+            return heights, balances
+        i = bisect_left(heights, height)
+        return heights[:i], balances[:i]
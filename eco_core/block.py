@@ -0,0 +1,118 @@
+# ==========================================
+# BLOQUE COMPARTIDO (eco_guayaquil.py y app.py)
+# ==========================================
+# Un solo tipo de bloque con __slots__ (sin __dict__ por instancia) y una
+# codificación binaria canónica que excluye el propio hash:
+#
+#   b"ECOB1" | índice u64 | len(ts) u16 | len(prev) u16 | len(payload) u32
+#            | timestamp | previous_hash | tipo u8 | payload
+#
+# tipo 0: payload = JSON canónico de una transacción (o texto del génesis)
+# tipo 1: payload = raíz de Merkle (32 bytes) de una lista de transacciones
+#
+# El hash se calcula una vez y queda en caché; cambiar previous_hash lo
+# invalida. calculate_hash() siempre recalcula desde los campos actuales,
+# por eso sirve para detectar manipulación.
+import hashlib
+import json
+import struct
+
+from eco_core.encoding import canonical_json
+from eco_core.merkle import merkle_root, verify_proof
+from eco_core.store import BlockRecord
+
+_MAGIC = b"ECOB1"
+_HEAD = struct.Struct("<QHHI")
+_SINGLE = b"\x00"
+_BATCH = b"\x01"
+
+
+def _encode(index, timestamp, previous_hash, kind, payload):
+    timestamp = timestamp.encode()
+    previous = previous_hash.encode()
+    return b"".join((_MAGIC, _HEAD.pack(index, len(timestamp), len(previous), len(payload)),
+                     timestamp, previous, kind, payload))
+
+
+def hash_raw(index, timestamp, previous_hash, payload):
+    # Hash de un bloque a partir del JSON canónico tal como está guardado en
+    # disco, sin decodificarlo (salvo los lotes, que necesitan su raíz de Merkle)
+    if payload[:1] == b"[":
+        kind, payload = _BATCH, bytes.fromhex(merkle_root(json.loads(payload)))
+    else:
+        kind = _SINGLE
+    return hashlib.sha256(_encode(index, timestamp, previous_hash, kind, payload)).hexdigest()
+
+
+def verify_inclusion(prueba):
+    # Prueba de EcoBlockchain.get_proof: la transacción lleva a la raíz de
+    # Merkle y la cabecera con esa raíz produce block_hash, el hash que
+    # enlaza la cadena. Una transacción alterada en el bloque no pasa.
+    if prueba["lote"]:
+        if not verify_proof(prueba["tx"], prueba["proof"], prueba["merkle_root"]):
+            return False
+        kind, payload = _BATCH, bytes.fromhex(prueba["merkle_root"])
+    else:
+        kind, payload = _SINGLE, canonical_json(prueba["tx"])
+    header = _encode(prueba["index"], prueba["timestamp"], prueba["previous_hash"], kind, payload)
+    return hashlib.sha256(header).hexdigest() == prueba["block_hash"]
+
+
+class EcoBlock:
+    __slots__ = ("index", "timestamp", "data", "_previous_hash", "_hash")
+
+    def __init__(self, index, timestamp, data, previous_hash=""):
+        self.index = index
+        self.timestamp = str(timestamp)
+        self.data = data  # una transacción (dict), una lista de ellas o el texto del génesis
+        self._previous_hash = previous_hash
+        self._hash = None
+
+    @property
+    def previous_hash(self):
+        return self._previous_hash
+
+    @previous_hash.setter
+    def previous_hash(self, value):
+        self._previous_hash = value
+        self._hash = None
+
+    @property
+    def hash(self):
+        if self._hash is None:
+            self._hash = self.calculate_hash()
+        return self._hash
+
+    @hash.setter
+    def hash(self, value):
+        self._hash = value
+
+    @property
+    def merkle_root(self):
+        return merkle_root(self.data) if isinstance(self.data, list) else None
+
+    def transactions(self):
+        return self.data if isinstance(self.data, list) else [self.data]
+
+    def encode(self):
+        if isinstance(self.data, list):
+            kind, payload = _BATCH, bytes.fromhex(merkle_root(self.data))
+        else:
+            kind, payload = _SINGLE, canonical_json(self.data)
+        return _encode(self.index, self.timestamp, self._previous_hash, kind, payload)
+
+    def calculate_hash(self):
+        return hashlib.sha256(self.encode()).hexdigest()
+
+    def to_record(self):
+        return BlockRecord(self.index, self.timestamp, self.data, self._previous_hash, self.hash)
+
+    @classmethod
+    def from_record(cls, record):
+        # Reconstruye el bloque guardado sin volver a calcular su hash
+        block = cls(record.index, record.timestamp, record.data, record.previous_hash)
+        block._hash = record.hash
+        return block
+
+    def __repr__(self):
+        return f"EcoBlock(index={self.index}, hash={self.hash[:12]}...)"
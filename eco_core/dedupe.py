@@ -0,0 +1,141 @@
+# ==========================================
+# DETECCIÓN DE LECTURAS DUPLICADAS (IDEMPOTENCIA DE DEPÓSITOS)
+# ==========================================
+# Un contenedor que reintenta puede enviar la misma lectura varias veces.
+# La clave de una lectura es (sensor, reading_id, timestamp) y se comprueba
+# en O(1) sin recorrer la cadena:
+#   - Ventana reciente: conjunto exacto de las claves de los últimos
+#     `window` segundos (y como mucho `max_recent`), sin falsos positivos.
+#   - Historia: las claves que salen de la ventana pasan a un filtro de
+#     Bloom de tamaño fijo. Solo se consulta para lecturas con timestamp no
+#     posterior a la última clave archivada, así una lectura nueva nunca se
+#     rechaza por un falso positivo. Al llenarse, el filtro rota (se
+#     conservan la generación actual y la anterior).
+# La memoria queda acotada por max_recent y por el tamaño de los filtros,
+# sea cual sea la tasa de eventos. Las lecturas sin reading_id no se
+# deduplican: dos depósitos iguales sin identificador son legítimos.
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+VENTANA = 3600.0            # segundos en el conjunto exacto
+MAX_RECIENTES = 200_000
+CAPACIDAD_BLOOM = 2_000_000   # claves por generación del filtro (~3.6 MB cada una)
+ERROR_BLOOM = 0.001
+
+
+def reading_key(reading):
+    # Clave de idempotencia, o None si la lectura no trae identificador
+    if getattr(reading, "reading_id", None) is None:
+        return None
+    return f"{reading.sensor}\x1f{reading.reading_id}\x1f{reading.timestamp}"
+
+
+def _epoch(timestamp):
+    try:
+        return datetime.fromisoformat(str(timestamp)).timestamp()
+    except ValueError:
+        return None
+
+
+class BloomFilter:
+    def __init__(self, capacity=CAPACIDAD_BLOOM, error_rate=ERROR_BLOOM):
+        self.capacity = capacity
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key):
+        # Doble hashing (Kirsch-Mitzenmacher) sobre un solo digest de 16 bytes
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little")
+        b = int.from_bytes(digest[8:], "little") | 1
+        return [(a + i * b) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for p in self._positions(key):
+            self._array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def full(self):
+        return self.count >= self.capacity
+
+
+class DedupeIndex:
+    def __init__(self, window=VENTANA, max_recent=MAX_RECIENTES, bloom_capacity=CAPACIDAD_BLOOM,
+                 error_rate=ERROR_BLOOM, clock=time.monotonic):
+        self.window = window
+        self.max_recent = max_recent
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.clock = clock
+        self._recent = OrderedDict()   # clave -> (instante de llegada, epoch de la lectura)
+        self._blooms = [BloomFilter(bloom_capacity, error_rate)]   # la más reciente al final
+        self._horizon = None           # epoch máximo de las claves archivadas en los filtros
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._recent)
+
+    def check_and_add(self, reading):
+        # True si la lectura es nueva (y queda registrada); False si es un duplicado
+        key = reading_key(reading)
+        if key is None:
+            return True
+        epoch = _epoch(reading.timestamp)
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            if key in self._recent or self._in_history(key, epoch):
+                self.duplicates += 1
+                return False
+            self._recent[key] = (now, epoch)
+            if len(self._recent) > self.max_recent:
+                self._archive(*self._recent.popitem(last=False))
+            return True
+
+    def forget(self, reading):
+        # Deshace check_and_add cuando la lectura no llegó a confirmarse
+        # (cola llena, lote fallido) para que su reintento se acepte
+        key = reading_key(reading)
+        if key is not None:
+            with self._lock:
+                self._recent.pop(key, None)
+
+    def _in_history(self, key, epoch):
+        if self._horizon is None:
+            return False
+        # Más nueva que todo lo archivado: no puede estar en los filtros
+        if epoch is not None and epoch > self._horizon:
+            return False
+        return any(key in bloom for bloom in self._blooms)
+
+    def _expire(self, now):
+        limite = now - self.window
+        while self._recent:
+            key, (llegada, epoch) = next(iter(self._recent.items()))
+            if llegada > limite:
+                break
+            del self._recent[key]
+            self._archive(key, (llegada, epoch))
+
+    def _archive(self, key, value):
+        epoch = value[1]
+        bloom = self._blooms[-1]
+        if bloom.full():
+            bloom = BloomFilter(self.bloom_capacity, self.error_rate)
+            self._blooms = self._blooms[-1:] + [bloom]
+        bloom.add(key)
+        if epoch is None:
+            # Sin timestamp legible, todo lo posterior debe consultar los filtros
+            self._horizon = float("inf")
+        elif self._horizon is None or epoch > self._horizon:
+            self._horizon = epoch
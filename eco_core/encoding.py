@@ -0,0 +1,14 @@
+# ==========================================
+# CODIFICACIÓN CANÓNICA
+# ==========================================
+import json
+
+# Un solo codificador reutilizado: json.dumps con argumentos no estándar
+# construye un JSONEncoder nuevo en cada llamada
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def canonical_json(value):
+    # JSON determinista (claves ordenadas, sin espacios) en UTF-8; es la
+    # forma que se hashea y se guarda en disco
+    return _ENCODER.encode(value).encode()
@@ -0,0 +1,114 @@
+# ==========================================
+# EXPLORADOR DE BLOQUES PAGINADO
+# ==========================================
+# Mantiene listas de alturas por usuario, por acción y por ambos, de modo
+# que la página k de tamaño m (con o sin filtros) se obtiene por corte de
+# una lista y solo se materializan las m filas que se muestran. El rango de
+# fechas se resuelve con búsqueda binaria, ya que los timestamps crecen con
+# la altura.
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+Page = namedtuple("Page", ["columns", "total", "page", "pages"])
+
+
+def block_keys(block):
+    # Pares (usuario, acción) de un bloque; "Canje: X" se agrupa como "Canje"
+    return [(tx.get("usuario"), tx.get("accion", "").split(":")[0])
+            for tx in block.transactions() if isinstance(tx, dict)]
+
+
+class _Heights:
+    # Todas las alturas [0, n) sin guardar una lista
+    def __init__(self, explorer):
+        self.explorer = explorer
+
+    def __len__(self):
+        return self.explorer.height
+
+    def __getitem__(self, i):
+        return range(self.explorer.height)[i]
+
+
+class BlockExplorer:
+    def __init__(self, chain, keys):
+        # keys(block) -> iterable de pares (usuario, acción) usados para los filtros
+        self.chain = chain
+        self.keys = keys
+        self.height = 0
+        self._by_user = {}
+        self._by_action = {}
+        self._by_user_action = {}
+        self._all = _Heights(self)
+
+    def apply(self, block):
+        if block.index < self.height:
+            return
+        # Un bloque por lotes aparece una sola vez en cada lista
+        pairs = set(self.keys(block))
+        for key in {usuario for usuario, _ in pairs}:
+            self._by_user.setdefault(key, array("Q")).append(block.index)
+        for key in {accion for _, accion in pairs}:
+            self._by_action.setdefault(key, array("Q")).append(block.index)
+        for key in pairs:
+            self._by_user_action.setdefault(key, array("Q")).append(block.index)
+        self.height = block.index + 1
+
+    def state(self):
+        return {
+            "height": self.height,
+            "by_user": {k: v[:] for k, v in self._by_user.items()},
+            "by_action": {k: v[:] for k, v in self._by_action.items()},
+            "by_user_action": {k: v[:] for k, v in self._by_user_action.items()},
+        }
+
+    def load_state(self, state):
+        self._by_user = state["by_user"]
+        self._by_action = state["by_action"]
+        self._by_user_action = state["by_user_action"]
+        self.height = state["height"]
+
+    def actions(self):
+        return sorted(self._by_action)
+
+    def _candidates(self, usuario, accion):
+        if usuario is not None and accion is not None:
+            return self._by_user_action.get((usuario, accion), ())
+        if usuario is not None:
+            return self._by_user.get(usuario, ())
+        if accion is not None:
+            return self._by_action.get(accion, ())
+        return self._all
+
+    def _timestamp(self, height):
+        return self.chain[height].timestamp
+
+    def page(self, k, m, row, usuario=None, accion=None, desde=None, hasta=None, newest_first=True, height=None):
+        # Devuelve la página k (desde 0) de m filas en formato columnar
+        # {columna: [valores]}; row(block) -> dict con las columnas de una
+        # fila. `height` limita la consulta a los bloques [0, height).
+        if m < 1:
+            raise ValueError(f"Tamaño de página inválido: {m}")
+        heights = self._candidates(usuario, accion)
+        lo, hi = 0, len(heights)
+        if height is not None:
+            hi = bisect_left(heights, height, lo, hi)
+        if desde is not None:
+            lo = bisect_left(heights, str(desde), lo, hi, key=self._timestamp)
+        if hasta is not None:
+            hi = bisect_right(heights, str(hasta), lo, hi, key=self._timestamp)
+        total = hi - lo
+        pages = max((total + m - 1) // m, 1)
+        k = min(max(k, 0), pages - 1)
+        if newest_first:
+            start, stop = max(hi - (k + 1) * m, lo), hi - k * m
+            selected = range(stop - 1, start - 1, -1)
+        else:
+            start, stop = lo + k * m, min(lo + (k + 1) * m, hi)
+            selected = range(start, stop)
+        columns = {}
+        for i in selected:
+            for name, value in row(self.chain[heights[i]]).items():
+                columns.setdefault(name, []).append(value)
+        return Page(columns, total, k, pages)
@@ -0,0 +1,223 @@
+# ==========================================
+# EXPORTACIÓN DEL LEDGER EN STREAMING (CSV, JSONL, PARQUET)
+# ==========================================
+# Recorre la cadena bloque a bloque con generadores y escribe una fila por
+# transacción en lotes de `chunk` filas, así la memoria usada no depende del
+# tamaño del ledger. Los filtros por rango de fechas se resuelven con
+# búsqueda binaria (los timestamps crecen con la altura) y la exportación se
+# detiene al pasar `hasta`. Parquet requiere pyarrow (opcional).
+#
+#   python -m eco_core.export RUTA_LEDGER salida.csv [--usuario U ...] [--desde 2026-01-01] [--hasta 2026-01-31]
+#   python -m eco_core.export RUTA_LEDGER salida.jsonl.gz
+#   python -m eco_core.export RUTA_LEDGER salida.parquet --chunk 50000
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+from eco_core.block import EcoBlock
+from eco_core.store import LedgerStore, LedgerView
+
+# Columnas de la exportación; las claves desconocidas de una transacción
+# van a "extra" como JSON y una transacción que no es diccionario (p. ej.
+# el texto del bloque génesis) va a "dato"
+COLUMNAS = ("altura", "timestamp", "hash", "posicion", "usuario", "accion", "cantidad", "peso_kg",
+            "tokens", "costo", "ubicacion", "premio", "clave", "dato", "extra")
+_CAMPOS_TX = ("usuario", "accion", "cantidad", "peso_kg", "tokens", "costo", "ubicacion", "premio", "clave")
+
+FORMATOS = ("csv", "jsonl", "parquet")
+CHUNK = 10_000
+
+
+def _limite(valor, fin=False):
+    # Fecha, hora o texto ISO ("2026-01-05", "2026-01-05T10:30") llevado al
+    # formato con el que se guardan los timestamps ("2026-01-05 10:30:00")
+    # para compararlos como texto; una fecha sin hora como `hasta` incluye
+    # todo ese día
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        try:
+            valor = date.fromisoformat(valor) if len(valor) == 10 else datetime.fromisoformat(valor)
+        except ValueError:
+            raise ValueError(f"fecha u hora no ISO: {valor!r}") from None
+    if fin and isinstance(valor, date) and not isinstance(valor, datetime):
+        return f"{valor} 23:59:59.999999"
+    return str(valor)
+
+
+def _rango(chain, desde, hasta, height):
+    # Alturas [lo, hi) cuyos timestamps caen en el rango
+    lo, hi = 0, len(chain) if height is None else min(height, len(chain))
+
+    def timestamp(i):
+        return str(chain[i].timestamp)
+
+    if desde is not None:
+        lo = bisect_left(range(hi), desde, lo, hi, key=timestamp)
+    if hasta is not None:
+        hi = bisect_right(range(hi), hasta, lo, hi, key=timestamp)
+    return lo, hi
+
+
+def tx_row(block, posicion, tx):
+    row = dict.fromkeys(COLUMNAS)
+    row.update(altura=block.index, timestamp=str(block.timestamp), hash=block.hash, posicion=posicion)
+    if isinstance(tx, dict):
+        for campo in _CAMPOS_TX:
+            row[campo] = tx.get(campo)
+        extra = {k: v for k, v in tx.items() if k not in _CAMPOS_TX}
+        if extra:
+            row["extra"] = json.dumps(extra, ensure_ascii=False, default=str)
+    else:
+        row["dato"] = tx if isinstance(tx, str) else json.dumps(tx, ensure_ascii=False, default=str)
+    return row
+
+
+def iter_rows(chain, usuarios=None, desde=None, hasta=None, height=None):
+    # Una fila (diccionario con COLUMNAS) por transacción de los bloques
+    # filtrados. chain: lista de bloques, LedgerView o LedgerSnapshot.
+    usuarios = set(usuarios) if usuarios else None
+    lo, hi = _rango(chain, _limite(desde), _limite(hasta, fin=True), height)
+    for altura in range(lo, hi):
+        block = chain[altura]
+        for posicion, tx in enumerate(block.transactions()):
+            if usuarios is not None and not (isinstance(tx, dict) and tx.get("usuario") in usuarios):
+                continue
+            yield tx_row(block, posicion, tx)
+
+
+def iter_chunks(rows, chunk=CHUNK):
+    lote = []
+    for row in rows:
+        lote.append(row)
+        if len(lote) >= chunk:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _open_text(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=True)
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _close_text(f, path):
+    # La salida estándar no se cierra: se suelta el envoltorio
+    if path == "-":
+        f.flush()
+        f.detach()
+    else:
+        f.close()
+
+
+def _write_csv(chunks, path):
+    f = _open_text(path)
+    try:
+        writer = csv.DictWriter(f, COLUMNAS)
+        writer.writeheader()
+        for lote in chunks:
+            writer.writerows(lote)
+    finally:
+        _close_text(f, path)
+
+
+def _write_jsonl(chunks, path):
+    f = _open_text(path)
+    try:
+        for lote in chunks:
+            # Sin las columnas vacías, cada línea queda como la transacción original
+            f.write("".join(json.dumps({k: v for k, v in row.items() if v is not None},
+                                       ensure_ascii=False, default=str) + "\n" for row in lote))
+    finally:
+        _close_text(f, path)
+
+
+def _parquet_schema(pa):
+    tipos = {"altura": pa.int64(), "posicion": pa.int32(), "cantidad": pa.float64(),
+             "peso_kg": pa.float64(), "tokens": pa.float64(), "costo": pa.float64()}
+    return pa.schema([(c, tipos.get(c, pa.string())) for c in COLUMNAS])
+
+
+def _write_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("exportar a Parquet requiere pyarrow (pip install pyarrow)") from None
+    schema = _parquet_schema(pa)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for lote in chunks:
+            # Un row group por lote
+            columnas = {c: [row[c] for row in lote] for c in COLUMNAS}
+            for c in ("usuario", "accion", "ubicacion", "premio", "clave"):
+                columnas[c] = [None if v is None else str(v) for v in columnas[c]]
+            writer.write_table(pa.table(columnas, schema=schema))
+
+
+_ESCRITORES = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def formato_de(path):
+    nombre = path[:-3] if path.endswith(".gz") else path
+    for formato in FORMATOS:
+        if nombre.endswith("." + formato):
+            return formato
+    if nombre.endswith(".json") or nombre.endswith(".ndjson"):
+        return "jsonl"
+    raise ValueError(f"No se reconoce el formato de {path}; use --formato")
+
+
+def export(chain, path, formato=None, usuarios=None, desde=None, hasta=None, height=None, chunk=CHUNK):
+    # Escribe las transacciones filtradas en `path` ("-" = salida estándar
+    # para csv/jsonl; sufijo .gz comprime) y devuelve cuántas filas escribió
+    formato = formato or formato_de(path)
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato desconocido: {formato}")
+    filas = 0
+
+    def contar(chunks):
+        nonlocal filas
+        for lote in chunks:
+            filas += len(lote)
+            yield lote
+
+    rows = iter_rows(chain, usuarios, desde, hasta, height)
+    _ESCRITORES[formato](contar(iter_chunks(rows, chunk)), path)
+    return filas
+
+
+def export_store(ledger_path, path, **kwargs):
+    # Exporta un ledger persistido, abierto en solo lectura (no interfiere con el servidor)
+    with LedgerStore(ledger_path, readonly=True) as store:
+        return export(LedgerView(store, EcoBlock.from_record), path, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta las transacciones del ledger a CSV, JSONL o Parquet")
+    parser.add_argument("ledger", help="directorio del ledger persistido (p. ej. $ECOG_LEDGER_DIR/eco_guayaquil)")
+    parser.add_argument("salida", help="archivo de salida (.csv, .jsonl, .parquet; .gz para comprimir; - = stdout)")
+    parser.add_argument("--formato", choices=FORMATOS)
+    parser.add_argument("--usuario", action="append", dest="usuarios", help="solo este usuario (repetible)")
+    parser.add_argument("--desde", help="fecha u hora inicial (ISO)")
+    parser.add_argument("--hasta", help="fecha u hora final (ISO; una fecha incluye todo el día)")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="filas por lote")
+    args = parser.parse_args()
+    began = time.perf_counter()
+    filas = export_store(args.ledger, args.salida, formato=args.formato, usuarios=args.usuarios,
+                         desde=args.desde, hasta=args.hasta, chunk=args.chunk)
+    if args.salida != "-":
+        print(f"{filas:,} filas en {args.salida} ({time.perf_counter() - began:.1f} s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
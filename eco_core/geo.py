@@ -0,0 +1,191 @@
+# ==========================================
+# ÍNDICE ESPACIAL DE PUNTOS DE ACOPIO
+# ==========================================
+# Rejilla uniforme en grados (celdas de ~1 km en Guayaquil): cada
+# contenedor cae en una celda, así que "los k más cercanos" recorre anillos
+# de celdas alrededor del usuario y "los que están en pantalla" solo visita
+# las celdas que tocan el recuadro visible. Con miles de contenedores las
+# consultas tocan unas pocas celdas en lugar de toda la lista.
+import csv
+import heapq
+import math
+from collections import namedtuple
+
+from eco_core.metrics import timed
+
+CollectionPoint = namedtuple("CollectionPoint", ["id", "nombre", "lat", "lon", "disponible"])
+
+# Puntos conocidos (coordenadas reales aproximadas de Guayaquil)
+PUNTOS_GUAYAQUIL = [
+    CollectionPoint("malecon", "Malecón 2000", -2.1894, -79.8891, True),
+    CollectionPoint("samanes", "Parque Samanes", -2.1450, -79.9000, True),
+    CollectionPoint("centenario", "Parque Centenario", -2.1500, -79.8900, False),
+    CollectionPoint("itso", "ITSO (Campus)", -2.1980, -79.8950, True),
+]
+
+# Recuadro (lat_min, lon_min, lat_max, lon_max) del área metropolitana en el
+# que se puede centrar el mapa
+LIMITES_GUAYAQUIL = (-2.50, -80.20, -1.90, -79.60)
+
+RADIO_TIERRA_M = 6_371_000
+METROS_POR_GRADO = math.pi * RADIO_TIERRA_M / 180
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    # Distancia haversine en metros
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RADIO_TIERRA_M * math.asin(math.sqrt(a))
+
+
+def bbox_for_view(lat, lon, zoom, width_px=700, height_px=450):
+    # Recuadro (min_lat, min_lon, max_lat, max_lon) que muestra un mapa web
+    # (teselas de 256 px) centrado en (lat, lon) con el zoom dado
+    grados_por_px = 360 / (256 * 2 ** zoom)
+    half_lon = width_px / 2 * grados_por_px
+    half_lat = height_px / 2 * grados_por_px * math.cos(math.radians(lat))
+    return lat - half_lat, lon - half_lon, lat + half_lat, lon + half_lon
+
+
+def load_points_csv(path):
+    # CSV con columnas id, nombre, lat, lon y (opcional) disponible
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield CollectionPoint(
+                row["id"], row["nombre"], float(row["lat"]), float(row["lon"]),
+                row.get("disponible", "1").strip().lower() not in ("0", "false", "no"),
+            )
+
+
+class GridIndex:
+    def __init__(self, points=(), cell_deg=0.01):
+        self.cell_deg = cell_deg
+        self._cells = {}
+        self._points = {}
+        # Celdas extremas ocupadas (fila mín., col. mín., fila máx., col. máx.),
+        # mantenidas al añadir; quitar una celda del borde solo las marca para
+        # recalcularlas en la siguiente consulta
+        self._bounds = None
+        self._bounds_stale = False
+        for point in points:
+            self.add(point)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def add(self, point):
+        if point.id in self._points:
+            self.remove(point.id)
+        self._points[point.id] = point
+        row, col = cell = self._cell(point.lat, point.lon)
+        self._cells.setdefault(cell, {})[point.id] = point
+        if self._bounds is None:
+            self._bounds = (row, col, row, col)
+        else:
+            r0, c0, r1, c1 = self._bounds
+            self._bounds = (min(r0, row), min(c0, col), max(r1, row), max(c1, col))
+
+    def remove(self, point_id):
+        point = self._points.pop(point_id)
+        cell = self._cell(point.lat, point.lon)
+        del self._cells[cell][point_id]
+        if not self._cells[cell]:
+            del self._cells[cell]
+            r0, c0, r1, c1 = self._bounds
+            if cell[0] in (r0, r1) or cell[1] in (c0, c1):
+                self._bounds_stale = True
+
+    def get(self, point_id):
+        return self._points.get(point_id)
+
+    def _grid_bounds(self):
+        if self._bounds_stale:
+            cells = list(self._cells)
+            rows = [r for r, _ in cells]
+            cols = [c for _, c in cells]
+            self._bounds = (min(rows), min(cols), max(rows), max(cols))
+            self._bounds_stale = False
+        return self._bounds
+
+    def __iter__(self):
+        return iter(list(self._points.values()))
+
+    def set_available(self, point_id, disponible):
+        # Reemplazo en el mismo sitio (sin cambiar el tamaño de los dict), así
+        # las consultas de otros hilos pueden seguir recorriendo las celdas
+        point = self._points[point_id]
+        if point.disponible != disponible:
+            point = point._replace(disponible=disponible)
+            self._points[point_id] = point
+            self._cells[self._cell(point.lat, point.lon)][point_id] = point
+
+    @timed("geo_in_bbox")
+    def in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        (r0, c0), (r1, c1) = self._cell(min_lat, min_lon), self._cell(max_lat, max_lon)
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._cells):
+            # Recuadro más grande que la ciudad: se recorren solo las celdas ocupadas
+            cells = (pts for (r, c), pts in self._cells.items() if r0 <= r <= r1 and c0 <= c <= c1)
+        else:
+            cells = (self._cells[(r, c)] for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)
+                     if (r, c) in self._cells)
+        return [p for pts in cells for p in pts.values()
+                if min_lat <= p.lat <= max_lat and min_lon <= p.lon <= max_lon]
+
+    @timed("geo_nearest")
+    def nearest(self, lat, lon, k=5, solo_disponibles=True, max_m=None):
+        # Los k puntos más cercanos como lista de (metros, punto). Se recorren
+        # anillos de celdas y se para cuando el siguiente anillo ya no puede
+        # contener nada más cerca que el k-ésimo encontrado. Cuando un anillo
+        # tiene más celdas que las ocupadas (consulta lejos de la ciudad o
+        # menos de k puntos alcanzables) se recorren de una vez las celdas
+        # ocupadas que faltan, como en in_bbox.
+        if not self._cells:
+            return []
+        row, col = self._cell(lat, lon)
+        # Distancia mínima que añade cada anillo (los grados de longitud se
+        # acortan con la latitud)
+        paso_m = self.cell_deg * METROS_POR_GRADO * max(math.cos(math.radians(abs(lat) + self.cell_deg)), 0.01)
+        r0, c0, r1, c1 = self._grid_bounds()
+        # Los anillos anteriores al recuadro de celdas ocupadas están vacíos
+        first_ring = max(r0 - row, row - r1, c0 - col, col - c1, 0)
+        max_ring = max(abs(row - r0), abs(row - r1), abs(col - c0), abs(col - c1))
+        best = []  # heap de (-distancia, id, punto) con los k mejores
+        for ring in range(first_ring, max_ring + 1):
+            limite = (ring - 1) * paso_m if ring else 0.0
+            if (len(best) == k and limite > -best[0][0]) or (max_m is not None and limite > max_m):
+                break
+            resto = 8 * ring > len(self._cells)
+            if resto:
+                cells = [pts for (r, c), pts in self._cells.items() if max(abs(r - row), abs(c - col)) >= ring]
+            else:
+                cells = [self._cells[cell] for cell in self._ring(row, col, ring) if cell in self._cells]
+            for pts in cells:
+                for point in pts.values():
+                    if solo_disponibles and not point.disponible:
+                        continue
+                    d = distance_m(lat, lon, point.lat, point.lon)
+                    if max_m is not None and d > max_m:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, point.id, point))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, point.id, point))
+            if resto:
+                break
+        return [(-d, point) for d, _, point in sorted(best, reverse=True)]
+
+    @staticmethod
+    def _ring(row, col, ring):
+        if ring == 0:
+            yield row, col
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield row - ring, c
+            yield row + ring, c
+        for r in range(row - ring + 1, row + ring):
+            yield r, col - ring
+            yield r, col + ring
@@ -0,0 +1,193 @@
+# ==========================================
+# INGESTA DE DEPÓSITOS IoT (NO BLOQUEANTE)
+# ==========================================
+# Los contenedores envían lecturas (peso, cantidad, ubicación); submit()
+# las valida y encola sin bloquear y devuelve un ticket. Un único hilo
+# escritor las agrupa en lotes y los confirma en el ledger con una sola
+# llamada commit(lote) por lote. La interfaz consulta el estado del ticket.
+# Con un DedupeIndex, una lectura repetida (mismo sensor, reading_id y
+# timestamp) se rechaza al recibirla, antes de encolarse.
+import itertools
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+BOTELLAS_POR_KG = 20      # aprox. 20 botellas PET por kg
+TOKENS_POR_BOTELLA = 0.5
+PESO_MAXIMO_KG = 50.0     # un depósito mayor se considera lectura errónea
+
+SensorReading = namedtuple("SensorReading", ["sensor", "usuario", "peso_kg", "cantidad", "timestamp", "reading_id"],
+                           defaults=(None, None, None))
+
+EN_COLA = "en cola"
+CONFIRMADO = "confirmado"
+RECHAZADO = "rechazado"
+DUPLICADA = "lectura duplicada"
+
+
+class Ticket:
+    __slots__ = ("id", "reading", "status", "block", "error")
+
+    def __init__(self, id, reading):
+        self.id = id
+        self.reading = reading
+        self.status = EN_COLA
+        self.block = None
+        self.error = None
+
+
+def validate_reading(reading):
+    # Devuelve el motivo de rechazo o None si la lectura es válida
+    if not reading.sensor or not reading.usuario:
+        return "lectura sin sensor o sin usuario"
+    if not isinstance(reading.peso_kg, (int, float)) or isinstance(reading.peso_kg, bool):
+        return f"peso no numérico: {reading.peso_kg!r}"
+    if not 0 < reading.peso_kg <= PESO_MAXIMO_KG:
+        return f"peso fuera de rango: {reading.peso_kg} kg"
+    if reading.cantidad is not None and (not isinstance(reading.cantidad, int)
+                                         or isinstance(reading.cantidad, bool)):
+        return f"cantidad no entera: {reading.cantidad!r}"
+    if reading.cantidad is not None and reading.cantidad < 0:
+        return f"cantidad negativa: {reading.cantidad}"
+    return None
+
+
+def reading_to_tx(reading):
+    botellas = reading.cantidad if reading.cantidad is not None else int(reading.peso_kg * BOTELLAS_POR_KG)
+    tx = {
+        "usuario": reading.usuario,
+        "accion": "Reciclaje PET",
+        "cantidad": botellas,
+        "peso_kg": reading.peso_kg,
+        "tokens": botellas * TOKENS_POR_BOTELLA,
+        "ubicacion": reading.sensor,
+    }
+    if reading.reading_id is not None:
+        # Trazabilidad: la lectura del contenedor que originó el depósito
+        tx["lectura"] = reading.reading_id
+    return tx
+
+
+class IngestionService:
+    def __init__(self, commit, batch_size=64, batch_wait=0.5, max_queue=10000, max_tickets=10000, dedupe=None):
+        # commit(lecturas) confirma un lote en el ledger y devuelve el bloque
+        # (o la lista de bloques, uno por lectura) resultante
+        self.commit = commit
+        self.dedupe = dedupe
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_tickets = max_tickets
+        self._queue = queue.Queue(max_queue)
+        self._tickets = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="eco-ingesta", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, reading):
+        ticket = Ticket(next(self._ids), reading)
+        ticket.error = validate_reading(reading)
+        if ticket.error is None and self.dedupe is not None and not self.dedupe.check_and_add(reading):
+            ticket.error = DUPLICADA
+        if ticket.error is None:
+            try:
+                self._queue.put_nowait(ticket)
+            except queue.Full:
+                ticket.error = "cola de ingesta llena"
+                self._forget([reading])
+        if ticket.error is not None:
+            ticket.status = RECHAZADO
+        with self._lock:
+            self._tickets[ticket.id] = ticket
+            # Se olvidan los tickets más antiguos para acotar la memoria
+            while len(self._tickets) > self.max_tickets:
+                self._tickets.popitem(last=False)
+        return ticket.id
+
+    def _forget(self, readings):
+        # Una lectura que no se confirmó puede reintentarse
+        if self.dedupe is not None:
+            for reading in readings:
+                self.dedupe.forget(reading)
+
+    def status(self, ticket_id):
+        with self._lock:
+            return self._tickets.get(ticket_id)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.batch_wait)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            result = self.commit([ticket.reading for ticket in batch])
+        except Exception as exc:  # un lote fallido no detiene el servicio
+            for ticket in batch:
+                ticket.status, ticket.error = RECHAZADO, str(exc)
+            self._forget([ticket.reading for ticket in batch])
+            return
+        blocks = result if isinstance(result, list) else [result] * len(batch)
+        for ticket, block in zip(batch, blocks):
+            ticket.block = block.index
+            ticket.status = CONFIRMADO
+
+
+# --- Sensores simulados (sin hardware, para pruebas locales) ---
+class SimulatedSensorFeed:
+    def __init__(self, sensors=("Sensor_ITSO_01",), seed=None):
+        self.sensors = list(sensors)
+        self.random = random.Random(seed)
+
+    def read(self, usuario, sensor=None):
+        return SensorReading(
+            sensor or self.random.choice(self.sensors),
+            usuario,
+            round(self.random.uniform(0.1, 2.0), 2),
+            timestamp=str(datetime.now()),
+            reading_id=f"{self.random.getrandbits(64):016x}",
+        )
+
+    def run(self, service, usuarios, count, interval=0.0):
+        # Envía `count` lecturas desde contenedores al azar y devuelve los tickets
+        tickets = []
+        for _ in range(count):
+            tickets.append(service.submit(self.read(self.random.choice(usuarios))))
+            if interval:
+                time.sleep(interval)
+        return tickets
@@ -0,0 +1,202 @@
+# ==========================================
+# CLASIFICACIÓN (LEADERBOARD) Y NIVELES
+# ==========================================
+# Ranking de ciudadanos por botellas recicladas en tres ventanas: toda la
+# ciudad, por contenedor (sensor) y por semana. Se actualiza bloque a bloque
+# como los demás índices del ledger. Cada ranking guarda la lista ordenada
+# de los puntajes de todos sus usuarios (la posición de uno es una búsqueda
+# binaria; la memoria depende de cuántos usuarios hay, no del puntaje más
+# alto) y la lista ordenada de puntajes distintos para recorrer el top-k sin
+# ordenar a todos los usuarios. Solo cuentan cantidades enteras positivas.
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from datetime import datetime
+
+from eco_core.metrics import timed
+
+# Tabla de niveles: (botellas mínimas, nombre)
+NIVELES = (
+    (0, "🌱 Reciclador Novato"),
+    (50, "🌿 Explorador Ambiental"),
+    (150, "🌳 Guardián del Guayas"),
+    (300, "👑 Maestro del Reciclaje"),
+)
+META_MAXIMA = 1000   # meta mostrada cuando ya se alcanzó el último nivel
+_UMBRALES = [minimo for minimo, _ in NIVELES]
+
+SEMANAS_GUARDADAS = 8
+
+
+def calcular_nivel(botellas):
+    # (nombre del nivel, botellas para el siguiente); un conteo negativo cuenta como 0
+    i = bisect_right(_UMBRALES, max(botellas, 0)) - 1
+    meta = _UMBRALES[i + 1] if i + 1 < len(_UMBRALES) else META_MAXIMA
+    return NIVELES[max(i, 0)][1], meta
+
+
+def semana_de(timestamp):
+    # Clave ISO "2026-W42" de la marca de tiempo del bloque, o None si no se entiende
+    try:
+        anio, semana, _ = datetime.fromisoformat(str(timestamp)[:19]).isocalendar()
+    except ValueError:
+        return None
+    return f"{anio}-W{semana:02d}"
+
+
+def _botellas(cantidad):
+    # Una cantidad no entera en un bloque ya sellado no puntúa (y no impide
+    # aplicar el bloque)
+    if isinstance(cantidad, int) and not isinstance(cantidad, bool):
+        return cantidad
+    return 0
+
+
+class Ranking:
+    def __init__(self):
+        self._scores = {}      # usuario -> botellas
+        self._buckets = {}     # botellas -> {usuarios}
+        self._distinct = []    # puntajes distintos, ascendente
+        self._sorted = []      # un puntaje por usuario, ascendente
+
+    def __len__(self):
+        return len(self._scores)
+
+    @classmethod
+    def from_scores(cls, scores):
+        # Reconstruye buckets, puntajes distintos y conteos desde {usuario: botellas}
+        ranking = cls()
+        ranking._scores = {u: s for u, s in scores.items() if s > 0}
+        for usuario, score in ranking._scores.items():
+            ranking._buckets.setdefault(score, set()).add(usuario)
+        ranking._distinct = sorted(ranking._buckets)
+        ranking._sorted = sorted(ranking._scores.values())
+        return ranking
+
+    def scores(self):
+        return dict(self._scores)
+
+    def add(self, usuario, botellas):
+        old = self._scores.get(usuario, 0)
+        new = old + botellas
+        if new == old:
+            return
+        if old:
+            self._leave(usuario, old)
+        if new > 0:
+            self._scores[usuario] = new
+            bucket = self._buckets.get(new)
+            if bucket is None:
+                bucket = self._buckets[new] = set()
+                insort(self._distinct, new)
+            bucket.add(usuario)
+            insort(self._sorted, new)
+        else:
+            self._scores.pop(usuario, None)
+
+    def _leave(self, usuario, score):
+        bucket = self._buckets[score]
+        bucket.discard(usuario)
+        if not bucket:
+            del self._buckets[score]
+            del self._distinct[bisect_left(self._distinct, score)]
+        del self._sorted[bisect_left(self._sorted, score)]
+
+    def score(self, usuario):
+        return self._scores.get(usuario, 0)
+
+    def rank(self, usuario):
+        # Posición (1 = primero; empates comparten posición) o None si no participa
+        score = self._scores.get(usuario)
+        if score is None:
+            return None
+        return len(self._sorted) - bisect_right(self._sorted, score) + 1
+
+    def top(self, k):
+        # [(posición, usuario, botellas)] de los k primeros
+        out = []
+        for score in reversed(self._distinct):
+            position = len(out) + 1
+            for usuario in sorted(self._buckets[score]):
+                if len(out) == k:
+                    return out
+                out.append((position, usuario, score))
+        return out
+
+
+class Leaderboard:
+    def __init__(self, semanas=SEMANAS_GUARDADAS):
+        self.height = 0
+        self.semanas = semanas
+        self.city = Ranking()
+        self.sensors = {}
+        self.weeks = OrderedDict()   # semana -> Ranking, de la más antigua a la más reciente
+        # Las consultas llegan desde otras sesiones mientras el escritor aplica bloques
+        self._lock = threading.Lock()
+
+    def apply(self, block):
+        if block.index < self.height:
+            return
+        depositos = [tx for tx in block.transactions() if isinstance(tx, dict) and "usuario" in tx
+                     and _botellas(tx.get("cantidad")) > 0]
+        if depositos:
+            semana = semana_de(block.timestamp)
+            with self._lock:
+                for tx in depositos:
+                    self.city.add(tx["usuario"], tx["cantidad"])
+                    if tx.get("ubicacion"):
+                        self.sensors.setdefault(tx["ubicacion"], Ranking()).add(tx["usuario"], tx["cantidad"])
+                    if semana:
+                        self._week(semana).add(tx["usuario"], tx["cantidad"])
+        self.height = block.index + 1
+
+    def _week(self, semana):
+        ranking = self.weeks.get(semana)
+        if ranking is None:
+            ranking = self.weeks[semana] = Ranking()
+            # Solo se guardan las últimas semanas (las claves ISO ordenan como fechas)
+            if list(self.weeks) != sorted(self.weeks):
+                self.weeks = OrderedDict(sorted(self.weeks.items()))
+            while len(self.weeks) > self.semanas:
+                self.weeks.popitem(last=False)
+        return ranking
+
+    def state(self):
+        # Solo los puntajes: el resto de cada ranking se reconstruye al cargar
+        with self._lock:
+            return {
+                "height": self.height,
+                "city": self.city.scores(),
+                "sensors": {s: r.scores() for s, r in self.sensors.items()},
+                "weeks": [(w, r.scores()) for w, r in self.weeks.items()],
+            }
+
+    def load_state(self, state):
+        with self._lock:
+            self.city = Ranking.from_scores(state["city"])
+            self.sensors = {s: Ranking.from_scores(p) for s, p in state["sensors"].items()}
+            self.weeks = OrderedDict((w, Ranking.from_scores(p)) for w, p in state["weeks"])
+            self.height = state["height"]
+
+    def ranking(self, sensor=None, semana=None):
+        # Ranking de la ciudad, de un sensor o de una semana ("actual" = la última con depósitos)
+        if sensor is not None:
+            return self.sensors.get(sensor) or Ranking()
+        if semana == "actual":
+            semana = next(reversed(self.weeks), None)
+        if semana is not None:
+            return self.weeks.get(semana) or Ranking()
+        return self.city
+
+    @timed("leaderboard_top")
+    def top(self, k=10, sensor=None, semana=None):
+        with self._lock:
+            return self.ranking(sensor, semana).top(k)
+
+    @timed("leaderboard_rank")
+    def rank(self, usuario, sensor=None, semana=None):
+        # (posición, participantes, botellas) o None si el usuario no participa
+        with self._lock:
+            ranking = self.ranking(sensor, semana)
+            position = ranking.rank(usuario)
+            return None if position is None else (position, len(ranking), ranking.score(usuario))
@@ -0,0 +1,463 @@
+# ==========================================
+# LEDGER COMPARTIDO (EcoBlockchain)
+# ==========================================
+# Una sola cadena por proceso de servidor, compartida por todas las
+# sesiones. Las escrituras (bloques, lotes, ingesta IoT) pasan por un único
+# candado; las lecturas usan snapshot(), que fija una altura y lee sin
+# candado: la cadena y sus índices solo crecen y la altura se publica
+# después de aplicar cada bloque a los índices.
+# Con almacén persistente, el estado de los índices se guarda cada
+# SNAPSHOT_INTERVAL bloques (eco_core/snapshots.py) y al arrancar solo se
+# aplican los bloques posteriores al último snapshot.
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from eco_core import snapshots
+from eco_core.analytics import ImpactAnalytics
+from eco_core.balances import BalanceIndex, block_movements, movement_from_tx
+from eco_core.block import EcoBlock
+from eco_core.explorer import BlockExplorer, block_keys
+from eco_core.leaderboard import Leaderboard
+from eco_core.merkle import SealPolicy, merkle_proof, merkle_root
+from eco_core.metrics import timed
+from eco_core.redemption import RedemptionIndex
+from eco_core.store import LedgerView
+
+
+def _fingerprint(block_hash):
+    return int(block_hash[:16], 16)
+
+
+class EcoBlockchain:
+    # Cada cuántos bloques se guarda un hash de control (checkpoint)
+    CHECKPOINT_INTERVAL = 64
+    # Bloques ya verificados que cada validación incremental vuelve a
+    # comprobar, en barrido circular: una edición en sitio de un bloque
+    # antiguo se detecta tras unas pocas validaciones
+    REVERIFY_BATCH = 128
+    # Solo con almacén: bloques entre snapshots automáticos (0 = solo
+    # save_snapshot) y si tras cada uno se comprimen los segmentos fríos
+    SNAPSHOT_INTERVAL = 50_000
+    ARCHIVE_SEGMENTS = False
+
+    def __init__(self, store=None, seal_policy=None, genesis_data="Bloque Génesis - EcoGuayaquil"):
+        self.genesis_data = genesis_data
+        self.store = store
+        if store is None:
+            self.chain = [self.create_genesis_block()]
+        else:
+            # Cadena persistente: los bloques se leen del disco bajo demanda
+            self.chain = LedgerView(store, EcoBlock.from_record)
+            if len(self.chain) == 0:
+                self.chain.append(self.create_genesis_block())
+        self._snapshot_thread = None
+        self._build_indexes()
+        # Transacciones en espera de ser selladas en un bloque por lotes
+        self.seal_policy = seal_policy or SealPolicy()
+        self.pending = []
+        self._pending_tokens = {}   # usuario -> tokens de las transacciones pendientes
+        self._pending_since = 0.0
+        self._sealer = None
+        self._sealer_stopping = threading.Event()
+        # Un solo escritor a la vez (sesiones e ingesta IoT comparten la
+        # cadena); las lecturas no toman este candado
+        self.lock = threading.RLock()
+        self._validation_lock = threading.Lock()
+        self._last_valid = True
+        # Altura publicada: bloques ya añadidos y aplicados a los índices
+        self.height = len(self.chain)
+
+    def _build_indexes(self):
+        # Saldos por usuario, índice del explorador, clasificación, analítica y canjes,
+        # mantenidos al añadir cada bloque y reconstruidos aquí en una sola pasada
+        # (desde el último snapshot válido, si lo hay). Contrato de un índice:
+        # apply(block) recibe los bloques en orden de altura e ignora uno ya
+        # aplicado (block.index < index.height); state() / load_state() copian
+        # y restauran su estado para los snapshots.
+        self.balances = BalanceIndex(block_movements)
+        self.explorer = BlockExplorer(self.chain, block_keys)
+        self.leaderboard = Leaderboard()
+        self.analytics = ImpactAnalytics()
+        self.redemptions = RedemptionIndex()
+        self.indexes = [self.balances, self.explorer, self.leaderboard, self.analytics, self.redemptions]
+        # Marca de agua: los bloques [0, verified_height) ya fueron verificados
+        self.verified_height = 1
+        # Checkpoints {altura: hash verificado}, usados para bisección ante manipulación
+        self.checkpoints = {0: self.chain[0].hash} if len(self.chain) else {}
+        # Huella (primeros 8 bytes del hash) de cada bloque al verificarlo:
+        # permite señalar el primer bloque reescrito, no solo su checkpoint
+        self._fingerprints = array("Q", [_fingerprint(self.chain[0].hash)] if len(self.chain) else [])
+        self._reverify_at = 1
+        self._snapshot_height = 0
+        start = self._load_snapshot() if self.store is not None else 0
+        for height in range(start, len(self.chain)):
+            block = self.chain[height]
+            for index in self.indexes:
+                index.apply(block)
+
+    def create_genesis_block(self):
+        return EcoBlock(0, datetime.now(), self.genesis_data, "0")
+
+    def get_latest_block(self):
+        return self.chain[-1]
+
+    def _tip_hash(self):
+        # Con almacén se lee solo el hash de la punta, sin decodificar el bloque
+        if self.store is not None:
+            return self.store.read_hash(len(self.chain) - 1)
+        return self.chain[-1].hash
+
+    @timed("add_block")
+    def add_block(self, new_block):
+        with self.lock:
+            # El índice se asigna aquí, bajo el candado, no al crear el bloque
+            new_block.index = len(self.chain)
+            new_block.previous_hash = self._tip_hash()
+            new_block.hash = new_block.calculate_hash()
+            return self._append(new_block)
+
+    def _append(self, block):
+        height = len(self.chain)
+        self.chain.append(block)
+        try:
+            for index in self.indexes:
+                index.apply(block)
+        except Exception:
+            # Un índice rechazó el bloque a medio aplicar: se descarta y los
+            # índices vuelven a la altura anterior, para que ningún índice
+            # conserve efectos (tokens acreditados) de un bloque no publicado
+            self._rollback(height)
+            raise
+        self.height = len(self.chain)
+        if (self.store is not None and self.SNAPSHOT_INTERVAL
+                and self.height - self._snapshot_height >= self.SNAPSHOT_INTERVAL):
+            self.save_snapshot(wait=False)
+        return block
+
+    @timed("append_block")
+    def append_block(self, block):
+        # Bloque ya sellado en otro nodo (réplica): no se reasignan índice ni
+        # enlace, se verifican. ValueError si no continúa esta cadena.
+        with self.lock:
+            if block.index != len(self.chain):
+                raise ValueError(f"se esperaba el bloque {len(self.chain)}, llegó el {block.index}")
+            if len(self.chain) and block.previous_hash != self._tip_hash():
+                raise ValueError(f"el bloque {block.index} no enlaza con la punta de la cadena")
+            if block.hash != block.calculate_hash():
+                raise ValueError(f"el hash del bloque {block.index} no coincide con su contenido")
+            return self._append(block)
+
+    def truncate(self, height):
+        # Descarta los bloques [height, n) y reconstruye los índices (réplica
+        # que divergió del líder). Las lecturas en curso sobre los bloques
+        # descartados pueden fallar con IndexError.
+        with self.lock:
+            if not 0 <= height <= len(self.chain):
+                raise ValueError("altura fuera del ledger")
+            if self._snapshot_thread is not None:
+                self._snapshot_thread.join()
+            self.height = min(self.height, height)
+            self._discard(height)
+            self.pending = []
+            self._pending_tokens = {}
+            self._build_indexes()
+            self.height = len(self.chain)
+
+    def _discard(self, height):
+        if self.store is not None:
+            self.store.truncate(height)
+        else:
+            del self.chain[height:]
+
+    def _rollback(self, height):
+        # Quita el bloque recién escrito y reconstruye los índices; la
+        # verificación ya hecha de los bloques anteriores sigue valiendo
+        verificado = (self.verified_height, self.checkpoints, self._fingerprints, self._reverify_at)
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self._discard(height)
+        self._build_indexes()
+        self.verified_height, self.checkpoints, self._fingerprints, self._reverify_at = verificado
+
+    def snapshot(self):
+        return LedgerSnapshot(self, self.height)
+
+    # --- Snapshots del estado de los índices ---
+    def _load_snapshot(self):
+        # Carga el snapshot más reciente que coincide con la cadena en disco y
+        # devuelve la altura desde la que hay que aplicar bloques
+        nombres = sorted(type(index).__name__ for index in self.indexes)
+
+        def accept(cabecera):
+            return (cabecera["indices"] == nombres
+                    and self.store.read_hash(cabecera["altura"] - 1) == cabecera["hash"])
+
+        cargado = snapshots.load_latest(snapshots.snapshot_dir(self.store.path), accept, len(self.chain))
+        if cargado is None:
+            return 0
+        cabecera, estados, extra = cargado
+        for index in self.indexes:
+            index.load_state(estados[type(index).__name__])
+        self.checkpoints.update(extra["checkpoints"])
+        self._fingerprints = extra.get("fingerprints", self._fingerprints)
+        self.verified_height = min(extra["verified_height"], len(self._fingerprints))
+        self._snapshot_height = cabecera["altura"]
+        return cabecera["altura"]
+
+    @timed("save_snapshot")
+    def save_snapshot(self, wait=True, archive=None):
+        # El estado se copia bajo el candado (copias de arrays y diccionarios);
+        # serializar, comprimir y escribir ocurre en un hilo aparte. Con
+        # wait=False no se encola un segundo snapshot si ya hay uno en curso.
+        if self.store is None:
+            raise ValueError("los snapshots requieren un ledger persistente")
+        if not wait and self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return None
+        with self.lock:
+            if self._snapshot_thread is not None:
+                self._snapshot_thread.join()
+            height = self.height
+            # El snapshot no debe apuntar a bloques que aún no llegaron al disco
+            self.store.flush()
+            estados = {type(index).__name__: index.state() for index in self.indexes}
+            extra = {
+                "checkpoints": {h: v for h, v in self.checkpoints.items() if h < height},
+                "verified_height": min(self.verified_height, height),
+                "fingerprints": self._fingerprints[:height],
+            }
+            block_hash = self.store.read_hash(height - 1)
+            self._snapshot_height = height
+            self._snapshot_thread = threading.Thread(
+                target=self._write_snapshot, args=(height, block_hash, estados, extra, archive),
+                name="ecog-snapshot", daemon=True)
+            self._snapshot_thread.start()
+        if wait:
+            self._snapshot_thread.join()
+        return height
+
+    def _write_snapshot(self, height, block_hash, estados, extra, archive):
+        directory = snapshots.snapshot_dir(self.store.path)
+        snapshots.write_snapshot(directory, height, block_hash, estados, extra)
+        snapshots.prune(directory)
+        if self.ARCHIVE_SEGMENTS if archive is None else archive:
+            self.store.archive(height)
+
+    def add_transaction(self, tx):
+        # Encola la transacción; el bloque se sella según la política
+        with self.lock:
+            if not self.pending:
+                self._pending_since = time.monotonic()
+            self.pending.append(tx)
+            m = movement_from_tx(tx)
+            if m:
+                self._pending_tokens[m.usuario] = self._pending_tokens.get(m.usuario, 0.0) + m.tokens
+            return self.seal_if_due()
+
+    @timed("add_transaction_block")
+    def add_transaction_block(self, tx, timestamp=None):
+        # Una transacción en su propio bloque (formato de app.py)
+        return self.add_block(EcoBlock(None, timestamp or datetime.now(), tx))
+
+    @timed("commit_batch")
+    def commit_batch(self, txs):
+        # Confirma un lote completo en un solo bloque (ingesta IoT)
+        with self.lock:
+            self.pending.extend(txs)
+            return self.seal_block()
+
+    def start_sealer(self, interval=1.0):
+        # Hilo que sella el lote pendiente al cumplir max_age aunque no
+        # lleguen más transacciones ni recargas de la página
+        if self._sealer is None:
+            self._sealer_stopping.clear()
+            self._sealer = threading.Thread(target=self._seal_loop, args=(interval,), name="ecog-sellado",
+                                            daemon=True)
+            self._sealer.start()
+        return self
+
+    def stop_sealer(self, timeout=None):
+        self._sealer_stopping.set()
+        if self._sealer is not None:
+            self._sealer.join(timeout)
+            self._sealer = None
+
+    def _seal_loop(self, interval):
+        while not self._sealer_stopping.wait(interval):
+            self.seal_if_due()
+
+    def seal_if_due(self):
+        with self.lock:
+            if self.seal_policy.due(len(self.pending), self._pending_since):
+                return self.seal_block()
+            return None
+
+    @timed("seal_block")
+    def seal_block(self):
+        with self.lock:
+            if not self.pending:
+                return None
+            txs, self.pending = self.pending, []
+            self._pending_tokens = {}
+            return self.add_block(EcoBlock(None, datetime.now(), txs))
+
+    def pending_balance(self, usuario):
+        # Saldo confirmado más el efecto de las transacciones aún sin sellar.
+        # Sin candado: seal_block reemplaza el diccionario en vez de vaciarlo.
+        return self.balances.balance(usuario) + self._pending_tokens.get(usuario, 0.0)
+
+    @timed("get_proof")
+    def get_proof(self, height, position):
+        # Prueba de inclusión de la transacción `position` del bloque `height`.
+        # Lleva la cabecera del bloque y su hash guardado (no uno recalculado):
+        # verify_inclusion comprueba que la raíz reconstruye ese hash.
+        block = self.chain[height]
+        txs = block.transactions()
+        return {
+            "tx": txs[position],
+            "proof": merkle_proof(txs, position),
+            "merkle_root": merkle_root(txs),
+            "lote": isinstance(block.data, list),
+            "index": block.index,
+            "timestamp": block.timestamp,
+            "previous_hash": block.previous_hash,
+            "block_hash": block.hash,
+        }
+
+    def _block_ok(self, i):
+        current_block = self.chain[i]
+        previous_block = self.chain[i-1]
+        if current_block.hash != current_block.calculate_hash():
+            return False
+        if current_block.previous_hash != previous_block.hash:
+            return False
+        # Un bloque ya verificado no puede haber cambiado de hash
+        return i >= len(self._fingerprints) or self._fingerprints[i] == _fingerprint(current_block.hash)
+
+    @timed("is_chain_valid")
+    def is_chain_valid(self, full=False):
+        # Por defecto se verifican los bloques añadidos desde la última
+        # validación más un tramo de REVERIFY_BATCH bloques ya verificados;
+        # full=True recorre toda la cadena desde el génesis.
+        # Si otra sesión ya está validando, se devuelve el último resultado
+        # en lugar de esperarla.
+        if not self._validation_lock.acquire(blocking=full):
+            return self._last_valid
+        try:
+            self._last_valid = self._validate(full)
+            return self._last_valid
+        finally:
+            self._validation_lock.release()
+
+    def _validate(self, full):
+        start = 1 if full else max(self.verified_height, 1)
+        height = self.height
+        if not full and not self._reverify(start):
+            return False
+        for i in range(start, height):
+            if not self._block_ok(i):
+                self.verified_height = min(self.verified_height, i)
+                return False
+            if i == len(self._fingerprints):
+                self._fingerprints.append(_fingerprint(self.chain[i].hash))
+            if i % self.CHECKPOINT_INTERVAL == 0:
+                # Un checkpoint ya registrado no se sobrescribe: si la cadena
+                # fue re-encadenada por completo, ahí se detecta
+                if self.checkpoints.setdefault(i, self.chain[i].hash) != self.chain[i].hash:
+                    self.verified_height = min(self.verified_height, i)
+                    return False
+        self.verified_height = height
+        return True
+
+    def _reverify(self, verified):
+        # Siguiente tramo del barrido circular sobre los bloques [1, verified)
+        if self._reverify_at >= verified:
+            self._reverify_at = 1
+        stop = min(self._reverify_at + self.REVERIFY_BATCH, verified)
+        for i in range(self._reverify_at, stop):
+            if not self._block_ok(i):
+                self.verified_height = min(self.verified_height, i)
+                return False
+        self._reverify_at = stop
+        return True
+
+    def _checkpoint_ok(self, height):
+        block = self.chain[height]
+        expected = self.checkpoints[height]
+        return block.hash == expected and block.calculate_hash() == expected
+
+    def _scan(self, start, stop):
+        for i in range(max(start, 1), stop):
+            if not self._block_ok(i):
+                return i
+        return None
+
+    @timed("find_first_invalid")
+    def find_first_invalid(self):
+        # Bisección O(log n) sobre los checkpoints: una reescritura de la
+        # historia (bloque alterado y hashes siguientes recalculados) rompe
+        # todos los checkpoints posteriores, así que basta hallar el primero
+        # que falla y revisar solo su tramo; las huellas de los bloques
+        # verificados señalan el primero reescrito. Una alteración en sitio
+        # que no se propagó hasta un checkpoint no la ve la bisección: en ese
+        # caso se recorre toda la cadena.
+        heights = sorted(h for h in self.checkpoints if h < len(self.chain))
+        lo, hi = 0, len(heights)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._checkpoint_ok(heights[mid]):
+                lo = mid + 1
+            else:
+                hi = mid
+        start = heights[lo - 1] + 1 if lo > 0 else 1
+        end = heights[lo] + 1 if lo < len(heights) else len(self.chain)
+        found = self._scan(start, end)
+        if found is not None:
+            return found
+        if lo < len(heights):
+            # El checkpoint cambió pero ningún bloque de su tramo lo delata
+            # (sin huellas, p. ej. bloques nunca validados): se reporta él
+            return heights[lo]
+        found = self._scan(1, start)
+        return found if found is not None else self._scan(end, len(self.chain))
+
+
+class LedgerSnapshot:
+    # Vista de solo lectura de la cadena a una altura fija
+    def __init__(self, ledger, height):
+        self.ledger = ledger
+        self.height = height
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, i):
+        # Índice o slice, siempre dentro de los bloques [0, height)
+        if isinstance(i, slice):
+            return [self.ledger.chain[j] for j in range(self.height)[i]]
+        return self.ledger.chain[range(self.height)[i]]
+
+    def __iter__(self):
+        for i in range(self.height):
+            yield self.ledger.chain[i]
+
+    def balance(self, usuario):
+        return self.ledger.balances.balance_at(usuario, self.height)
+
+    def totals(self, usuario):
+        # Tokens, botellas, kg y CO2 del usuario a esta altura
+        return self.ledger.balances.get_at(usuario, self.height)
+
+    @timed("series")
+    def series(self, usuario):
+        return self.ledger.balances.series(usuario, self.height)
+
+    @timed("page")
+    def page(self, k, m, row, **filters):
+        return self.ledger.explorer.page(k, m, row, height=self.height, **filters)
+
+    @timed("impact")
+    def impact(self, dimension):
+        # DataFrame de impacto por "usuario", "sensor" o "dia" a esta altura
+        return self.ledger.analytics.frame(dimension, self.height)
@@ -0,0 +1,75 @@
+# ==========================================
+# ÁRBOLES DE MERKLE Y SELLADO DE LOTES
+# ==========================================
+# Un bloque puede agrupar muchas transacciones bajo una raíz de Merkle; el
+# hash del bloque se compromete solo con la raíz, y la inclusión de una
+# transacción se demuestra con O(log n) hashes hermanos.
+#
+# Hojas y nodos internos usan prefijos distintos (0x00 / 0x01) y un nodo
+# sin pareja sube sin duplicarse, para que dos listas distintas nunca
+# produzcan la misma raíz.
+import hashlib
+import time
+
+from eco_core.encoding import canonical_json
+
+
+def tx_digest(tx):
+    return hashlib.sha256(b"\x00" + canonical_json(tx)).digest()
+
+
+def _node(left, right):
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _levels(leaves):
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parent.append(level[-1])
+        levels.append(parent)
+    return levels
+
+
+def merkle_root(txs):
+    if not txs:
+        return hashlib.sha256(b"").hexdigest()
+    return _levels([tx_digest(tx) for tx in txs])[-1][0].hex()
+
+
+def merkle_proof(txs, position):
+    # Lista de (hash hermano, hermano_a_la_izquierda) desde la hoja a la raíz
+    proof = []
+    for level in _levels([tx_digest(tx) for tx in txs])[:-1]:
+        sibling = position ^ 1
+        if sibling < len(level):
+            proof.append((level[sibling].hex(), sibling < position))
+        position //= 2
+    return proof
+
+
+def verify_proof(tx, proof, root):
+    digest = tx_digest(tx)
+    for sibling, is_left in proof:
+        sibling = bytes.fromhex(sibling)
+        digest = _node(sibling, digest) if is_left else _node(digest, sibling)
+    return digest.hex() == root
+
+
+# --- Política de sellado ---
+class SealPolicy:
+    # Se sella un bloque al juntar max_txs transacciones o cuando la más
+    # antigua pendiente lleva max_age segundos esperando
+    def __init__(self, max_txs=32, max_age=30.0):
+        self.max_txs = max_txs
+        self.max_age = max_age
+
+    def due(self, pending, oldest, now=None):
+        if not pending:
+            return False
+        if pending >= self.max_txs:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - oldest >= self.max_age
@@ -0,0 +1,213 @@
+# ==========================================
+# MÉTRICAS DE TIEMPO (OPCIONALES, FORMATO PROMETHEUS)
+# ==========================================
+# Histogramas de duración por página de las apps y por llamada al backend.
+# Se activan al arrancar el proceso con alguna de estas variables:
+#   ECOG_METRICS_FILE=/ruta/ecog.prom   archivo de texto (node_exporter textfile)
+#   ECOG_METRICS_PORT=9108              endpoint HTTP /metrics
+# Sin ellas, timed() devuelve la función sin envolver y timer() un contexto
+# vacío compartido: el costo desactivado es prácticamente nulo.
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_FILE = os.environ.get("ECOG_METRICS_FILE")
+METRICS_PORT = os.environ.get("ECOG_METRICS_PORT")
+ENABLED = bool(METRICS_FILE or METRICS_PORT)
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_INTERVAL = 5.0   # segundos mínimos entre escrituras del archivo
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs, extra=()):
+    pairs = tuple(pairs) + tuple(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help="", buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series = {}   # etiquetas (tupla ordenada) -> [conteos por cubeta, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in sorted(series):
+            acumulado = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                acumulado += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(key, [('le', le)])} {acumulado}")
+            lines.append(f"{self.name}_sum{_labels(key)} {total!r}")
+            lines.append(f"{self.name}_count{_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help=""):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(name, help))
+        return histogram
+
+    def render(self):
+        lines = []
+        for name in sorted(self._histograms):
+            lines.extend(self._histograms[name].render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+_HELP = {
+    "ecog_rerun_seconds": "Duración total de cada recarga del script.",
+    "ecog_page_seconds": "Duración de cada rama de página por recarga.",
+    "ecog_section_seconds": "Duración de secciones comunes a todas las páginas.",
+    "ecog_backend_seconds": "Duración de las llamadas al backend del ledger.",
+}
+
+
+def observe(name, seconds, **labels):
+    if ENABLED:
+        REGISTRY.histogram(name, _HELP.get(name, "")).observe(seconds, **labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def timer(name, **labels):
+    # with timer("ecog_section_seconds", section="css"): ...
+    return _Timer(name, labels) if ENABLED else _NULL
+
+
+def timed(call, name="ecog_backend_seconds"):
+    # Decorador para funciones del backend; desactivado no las envuelve
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, call=call)
+        return wrapper
+    return decorator
+
+
+def clock():
+    # Marca de inicio para observe_since (0 si está desactivado, sin costo)
+    return time.perf_counter() if ENABLED else 0.0
+
+
+def observe_since(name, start, **labels):
+    if ENABLED:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+_server = None
+_last_export = 0.0
+_export_lock = threading.Lock()
+
+
+def write_textfile(path):
+    # Escritura atómica: el recolector nunca lee un archivo a medias
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp, path)
+
+
+def serve(port, host="127.0.0.1"):
+    # Endpoint /metrics en un hilo propio; devuelve el servidor
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, name="ecog-metrics", daemon=True).start()
+    return server
+
+
+def export():
+    # Llamada al final de cada recarga: arranca el endpoint una vez y
+    # reescribe el archivo como mucho cada EXPORT_INTERVAL segundos
+    global _server, _last_export
+    if not ENABLED:
+        return
+    with _export_lock:
+        if METRICS_PORT and _server is None:
+            _server = serve(METRICS_PORT)
+        now = time.monotonic()
+        if METRICS_FILE and now - _last_export >= EXPORT_INTERVAL:
+            _last_export = now
+            write_textfile(METRICS_FILE)
@@ -0,0 +1,158 @@
+# ==========================================
+# MOTOR DE CANJES DEL MARKETPLACE
+# ==========================================
+# Un canje comprueba saldo, inventario, versión y clave de idempotencia y
+# añade el bloque con el débito dentro de una sola sección crítica (el
+# candado de escritura del ledger), así dos canjes simultáneos no pueden
+# gastar el mismo saldo ni la última unidad de un premio. El canje solo se
+# confirma al usuario cuando su bloque ya está en la cadena (y en disco, si
+# el ledger es persistente): un reinicio no lo pierde.
+#   - Clave de idempotencia: repetir un canje con la misma clave (doble clic,
+#     reintento) devuelve el resultado original sin volver a debitar.
+#   - Versión por usuario: el cliente envía la versión que vio; si otro canje
+#     del mismo usuario ocurrió entretanto, se rechaza como conflicto.
+# El ledger mantiene RedemptionIndex (canjes por usuario y por premio y las
+# claves recientes) bloque a bloque, y se guarda en sus snapshots: al
+# arrancar, el motor parte de ese índice en vez de recorrer la cadena.
+import json
+from collections import OrderedDict, namedtuple
+
+from eco_core.metrics import timed
+
+Prize = namedtuple("Prize", ["id", "nombre", "costo", "icon", "stock"], defaults=("🎁", None))
+Redemption = namedtuple("Redemption", ["clave", "estado", "usuario", "premio", "version", "repetido"],
+                        defaults=(False,))
+
+CANJEADO = "canjeado"
+SALDO_INSUFICIENTE = "saldo insuficiente"
+AGOTADO = "agotado"
+CONFLICTO = "conflicto"
+DESCONOCIDO = "premio desconocido"
+
+MAX_CLAVES = 100_000
+
+# stock None = sin límite
+CATALOGO = (
+    Prize("metrovia", "Pasaje Metrovía", 3.0, "🚌"),
+    Prize("cafe", "Café", 8.0, "☕", 500),
+    Prize("sweet_coffee", "Cupón Sweet & Coffee", 10.0, "☕", 200),
+    Prize("comisariato", "Descuento Mi Comisariato", 20.0, "🛒", 100),
+)
+
+
+def load_catalog_json(path):
+    # Lista JSON de objetos con id, nombre, costo y (opcionales) icon, stock
+    with open(path, encoding="utf-8") as f:
+        return [Prize(**premio) for premio in json.load(f)]
+
+
+def redemption_tx(usuario, premio, clave):
+    return {"usuario": usuario, "accion": f"Canje: {premio.nombre}", "costo": -premio.costo,
+            "premio": premio.id, "clave": clave}
+
+
+class RedemptionIndex:
+    # Canjes ya confirmados en la cadena, como los demás índices del ledger
+    def __init__(self, max_keys=MAX_CLAVES):
+        self.height = 0
+        self.max_keys = max_keys
+        self.versions = {}            # usuario -> canjes confirmados
+        self.consumed = {}            # premio -> unidades canjeadas
+        self.claves = OrderedDict()   # clave -> (usuario, premio, versión)
+
+    def apply(self, block):
+        if block.index < self.height:
+            return
+        for tx in block.transactions():
+            if isinstance(tx, dict) and "premio" in tx:
+                usuario, premio_id, clave = tx["usuario"], tx["premio"], tx.get("clave")
+                version = self.versions[usuario] = self.versions.get(usuario, 0) + 1
+                self.consumed[premio_id] = self.consumed.get(premio_id, 0) + 1
+                if clave:
+                    self.claves[clave] = (usuario, premio_id, version)
+                    while len(self.claves) > self.max_keys:
+                        self.claves.popitem(last=False)
+        self.height = block.index + 1
+
+    def state(self):
+        return {"height": self.height, "versions": dict(self.versions),
+                "consumed": dict(self.consumed), "claves": OrderedDict(self.claves)}
+
+    def load_state(self, state):
+        self.versions = state["versions"]
+        self.consumed = state["consumed"]
+        self.claves = state["claves"]
+        self.height = state["height"]
+
+
+class RedemptionEngine:
+    def __init__(self, ledger, catalog=CATALOGO, submit=None, max_keys=MAX_CLAVES):
+        # submit(tx) añade el bloque con el débito: por defecto
+        # ledger.commit_batch, que sella junto al canje lo que hubiera en
+        # espera; app.py usa un bloque por canje
+        self.ledger = ledger
+        self.catalog = {premio.id: premio for premio in catalog}
+        self.submit = submit or (lambda tx: ledger.commit_batch([tx]))
+        self.max_keys = max_keys
+        with ledger.lock:
+            confirmados = ledger.redemptions
+            self._stock = {p.id: p.stock - confirmados.consumed.get(p.id, 0)
+                           for p in catalog if p.stock is not None}
+            self._versions = dict(confirmados.versions)
+            # clave -> Redemption; se olvidan las más antiguas
+            self._results = OrderedDict(
+                (clave, Redemption(clave, CANJEADO, usuario, premio_id, version))
+                for clave, (usuario, premio_id, version) in confirmados.claves.items()
+            )
+            while len(self._results) > self.max_keys:
+                self._results.popitem(last=False)
+            self._replay(ledger.pending)
+
+    def _replay(self, txs):
+        for tx in txs:
+            if isinstance(tx, dict) and "premio" in tx:
+                self._record(tx["usuario"], tx["premio"], tx.get("clave"))
+
+    def _record(self, usuario, premio_id, clave):
+        version = self._versions.get(usuario, 0) + 1
+        self._versions[usuario] = version
+        if premio_id in self._stock:
+            self._stock[premio_id] -= 1
+        if clave:
+            self._results[clave] = Redemption(clave, CANJEADO, usuario, premio_id, version)
+            while len(self._results) > self.max_keys:
+                self._results.popitem(last=False)
+        return version
+
+    def version(self, usuario):
+        return self._versions.get(usuario, 0)
+
+    def stock(self, premio_id):
+        # Unidades disponibles, o None si el premio no tiene límite
+        return self._stock.get(premio_id)
+
+    @timed("redeem")
+    def redeem(self, usuario, premio_id, clave, expected_version=None):
+        with self.ledger.lock:
+            previo = self._results.get(clave)
+            if previo is not None:
+                return previo._replace(repetido=True)
+            premio = self.catalog.get(premio_id)
+            version = self.version(usuario)
+            if premio is None:
+                estado = DESCONOCIDO
+            elif expected_version is not None and expected_version != version:
+                estado = CONFLICTO
+            elif self._stock.get(premio_id, 1) <= 0:
+                estado = AGOTADO
+            elif self.ledger.pending_balance(usuario) < premio.costo:
+                estado = SALDO_INSUFICIENTE
+            else:
+                # Bloque, fsync y registro juntos, aún bajo el candado
+                self.submit(redemption_tx(usuario, premio, clave))
+                if self.ledger.store is not None:
+                    self.ledger.store.flush()
+                return Redemption(clave, CANJEADO, usuario, premio_id, self._record(usuario, premio_id, clave))
+            # Los rechazos no se recuerdan: un reintento con la misma clave
+            # vuelve a evaluarse (p. ej. tras recibir tokens)
+            return Redemption(clave, estado, usuario, premio_id, version)
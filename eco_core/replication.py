@@ -0,0 +1,273 @@
+# ==========================================
+# REPLICACIÓN LÍDER / SEGUIDORES (HTTP)
+# ==========================================
+# El líder expone su cadena por HTTP en solo lectura. Cada seguidor guarda
+# una copia completa con sus propios índices (saldos, explorador,
+# clasificación...), así que puede atender las lecturas de la Billetera, y
+# se sincroniza con el líder en cuatro pasos:
+#   1. GET /altura: altura y hash de la punta del líder.
+#   2. Cabeceras primero: compara los hashes del líder (GET /hashes) con los
+#      propios, hacia atrás en ventanas que se duplican, hasta hallar el
+#      último bloque común. Como cada hash encadena al anterior, dentro de la
+#      ventana que contiene la divergencia basta una búsqueda binaria local.
+#   3. Si el seguidor tiene bloques que el líder no tiene, los descarta.
+#   4. GET /bloques en lotes: cada bloque se verifica (índice, enlace con el
+#      anterior y hash) a medida que llega, antes de añadirlo.
+# Un seguidor es de solo lectura: las escrituras van siempre al líder.
+#
+#   python -m eco_core.replication serve RUTA_LIDER --port 8600 [--demo 50]
+#   python -m eco_core.replication follow RUTA_REPLICA --leader http://127.0.0.1:8600 [--port 8601]
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from eco_core.block import EcoBlock
+from eco_core.encoding import canonical_json
+from eco_core.ledger import EcoBlockchain
+from eco_core.metrics import timed
+from eco_core.store import LedgerStore
+
+PUERTO = 8600
+LOTE = 500             # bloques por petición de /bloques
+MAX_HASHES = 4096      # hashes por petición de /hashes
+VENTANA_INICIAL = 64   # primera ventana de la búsqueda del ancestro común
+
+
+def block_hash(ledger, height):
+    # Hash del bloque sin decodificarlo cuando la cadena está en disco
+    if ledger.store is not None:
+        return ledger.store.read_hash(height)
+    return ledger.chain[height].hash
+
+
+def block_line(ledger, height):
+    # Una línea JSON por bloque; con almacén, el JSON canónico guardado se
+    # envía tal cual, sin decodificarlo ni volver a codificarlo
+    if ledger.store is not None:
+        block = ledger.store.get_raw(height)
+        payload = block.payload
+    else:
+        block = ledger.chain[height]
+        payload = canonical_json(block.data)
+    meta = json.dumps({"index": block.index, "timestamp": block.timestamp,
+                       "previous_hash": block.previous_hash, "hash": block.hash}, ensure_ascii=False).encode()
+    return meta[:-1] + b',"data":' + payload + b"}\n"
+
+
+# --- Líder (y cualquier nodo que quiera servir su copia) ---
+def _handler(ledger):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == "/altura":
+                    height = ledger.height
+                    body = {"altura": height, "hash": block_hash(ledger, height - 1) if height else None}
+                elif url.path == "/hashes":
+                    height = ledger.height
+                    desde = int(query.get("desde", 0))
+                    hasta = min(int(query.get("hasta", height)), height, desde + MAX_HASHES)
+                    body = {"desde": desde, "hashes": [block_hash(ledger, h) for h in range(desde, hasta)]}
+                elif url.path == "/bloques":
+                    self._send_blocks(int(query.get("desde", 0)), int(query.get("cantidad", LOTE)))
+                    return
+                elif url.path == "/saldo":
+                    # Lectura de la Billetera servida por cualquier réplica
+                    usuario = query["usuario"]
+                    snap = ledger.snapshot()
+                    body = {"usuario": usuario, "altura": snap.height, **snap.totals(usuario)._asdict()}
+                else:
+                    self.send_error(404)
+                    return
+            except (KeyError, ValueError, IndexError) as exc:
+                self.send_error(400, str(exc))
+                return
+            self._send(json.dumps(body, ensure_ascii=False).encode(), "application/json")
+
+        def _send_blocks(self, desde, cantidad):
+            height = ledger.height
+            stop = min(desde + max(min(cantidad, LOTE), 0), height)
+            body = b"".join(block_line(ledger, h) for h in range(max(desde, 0), stop))
+            self._send(body, "application/x-ndjson")
+
+        def _send(self, body, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(ledger, port=PUERTO, host="127.0.0.1"):
+    # Sirve la cadena en un hilo propio; devuelve el servidor
+    server = ThreadingHTTPServer((host, int(port)), _handler(ledger))
+    threading.Thread(target=server.serve_forever, name="ecog-replicacion", daemon=True).start()
+    return server
+
+
+# --- Seguidor ---
+class Follower:
+    def __init__(self, ledger, leader, batch=LOTE, timeout=10.0):
+        self.ledger = ledger
+        self.leader = leader.rstrip("/")
+        self.batch = batch
+        self.timeout = timeout
+        self.truncated = 0    # bloques descartados por divergir del líder
+        self.last_error = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def _open(self, path):
+        return urllib.request.urlopen(self.leader + path, timeout=self.timeout)
+
+    def _json(self, path):
+        with self._open(path) as response:
+            return json.loads(response.read())
+
+    def common_ancestor(self, leader_height):
+        # Cantidad de bloques iniciales idénticos en ambas cadenas
+        common = min(self.ledger.height, leader_height)
+        window = VENTANA_INICIAL
+        while common > 0:
+            lo = max(0, common - window)
+            theirs = self._json(f"/hashes?desde={lo}&hasta={common}")["hashes"]
+            if len(theirs) != common - lo:
+                raise ValueError("el líder devolvió menos hashes de los pedidos")
+            mine = [block_hash(self.ledger, h) for h in range(lo, common)]
+            if theirs[-1] == mine[-1]:
+                return common
+            if theirs[0] != mine[0]:
+                common, window = lo, min(window * 2, MAX_HASHES)
+                continue
+            # mine[a] coincide y mine[b] no: el primer bloque distinto está en (a, b]
+            a, b = 0, len(mine) - 1
+            while b - a > 1:
+                m = (a + b) // 2
+                if theirs[m] == mine[m]:
+                    a = m
+                else:
+                    b = m
+            return lo + b
+        return 0
+
+    @timed("replication_sync")
+    def sync(self):
+        # Una ronda de sincronización; devuelve cuántos bloques se añadieron
+        info = self._json("/altura")
+        leader_height = info["altura"]
+        height = self.ledger.height
+        if height == leader_height and (height == 0 or block_hash(self.ledger, height - 1) == info["hash"]):
+            return 0
+        common = self.common_ancestor(leader_height)
+        if common < self.ledger.height:
+            self.truncated += self.ledger.height - common
+            self.ledger.truncate(common)
+        added = 0
+        while self.ledger.height < leader_height:
+            start = self.ledger.height
+            with self._open(f"/bloques?desde={start}&cantidad={min(self.batch, leader_height - start)}") as response:
+                received = 0
+                # Se verifica y añade cada bloque mientras llega la respuesta
+                for line in response:
+                    r = json.loads(line)
+                    block = EcoBlock(r["index"], r["timestamp"], r["data"], r["previous_hash"])
+                    block.hash = r["hash"]
+                    self.ledger.append_block(block)
+                    received += 1
+            if not received:
+                break
+            added += received
+        return added
+
+    def run(self, interval=1.0, on_sync=None):
+        # Sincroniza hasta stop(); un error de red o un bloque inválido se
+        # registra y se reintenta en la siguiente ronda
+        while not self._stopping.is_set():
+            try:
+                added = self.sync()
+                self.last_error = None
+                if on_sync is not None:
+                    on_sync(added)
+            except (OSError, ValueError) as exc:
+                self.last_error = str(exc)
+            self._stopping.wait(interval)
+
+    def start(self, interval=1.0):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, args=(interval,), name="ecog-seguidor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def _demo_writer(ledger, por_segundo):
+    # Carga de prueba para el líder: depósitos simulados en un lote por segundo
+    from eco_core.ingest import SimulatedSensorFeed, reading_to_tx
+
+    feed = SimulatedSensorFeed([f"Sensor_{i:02d}" for i in range(10)], seed=0)
+    usuarios = [f"Ciudadano_{i:03d}" for i in range(100)]
+    while True:
+        ledger.commit_batch([reading_to_tx(feed.read(feed.random.choice(usuarios))) for _ in range(por_segundo)])
+        time.sleep(1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replicación del ledger entre procesos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    serve_p = sub.add_parser("serve", help="sirve un ledger persistido como líder")
+    serve_p.add_argument("ledger")
+    serve_p.add_argument("--port", type=int, default=PUERTO)
+    serve_p.add_argument("--demo", type=int, default=0, metavar="N", help="añade N depósitos simulados por segundo")
+    follow_p = sub.add_parser("follow", help="mantiene una réplica sincronizada con un líder")
+    follow_p.add_argument("ledger", help="directorio de la réplica")
+    follow_p.add_argument("--leader", required=True, help="URL del líder, p. ej. http://127.0.0.1:8600")
+    follow_p.add_argument("--port", type=int, help="sirve también la réplica (lecturas u otros seguidores)")
+    follow_p.add_argument("--interval", type=float, default=1.0)
+    for p in (serve_p, follow_p):
+        p.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+
+    ledger = EcoBlockchain(LedgerStore(args.ledger))
+    if args.comando == "serve":
+        serve(ledger, args.port, args.host)
+        print(f"Líder en http://{args.host}:{args.port} ({ledger.height:,} bloques)")
+        if args.demo:
+            threading.Thread(target=_demo_writer, args=(ledger, args.demo), daemon=True).start()
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    else:
+        if args.port:
+            serve(ledger, args.port, args.host)
+        follower = Follower(ledger, args.leader)
+
+        def informar(added):
+            if added:
+                print(f"altura {ledger.height:,} (+{added:,}; descartados en total {follower.truncated:,})",
+                      flush=True)
+
+        try:
+            follower.run(args.interval, informar)
+        except KeyboardInterrupt:
+            pass
+    ledger.store.close()
+
+
+if __name__ == "__main__":
+    main()
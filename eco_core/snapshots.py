@@ -0,0 +1,131 @@
+# ==========================================
+# SNAPSHOTS DEL ESTADO DERIVADO (ARRANQUE RÁPIDO)
+# ==========================================
+# Un snapshot guarda el estado de los índices del ledger (saldos, botellas,
+# clasificación y niveles, explorador, analítica y canjes) tras los bloques
+# [0, altura), junto con el hash del bloque altura - 1. Al abrir un ledger
+# persistente se carga el snapshot más reciente cuyo hash coincide con la
+# cadena en disco y solo se aplican los bloques posteriores: el arranque
+# depende de la cola, no de toda la historia.
+#
+# Archivo snap-<altura>.bin en RUTA_LEDGER/snapshots:
+#   MAGIC | longitud de la cabecera (u32) | cabecera JSON | estado (pickle + zlib) | crc32
+# El estado se serializa con pickle: solo se cargan snapshots escritos por
+# el propio servidor en el directorio del ledger.
+import json
+import os
+import pickle
+import struct
+import zlib
+from datetime import datetime
+
+MAGIC = b"ECOSNAP1"
+FORMATO = 2
+DIRECTORIO = "snapshots"
+GUARDADOS = 2    # snapshots que se conservan; los más antiguos se borran
+NIVEL_ZLIB = 3
+
+_LONGITUD = struct.Struct("<I")
+_CRC = struct.Struct("<I")
+
+
+def snapshot_dir(store_path):
+    return os.path.join(store_path, DIRECTORIO)
+
+
+def _nombre(height):
+    return f"snap-{height:012d}.bin"
+
+
+def list_snapshots(directory):
+    # Alturas de los snapshots del directorio, de la más reciente a la más antigua
+    if not os.path.isdir(directory):
+        return []
+    alturas = []
+    for name in os.listdir(directory):
+        if name.startswith("snap-") and name.endswith(".bin"):
+            try:
+                alturas.append(int(name[5:-4]))
+            except ValueError:
+                continue
+    return sorted(alturas, reverse=True)
+
+
+def write_snapshot(directory, height, block_hash, states, extra=None):
+    # Escritura atómica: un snapshot a medias nunca reemplaza a uno íntegro
+    os.makedirs(directory, exist_ok=True)
+    cabecera = json.dumps({
+        "formato": FORMATO,
+        "altura": height,
+        "hash": block_hash,
+        "indices": sorted(states),
+        "creado": datetime.now().isoformat(timespec="seconds"),
+    }).encode()
+    cuerpo = zlib.compress(pickle.dumps({"indices": states, "extra": extra or {}},
+                                        protocol=pickle.HIGHEST_PROTOCOL), NIVEL_ZLIB)
+    datos = MAGIC + _LONGITUD.pack(len(cabecera)) + cabecera + cuerpo
+    path = os.path.join(directory, _nombre(height))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(datos)
+        f.write(_CRC.pack(zlib.crc32(datos)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        inicio = f.read(len(MAGIC) + _LONGITUD.size)
+        if len(inicio) < len(MAGIC) + _LONGITUD.size or not inicio.startswith(MAGIC):
+            raise ValueError(f"{path}: no es un snapshot")
+        return json.loads(f.read(_LONGITUD.unpack_from(inicio, len(MAGIC))[0]))
+
+
+def read_snapshot(path):
+    # (cabecera, estados por índice, extra); ValueError si está dañado
+    with open(path, "rb") as f:
+        datos = f.read()
+    if len(datos) < len(MAGIC) + _LONGITUD.size + _CRC.size or not datos.startswith(MAGIC):
+        raise ValueError(f"{path}: no es un snapshot")
+    datos, crc = datos[:-_CRC.size], _CRC.unpack(datos[-_CRC.size:])[0]
+    if zlib.crc32(datos) != crc:
+        raise ValueError(f"{path}: CRC incorrecto")
+    pos = len(MAGIC) + _LONGITUD.size
+    fin = pos + _LONGITUD.unpack_from(datos, len(MAGIC))[0]
+    cabecera = json.loads(datos[pos:fin])
+    if cabecera.get("formato") != FORMATO:
+        raise ValueError(f"{path}: formato {cabecera.get('formato')} no soportado")
+    cuerpo = pickle.loads(zlib.decompress(datos[fin:]))
+    return cabecera, cuerpo["indices"], cuerpo["extra"]
+
+
+def load_latest(directory, accept, max_height=None):
+    # El snapshot más reciente que sigue siendo válido para la cadena:
+    # accept(cabecera) comprueba su hash contra el bloque altura - 1 y sus
+    # índices. Los dañados o de otra historia se saltan. Devuelve
+    # (cabecera, estados, extra) o None.
+    for height in list_snapshots(directory):
+        if max_height is not None and height > max_height:
+            continue
+        path = os.path.join(directory, _nombre(height))
+        try:
+            if not accept(read_header(path)):
+                continue
+            return read_snapshot(path)
+        except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError, zlib.error):
+            continue
+    return None
+
+
+def prune(directory, keep=GUARDADOS):
+    # Borra los snapshots más antiguos y los temporales huérfanos
+    for height in list_snapshots(directory)[keep:]:
+        os.remove(os.path.join(directory, _nombre(height)))
+    for name in os.listdir(directory):
+        if name.endswith(".tmp") and name.startswith("snap-"):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
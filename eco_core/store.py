@@ -0,0 +1,397 @@
+# ==========================================
+# ALMACÉN PERSISTENTE DEL LEDGER (APPEND-ONLY)
+# ==========================================
+# Estructura en disco de un ledger:
+#   seg-000000.log, seg-000001.log, ...  registros binarios consecutivos
+#   index.bin                            un u64 por altura: (segmento << 40) | offset
+#   seg-000000.log.z, ...                segmentos fríos archivados (zlib), opcional
+#
+# Añadir un bloque es O(1): se escribe el registro al final del segmento
+# activo y su entrada al final del índice. Las lecturas usan mmap y el
+# índice se consulta sin deserializar los bloques, así que abrir una cadena
+# de millones de bloques no crea millones de objetos Python.
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from collections import OrderedDict, namedtuple
+from collections.abc import Sequence
+
+from eco_core.encoding import canonical_json
+
+BlockRecord = namedtuple("BlockRecord", ["index", "timestamp", "data", "previous_hash", "hash"])
+# Igual que BlockRecord pero con `payload`: el JSON canónico sin decodificar
+RawRecord = namedtuple("RawRecord", ["index", "timestamp", "payload", "previous_hash", "hash"])
+
+# Registro: cabecera | cuerpo | crc32(cabecera + cuerpo)
+_HEADER = struct.Struct("<IQ")  # longitud del cuerpo, índice del bloque
+_CRC = struct.Struct("<I")
+_ENTRY = struct.Struct("<Q")
+_OFFSET_BITS = 40
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+
+INDEX_FILE = "index.bin"
+SEGMENT_BYTES = 64 * 1024 * 1024
+SYNC_EVERY = 256
+ARCHIVE_SUFFIX = ".z"
+COLD_CACHE = 2   # segmentos archivados que se mantienen descomprimidos en memoria
+
+
+def _segment_name(seg):
+    return f"seg-{seg:06d}.log"
+
+
+# --- Codificación binaria de un bloque ---
+# Los hashes SHA-256 en hex (64 caracteres) se guardan como 32 bytes crudos
+# (marca 0); cualquier otro valor, como el "0" del génesis, se guarda como
+# texto con su longitud.
+def _pack_digest(value):
+    if len(value) == 64:
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            raw = None
+        if raw is not None and raw.hex() == value:
+            return b"\x00" + raw
+    encoded = value.encode()
+    return bytes([len(encoded)]) + encoded
+
+
+def _unpack_digest(buf, pos):
+    size = buf[pos]
+    if size == 0:
+        return bytes(buf[pos + 1:pos + 33]).hex(), pos + 33
+    return bytes(buf[pos + 1:pos + 1 + size]).decode(), pos + 1 + size
+
+
+def encode_record(record):
+    timestamp = str(record.timestamp).encode()
+    payload = canonical_json(record.data)
+    body = b"".join([
+        _pack_digest(record.previous_hash),
+        _pack_digest(record.hash),
+        bytes([len(timestamp)]),
+        timestamp,
+        payload,
+    ])
+    head = _HEADER.pack(len(body), record.index)
+    return head + body + _CRC.pack(zlib.crc32(body, zlib.crc32(head)))
+
+
+def decode_raw(buf, offset=0):
+    size, index = _HEADER.unpack_from(buf, offset)
+    pos = offset + _HEADER.size
+    end = pos + size
+    previous_hash, pos = _unpack_digest(buf, pos)
+    block_hash, pos = _unpack_digest(buf, pos)
+    ts_len = buf[pos]
+    timestamp = bytes(buf[pos + 1:pos + 1 + ts_len]).decode()
+    return RawRecord(index, timestamp, bytes(buf[pos + 1 + ts_len:end]), previous_hash, block_hash)
+
+
+def decode_record(buf, offset=0):
+    raw = decode_raw(buf, offset)
+    return BlockRecord(raw.index, raw.timestamp, json.loads(raw.payload), raw.previous_hash, raw.hash)
+
+
+def _record_ok(buf, offset):
+    # Comprueba que el registro está completo y que su CRC coincide
+    if offset + _HEADER.size > len(buf):
+        return None
+    size, _ = _HEADER.unpack_from(buf, offset)
+    end = offset + _HEADER.size + size
+    if end + _CRC.size > len(buf):
+        return None
+    crc = zlib.crc32(buf[offset + _HEADER.size:end], zlib.crc32(buf[offset:offset + _HEADER.size]))
+    if crc != _CRC.unpack_from(buf, end)[0]:
+        return None
+    return end + _CRC.size
+
+
+class LedgerStore:
+    def __init__(self, path, segment_bytes=SEGMENT_BYTES, sync_every=SYNC_EVERY, readonly=False):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.sync_every = sync_every
+        self.readonly = readonly
+        self._maps = {}      # segmento -> mmap
+        self._cold = OrderedDict()   # segmento archivado -> bytes descomprimidos
+        self._unsynced = 0
+        self._index_file = None
+        self._segment_file = None
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+            self._recover()
+        self._index_map, self._index_view = self._map_index()
+        # Entradas añadidas desde que se abrió el almacén
+        self._tail = array("Q")
+        self._height = len(self._index_view)
+        if not readonly:
+            self._open_writers()
+
+    # --- Apertura y recuperación ---
+    def _map_index(self):
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(index_path) or os.path.getsize(index_path) < _ENTRY.size:
+            return None, memoryview(b"").cast("Q")
+        with open(index_path, "rb") as f:
+            index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        usable = len(index_map) - len(index_map) % _ENTRY.size
+        return index_map, memoryview(index_map)[:usable].cast("Q")
+
+    def _recover(self):
+        # Tras una caída puede quedar un registro a medio escribir: se
+        # descartan las entradas del índice que no apuntan a un registro
+        # íntegro y los bytes sobrantes al final del último segmento.
+        index_path = os.path.join(self.path, INDEX_FILE)
+        entries = array("Q")
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                raw = f.read()
+            entries.frombytes(raw[:len(raw) - len(raw) % _ENTRY.size])
+        segment, end = 0, 0
+        while entries:
+            seg, off = entries[-1] >> _OFFSET_BITS, entries[-1] & _OFFSET_MASK
+            seg_path = os.path.join(self.path, _segment_name(seg))
+            if os.path.exists(seg_path):
+                with open(seg_path, "rb") as f:
+                    f.seek(off)
+                    chunk = f.read(_HEADER.size)
+                    if len(chunk) == _HEADER.size:
+                        size = _HEADER.unpack(chunk)[0]
+                        chunk += f.read(size + _CRC.size)
+                ok = _record_ok(chunk, 0)
+                if ok is not None:
+                    segment, end = seg, off + ok
+                    break
+            entries.pop()
+        with open(index_path, "ab") as f:
+            f.truncate(len(entries) * _ENTRY.size)
+        for name in os.listdir(self.path):
+            if name.startswith("seg-") and name.endswith(".log"):
+                seg = int(name[4:10])
+                if seg > segment:
+                    os.remove(os.path.join(self.path, name))
+        with open(os.path.join(self.path, _segment_name(segment)), "ab") as f:
+            f.truncate(end)
+
+    def _open_writers(self):
+        last = self._entry(self._height - 1) >> _OFFSET_BITS if self._height else 0
+        self._segment = last
+        self._segment_file = open(os.path.join(self.path, _segment_name(last)), "ab", buffering=0)
+        self._segment_size = self._segment_file.tell()
+        self._index_file = open(os.path.join(self.path, INDEX_FILE), "ab", buffering=0)
+
+    # --- Lectura ---
+    def __len__(self):
+        return self._height
+
+    def _entry(self, height):
+        base = len(self._index_view)
+        if height < base:
+            return self._index_view[height]
+        return self._tail[height - base]
+
+    def _segment_buffer(self, seg, needed):
+        buf = self._maps.get(seg)
+        if buf is None or len(buf) < needed:
+            cold = self._cold.get(seg)
+            if cold is not None:
+                self._cold.move_to_end(seg)
+                return cold
+            path = os.path.join(self.path, _segment_name(seg))
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                if os.path.exists(path + ARCHIVE_SUFFIX):
+                    return self._load_cold(seg)
+                raise
+            # El segmento activo crece: se vuelve a mapear cuando hace falta.
+            # El mapa anterior no se cierra aquí porque otro hilo lector
+            # puede estar usándolo; se libera al perder su última referencia.
+            with f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[seg] = buf
+        return buf
+
+    def _load_cold(self, seg):
+        # Leer un bloque archivado descomprime su segmento entero; se guardan
+        # los últimos COLD_CACHE para recorridos secuenciales
+        with open(os.path.join(self.path, _segment_name(seg) + ARCHIVE_SUFFIX), "rb") as f:
+            buf = zlib.decompress(f.read())
+        self._cold[seg] = buf
+        while len(self._cold) > COLD_CACHE:
+            self._cold.popitem(last=False)
+        return buf
+
+    def _locate(self, height):
+        if height < 0:
+            height += self._height
+        if not 0 <= height < self._height:
+            raise IndexError("altura fuera del ledger")
+        entry = self._entry(height)
+        seg, offset = entry >> _OFFSET_BITS, entry & _OFFSET_MASK
+        buf = self._segment_buffer(seg, offset + _HEADER.size)
+        size = _HEADER.unpack_from(buf, offset)[0]
+        buf = self._segment_buffer(seg, offset + _HEADER.size + size + _CRC.size)
+        return buf, offset
+
+    def get(self, height):
+        buf, offset = self._locate(height)
+        return decode_record(buf, offset)
+
+    def get_raw(self, height):
+        buf, offset = self._locate(height)
+        return decode_raw(buf, offset)
+
+    def read_hash(self, height):
+        # Lee solo el hash del bloque, sin decodificar su contenido
+        buf, offset = self._locate(height)
+        _, pos = _unpack_digest(buf, offset + _HEADER.size)
+        return _unpack_digest(buf, pos)[0]
+
+    def iter_records(self, start=0, stop=None):
+        stop = self._height if stop is None else min(stop, self._height)
+        for height in range(start, stop):
+            yield self.get(height)
+
+    # --- Escritura ---
+    def append(self, record):
+        if self.readonly:
+            raise PermissionError("ledger abierto en modo solo lectura")
+        if record.index != self._height:
+            raise ValueError(f"se esperaba el bloque {self._height}, llegó el {record.index}")
+        data = encode_record(record)
+        if self._segment_size and self._segment_size + len(data) > self.segment_bytes:
+            self._roll_segment()
+        offset = self._segment_size
+        self._segment_file.write(data)
+        self._segment_size += len(data)
+        entry = (self._segment << _OFFSET_BITS) | offset
+        self._index_file.write(_ENTRY.pack(entry))
+        self._tail.append(entry)
+        self._height += 1
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.flush()
+        return self._height - 1
+
+    def archive(self, before_height, level=6):
+        # Comprime los segmentos cuyos bloques son todos anteriores a
+        # before_height (p. ej. la altura del último snapshot). El segmento
+        # activo nunca se archiva. Devuelve cuántos segmentos se archivaron.
+        if self.readonly:
+            raise PermissionError("ledger abierto en modo solo lectura")
+        before_height = min(before_height, self._height)
+        if before_height <= 0:
+            return 0
+        # Los segmentos anteriores al del bloque before_height - 1 solo tienen bloques previos
+        last = self._entry(before_height - 1) >> _OFFSET_BITS
+        archived = 0
+        for seg in range(last):
+            path = os.path.join(self.path, _segment_name(seg))
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                data = zlib.compress(f.read(), level)
+            tmp = path + ARCHIVE_SUFFIX + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path + ARCHIVE_SUFFIX)
+            # Un lector puede seguir usando el mmap: se libera con su última referencia
+            self._maps.pop(seg, None)
+            os.remove(path)
+            archived += 1
+        return archived
+
+    def truncate(self, height):
+        # Descarta los bloques [height, n). Primero se publica la nueva altura
+        # (los lectores dejan de pedir los bloques descartados) y luego se
+        # recortan índice y segmento; los mmaps anteriores no se cierran.
+        if self.readonly:
+            raise PermissionError("ledger abierto en modo solo lectura")
+        if not 0 <= height <= self._height:
+            raise ValueError("altura fuera del ledger")
+        if height == self._height:
+            return
+        entry = self._entry(height)
+        seg, offset = entry >> _OFFSET_BITS, entry & _OFFSET_MASK
+        seg_path = os.path.join(self.path, _segment_name(seg))
+        if not os.path.exists(seg_path):
+            raise ValueError(f"el bloque {height} está en un segmento archivado")
+        self._height = height
+        self.flush()
+        self._segment_file.close()
+        self._index_file.close()
+        self._maps = {}
+        self._cold.clear()
+        with open(os.path.join(self.path, INDEX_FILE), "r+b") as f:
+            f.truncate(height * _ENTRY.size)
+        with open(seg_path, "r+b") as f:
+            f.truncate(offset)
+        for name in os.listdir(self.path):
+            if name.startswith("seg-") and int(name[4:10]) > seg:
+                os.remove(os.path.join(self.path, name))
+        self._index_map, self._index_view = self._map_index()
+        self._tail = array("Q")
+        self._open_writers()
+
+    def _roll_segment(self):
+        self.flush()
+        self._segment_file.close()
+        self._segment += 1
+        self._segment_file = open(os.path.join(self.path, _segment_name(self._segment)), "ab", buffering=0)
+        self._segment_size = 0
+
+    def flush(self):
+        # fsync por lotes: una escritura por bloque, un fsync cada sync_every
+        if self._segment_file is not None and self._unsynced:
+            os.fsync(self._segment_file.fileno())
+            os.fsync(self._index_file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if self._segment_file is not None:
+            self.flush()
+            self._segment_file.close()
+            self._index_file.close()
+            self._segment_file = self._index_file = None
+        for buf in self._maps.values():
+            buf.close()
+        self._maps.clear()
+        self._index_view.release()
+        if self._index_map is not None:
+            self._index_map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LedgerView(Sequence):
+    # Vista tipo lista sobre un LedgerStore: los bloques se decodifican solo
+    # al accederlos, de modo que puede reemplazar a la lista `chain`.
+    def __init__(self, store, decode):
+        self.store = store
+        self.decode = decode
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.decode(self.store.get(i)) for i in range(*key.indices(len(self.store)))]
+        return self.decode(self.store.get(key))
+
+    def __iter__(self):
+        for record in self.store.iter_records():
+            yield self.decode(record)
+
+    def append(self, block):
+        self.store.append(block.to_record())
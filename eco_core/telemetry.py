@@ -0,0 +1,237 @@
+# ==========================================
+# TELEMETRÍA DE LLENADO DE CONTENEDORES
+# ==========================================
+# Cada contenedor reporta su nivel de llenado (%) y el peso acumulado cada
+# pocos segundos. Las lecturas crudas van a un búfer circular de tamaño fijo
+# (array, sin un objeto Python por lectura) y se agregan al vuelo en
+# resúmenes de 1 minuto, 1 hora y 1 día, también circulares: la memoria por
+# contenedor es constante sin importar cuánto tiempo lleve reportando. El
+# último estado se guarda aparte para colorear el mapa en O(1).
+import random
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+UMBRAL_LLENO = 90.0       # % a partir del cual el contenedor no acepta depósitos
+UMBRAL_CASI_LLENO = 70.0
+SILENCIO_MAXIMO = 600.0   # segundos sin reportar antes de marcarlo sin señal
+INTERVALO_REPORTE = 5.0   # segundos entre reportes de los contenedores simulados
+
+DISPONIBLE = "disponible"
+CASI_LLENO = "casi lleno"
+LLENO = "lleno"
+SIN_SENAL = "sin señal"
+
+COLOR_ESTADO = {
+    DISPONIBLE: "#2E7D32",
+    CASI_LLENO: "#F9A825",
+    LLENO: "#FF0000",
+    SIN_SENAL: "#9E9E9E",
+}
+
+MINUTO, HORA, DIA = 60, 3600, 86400
+# (resolución en segundos, número de intervalos que se conservan)
+RESUMENES = ((MINUTO, 120), (HORA, 48), (DIA, 90))
+
+ContainerStatus = namedtuple("ContainerStatus", ["container", "fill_pct", "peso_kg", "timestamp", "estado"])
+
+
+def estado_llenado(fill_pct):
+    if fill_pct >= UMBRAL_LLENO:
+        return LLENO
+    if fill_pct >= UMBRAL_CASI_LLENO:
+        return CASI_LLENO
+    return DISPONIBLE
+
+
+class RingBuffer:
+    # Columnas array de capacidad fija que comparten la posición de escritura;
+    # al llenarse se sobrescribe la fila más antigua
+    __slots__ = ("capacity", "fields", "_columns", "_head", "_size")
+
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._columns = [array(typecode, [0]) * capacity for typecode in fields.values()]
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, *values):
+        for column, value in zip(self._columns, values):
+            column[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _slot(self, back):
+        # Posición física de la fila `back` contando desde la más reciente (0)
+        return (self._head - 1 - back) % self.capacity
+
+    def get(self, back=0):
+        slot = self._slot(back)
+        return tuple(column[slot] for column in self._columns)
+
+    def set(self, back, *values):
+        slot = self._slot(back)
+        for column, value in zip(self._columns, values):
+            column[slot] = value
+
+    def columns(self):
+        # Contenido de la más antigua a la más reciente, una lista por campo
+        start = (self._head - self._size) % self.capacity
+        out = {}
+        for name, column in zip(self.fields, self._columns):
+            if start + self._size <= self.capacity:
+                out[name] = column[start:start + self._size].tolist()
+            else:
+                out[name] = column[start:].tolist() + column[:self._head].tolist()
+        return out
+
+
+class Rollup:
+    # Un intervalo por fila: inicio, lecturas, suma y máximo de llenado, peso máximo
+    __slots__ = ("resolution", "ring")
+
+    FIELDS = {"start": "d", "count": "I", "fill_sum": "d", "fill_max": "f", "peso_max": "f"}
+
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.ring = RingBuffer(capacity, self.FIELDS)
+
+    def add(self, timestamp, fill_pct, peso_kg):
+        start = timestamp - timestamp % self.resolution
+        ring = self.ring
+        if not len(ring) or start > ring.get(0)[0]:
+            ring.push(start, 1, fill_pct, fill_pct, peso_kg)
+            return
+        # Lectura del intervalo actual o atrasada: se busca su intervalo hacia
+        # atrás; si cae en un hueco o ya salió del búfer se descarta
+        for back in range(len(ring)):
+            bucket, count, fill_sum, fill_max, peso_max = ring.get(back)
+            if bucket == start:
+                ring.set(back, start, count + 1, fill_sum + fill_pct,
+                         max(fill_max, fill_pct), max(peso_max, peso_kg))
+                return
+            if bucket < start:
+                return
+
+    def columns(self):
+        cols = self.ring.columns()
+        fill_sum = cols.pop("fill_sum")
+        cols["fill_mean"] = [s / n for s, n in zip(fill_sum, cols["count"])]
+        return cols
+
+
+class _Container:
+    __slots__ = ("raw", "rollups", "status")
+
+    def __init__(self, raw_capacity, resumenes):
+        self.raw = RingBuffer(raw_capacity, {"timestamp": "d", "fill_pct": "f", "peso_kg": "f"})
+        self.rollups = {resolution: Rollup(resolution, capacity) for resolution, capacity in resumenes}
+        self.status = None
+
+
+class TelemetryStore:
+    def __init__(self, raw_capacity=240, resumenes=RESUMENES, on_change=None):
+        # on_change(contenedor, estado) se llama cuando una lectura cambia el
+        # estado de llenado (p. ej. para sacar del índice de "disponibles" los llenos)
+        self.raw_capacity = raw_capacity
+        self.resumenes = tuple(resumenes)
+        self.on_change = on_change
+        self._containers = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._containers)
+
+    def containers(self):
+        return list(self._containers)
+
+    def record(self, container, fill_pct, peso_kg, timestamp=None):
+        if not 0.0 <= fill_pct <= 100.0:
+            raise ValueError(f"Nivel de llenado fuera de rango: {fill_pct}")
+        timestamp = time.time() if timestamp is None else timestamp
+        estado = estado_llenado(fill_pct)
+        with self._lock:
+            state = self._containers.get(container)
+            if state is None:
+                state = self._containers[container] = _Container(self.raw_capacity, self.resumenes)
+            anterior = state.status
+            state.raw.push(timestamp, fill_pct, peso_kg)
+            for rollup in state.rollups.values():
+                rollup.add(timestamp, fill_pct, peso_kg)
+            # Una lectura atrasada entra en el historial pero no cambia el estado
+            actual = anterior is None or timestamp >= anterior.timestamp
+            if actual:
+                state.status = ContainerStatus(container, fill_pct, peso_kg, timestamp, estado)
+        if self.on_change and actual and (anterior is None or anterior.estado != estado):
+            self.on_change(container, estado)
+
+    def status(self, container, now=None):
+        # Última lectura del contenedor; sin señal si lleva demasiado sin reportar
+        state = self._containers.get(container)
+        if state is None or state.status is None:
+            return None
+        status = state.status
+        now = time.time() if now is None else now
+        if now - status.timestamp > SILENCIO_MAXIMO:
+            return status._replace(estado=SIN_SENAL)
+        return status
+
+    def color(self, container, now=None, default=None):
+        status = self.status(container, now)
+        return COLOR_ESTADO[status.estado] if status else default
+
+    def history(self, container, resolution=None):
+        # Lecturas crudas (en orden de llegada) si resolution es None; si no,
+        # el resumen de esa resolución (MINUTO, HORA o DIA) en orden cronológico
+        state = self._containers.get(container)
+        if state is None:
+            return {}
+        with self._lock:
+            if resolution is None:
+                return state.raw.columns()
+            return state.rollups[resolution].columns()
+
+
+class SimulatedFillFeed:
+    # Contenedores que se llenan poco a poco y se vacían cuando pasa el camión
+    def __init__(self, containers, capacidad_kg=25.0, seed=None):
+        self.random = random.Random(seed)
+        self.capacidad_kg = capacidad_kg
+        self.fill = {c: self.random.uniform(0, 80) for c in containers}
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def start(self, store, interval=INTERVALO_REPORTE):
+        # Reporta cada `interval` segundos en un hilo propio, no en cada
+        # recarga de la página
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, args=(store, interval),
+                                            name="eco-llenado", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, store, interval):
+        while not self._stopping.is_set():
+            self.tick(store)
+            self._stopping.wait(interval)
+
+    def tick(self, store, timestamp=None):
+        for container, fill in self.fill.items():
+            if fill >= UMBRAL_LLENO and self.random.random() < 0.2:
+                fill = 0.0  # recolección
+            else:
+                fill = min(100.0, fill + self.random.uniform(0, 3))
+            self.fill[container] = fill
+            store.record(container, round(fill, 1), round(fill / 100 * self.capacidad_kg, 2), timestamp)
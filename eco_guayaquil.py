@@ -1,10 +1,21 @@
 import streamlit as st
 import pandas as pd
-import hashlib
-import json
-from datetime import datetime
-import random
-import time
+import os
+import uuid
+
+from eco_core import metrics
+from eco_core.block import verify_inclusion
+from eco_core.dedupe import DedupeIndex
+from eco_core.geo import LIMITES_GUAYAQUIL, PUNTOS_GUAYAQUIL, GridIndex, bbox_for_view, load_points_csv
+from eco_core.ingest import CONFIRMADO, RECHAZADO, IngestionService, SimulatedSensorFeed, reading_to_tx
+from eco_core.leaderboard import calcular_nivel
+from eco_core.ledger import EcoBlockchain
+from eco_core.redemption import AGOTADO, CANJEADO, CATALOGO, CONFLICTO, RedemptionEngine
+from eco_core.store import LedgerStore
+from eco_core.telemetry import COLOR_ESTADO, DISPONIBLE, LLENO, MINUTO, SimulatedFillFeed, TelemetryStore
+
+# Métricas opcionales (ECOG_METRICS_FILE / ECOG_METRICS_PORT)
+inicio_recarga = metrics.clock()
 
 # ==========================================
 # 1. CONFIGURACIÓN DE LA PÁGINA
@@ -17,7 +28,8 @@ st.set_page_config(
 )
 
 # Estilos CSS personalizados para simular la identidad visual del ITSO y la App
-st.markdown("""
+with metrics.timer("ecog_section_seconds", app="eco_guayaquil", section="css"):
+    st.markdown("""
     <style>
     .main {
         background-color: #f5f5f5;
@@ -47,113 +59,142 @@ st.markdown("""
 # ==========================================
 
 # --- CLASE BLOCKCHAIN (Objetivo Específico 2: Trazabilidad y Tokens)  ---
-class EcoBlock:
-    def __init__(self, index, timestamp, data, previous_hash):
-        self.index = index
-        self.timestamp = str(timestamp)
-        self.data = data # Aquí va la transacción (Usuario, Cantidad Botellas, Tokens)
-        self.previous_hash = previous_hash
-        self.hash = self.calculate_hash()
-
-    def calculate_hash(self):
-        block_string = json.dumps(self.__dict__, sort_keys=True).encode()
-        return hashlib.sha256(block_string).hexdigest()
-
-class EcoBlockchain:
-    def __init__(self):
-        self.chain = [self.create_genesis_block()]
-
-    def create_genesis_block(self):
-        return EcoBlock(0, datetime.now(), "Bloque Génesis - EcoGuayaquil", "0")
-
-    def get_latest_block(self):
-        return self.chain[-1]
-
-    def add_block(self, new_block):
-        new_block.previous_hash = self.get_latest_block().hash
-        new_block.hash = new_block.calculate_hash()
-        self.chain.append(new_block)
-        return new_block
-
-    def is_chain_valid(self):
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
-            if current_block.hash != current_block.calculate_hash():
-                return False
-            if current_block.previous_hash != previous_block.hash:
-                return False
-        return True
+# EcoBlockchain vive en eco_core/ledger.py y la comparten todas las sesiones.
 
 # --- MOTOR DE GAMIFICACIÓN (Objetivo Específico 1 y Fundamentación 2.3.1)  ---
-def calcular_nivel(botellas):
-    if botellas < 50:
-        return "🌱 Reciclador Novato", 50
-    elif botellas < 150:
-        return "🌿 Explorador Ambiental", 150
-    elif botellas < 300:
-        return "🌳 Guardián del Guayas", 300
-    else:
-        return "👑 Maestro del Reciclaje", 1000
+# Niveles (calcular_nivel) y clasificación viven en eco_core/leaderboard.py.
+
+USUARIO = "Francisco Cevallos"
 
 # ==========================================
 # 3. GESTIÓN DEL ESTADO (SESSION STATE)
 # ==========================================
-# Esto permite que la app recuerde los datos mientras interactúas
-if 'blockchain' not in st.session_state:
-    st.session_state.blockchain = EcoBlockchain()
-if 'user_stats' not in st.session_state:
-    st.session_state.user_stats = {
-        'botellas': 0,
-        'tokens': 0.0,
-        'co2_ahorrado': 0.0
-    }
-if 'transactions' not in st.session_state:
-    st.session_state.transactions = []
+# El ledger y la ingesta IoT son únicos por proceso y los comparten todas
+# las sesiones (st.cache_resource); cada sesión solo guarda sus tickets.
+# Si ECOG_LEDGER_DIR está definido, la cadena se guarda en disco y sobrevive
+# al reinicio del servidor.
+@st.cache_resource
+def obtener_ledger():
+    ruta_ledger = os.environ.get("ECOG_LEDGER_DIR")
+    store = LedgerStore(os.path.join(ruta_ledger, "eco_guayaquil")) if ruta_ledger else None
+    # Depósitos y canjes se confirman en bloque al momento (commit_batch), sin cola de sellado
+    return EcoBlockchain(store)
+
+@st.cache_resource
+def obtener_ingesta(_blockchain):
+    # Servicio de ingesta IoT: las lecturas se confirman en lotes desde un hilo propio
+    # Las lecturas repetidas de un contenedor que reintenta se rechazan al llegar
+    return IngestionService(
+        lambda lecturas: _blockchain.commit_batch([reading_to_tx(r) for r in lecturas]),
+        dedupe=DedupeIndex(),
+    ).start()
+
+@st.cache_resource
+def obtener_puntos():
+    # Índice espacial de contenedores; ECOG_PUNTOS_CSV permite cargar la red completa
+    ruta_puntos = os.environ.get("ECOG_PUNTOS_CSV")
+    return GridIndex(load_points_csv(ruta_puntos) if ruta_puntos else PUNTOS_GUAYAQUIL)
+
+@st.cache_resource
+def obtener_telemetria(_puntos):
+    # Nivel de llenado de los contenedores; uno lleno deja de ofrecerse como disponible
+    def actualizar_punto(contenedor, estado):
+        if _puntos.get(contenedor) is not None:
+            _puntos.set_available(contenedor, estado != LLENO)
+    return TelemetryStore(on_change=actualizar_punto)
+
+@st.cache_resource
+def obtener_llenado(_puntos, _telemetria):
+    # Sin contenedores reales conectados, su llenado se simula en segundo plano
+    return SimulatedFillFeed([p.id for p in _puntos]).start(_telemetria)
+
+@st.cache_resource
+def obtener_canjes(_blockchain):
+    # Motor de canjes: saldo, inventario y débito en una sola operación atómica
+    premios = ("metrovia", "sweet_coffee", "comisariato")
+    return RedemptionEngine(_blockchain, [p for p in CATALOGO if p.id in premios])
+
+blockchain = obtener_ledger()
+canjes = obtener_canjes(blockchain)
+puntos = obtener_puntos()
+telemetria = obtener_telemetria(puntos)
+obtener_llenado(puntos, telemetria)
+ingesta = obtener_ingesta(blockchain)
+
+# Vista de la cadena a altura fija para toda esta recarga (lectura sin candado)
+vista = blockchain.snapshot()
+
+# Estadísticas del usuario a la altura de la vista: toda la recarga muestra la misma cadena
+user_stats = vista.totals(USUARIO)
+
+if 'tickets' not in st.session_state:
+    st.session_state.sensores = SimulatedSensorFeed(["Sensor_ITSO_01"])
+    st.session_state.tickets = []
 
 # ==========================================
 # 4. INTERFAZ DE USUARIO (FRONTEND)
 # ==========================================
 
 # --- BARRA LATERAL (Navegación) ---
+inicio_barra = metrics.clock()
 with st.sidebar:
     st.image("https://cdn-icons-png.flaticon.com/512/1598/1598196.png", width=100)
     st.title("EcoGuayaquil")
     st.markdown("Plataforma de Transformación Sostenible Urbana ")
     
-    menu = st.radio("Navegación", ["🏠 Inicio", "♻️ Reciclar (IoT)", "📍 Mapa Puntos", "💰 Billetera Token", "🛒 Marketplace"])
+    menu = st.radio("Navegación", ["🏠 Inicio", "♻️ Reciclar (IoT)", "📍 Mapa Puntos", "📊 Impacto", "💰 Billetera Token", "🛒 Marketplace"])
     
     st.divider()
-    st.info(f"**Estado del Sistema:**\nBloques en Cadena: {len(st.session_state.blockchain.chain)}\nValidación: {'✅ Segura' if st.session_state.blockchain.is_chain_valid() else '❌ Error'}")
+    if blockchain.is_chain_valid():
+        estado_validacion = '✅ Segura'
+    else:
+        primero_invalido = blockchain.find_first_invalid()
+        estado_validacion = "❌ Error" if primero_invalido is None else f"❌ Error (bloque {primero_invalido})"
+    st.info(f"**Estado del Sistema:**\nBloques en Cadena: {len(vista)}\nValidación: {estado_validacion}")
 
+metrics.observe_since("ecog_section_seconds", inicio_barra, app="eco_guayaquil", section="sidebar")
+
+inicio_pagina = metrics.clock()
 # --- PÁGINA: INICIO (Dashboard Gamificado) ---
 if menu == "🏠 Inicio":
     st.header("Panel del Ciudadano")
     st.markdown("Bienvenido a la gestión circular de residuos en Guayaquil.")
     
     # Datos actuales
-    nivel_actual, meta_nivel = calcular_nivel(st.session_state.user_stats['botellas'])
-    progreso = (st.session_state.user_stats['botellas'] / meta_nivel)
+    nivel_actual, meta_nivel = calcular_nivel(user_stats.botellas)
+    progreso = min(user_stats.botellas / meta_nivel, 1.0)
     
     # Tarjetas de Métricas (KPIs) 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.markdown(f"<div class='metric-card'><h3>{st.session_state.user_stats['tokens']:.2f}</h3><p>EcoTokens (ECOG)</p></div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-card'><h3>{user_stats.tokens:.2f}</h3><p>EcoTokens (ECOG)</p></div>", unsafe_allow_html=True)
     with col2:
-        st.markdown(f"<div class='metric-card'><h3>{st.session_state.user_stats['botellas']}</h3><p>Botellas PET Recicladas</p></div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-card'><h3>{user_stats.botellas}</h3><p>Botellas PET Recicladas</p></div>", unsafe_allow_html=True)
     with col3:
-        st.markdown(f"<div class='metric-card'><h3>{st.session_state.user_stats['co2_ahorrado']:.2f} kg</h3><p>CO2 Evitado</p></div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-card'><h3>{user_stats.co2:.2f} kg</h3><p>CO2 Evitado</p></div>", unsafe_allow_html=True)
 
     st.markdown("---")
     
     # Sección de Gamificación
     st.subheader(f"🏅 Nivel Actual: {nivel_actual}")
     st.progress(progreso)
-    st.caption(f"Faltan {meta_nivel - st.session_state.user_stats['botellas']} botellas para el siguiente nivel.")
+    st.caption(f"Faltan {meta_nivel - user_stats.botellas} botellas para el siguiente nivel.")
     
-    if st.session_state.user_stats['botellas'] > 0:
+    if user_stats.botellas > 0:
         st.success("¡Gracias por contribuir a la sostenibilidad urbana de Guayaquil!")
 
+    # Clasificación: ciudad completa y semana en curso
+    st.subheader("🏆 Clasificación")
+    col_ciudad, col_semana = st.columns(2)
+    for col, titulo, semana in ((col_ciudad, "Guayaquil", None), (col_semana, "Esta semana", "actual")):
+        with col:
+            st.markdown(f"**{titulo}**")
+            top = blockchain.leaderboard.top(10, semana=semana)
+            st.dataframe(pd.DataFrame(top, columns=["#", "Ciudadano", "Botellas"]), hide_index=True, use_container_width=True)
+            puesto = blockchain.leaderboard.rank(USUARIO, semana=semana)
+            if puesto:
+                st.caption(f"Tu puesto: {puesto[0]} de {puesto[1]} ({puesto[2]} botellas)")
+
 # --- PÁGINA: RECICLAR (Simulación IoT) ---
 elif menu == "♻️ Reciclar (IoT)":
     st.header("Punto de Acopio Inteligente")
@@ -165,50 +206,31 @@ elif menu == "♻️ Reciclar (IoT)":
         st.markdown("### 📲 Escanear QR")
         st.markdown("Acerca tu celular al contenedor para iniciar sesión.")
         
-        # Simulación del proceso físico
+        # Simulación del proceso físico: la lectura del sensor se envía al
+        # servicio de ingesta y se confirma en segundo plano
         if st.button("Iniciar Reciclaje"):
-            with st.spinner('Conectando con sensor IoT...'):
-                time.sleep(1.5) # Simular latencia de red
-                
-                # Datos simulados del sensor (Peso y Cantidad)
-                peso_detectado = round(random.uniform(0.1, 2.0), 2) # kg
-                botellas_detectadas = int(peso_detectado * 20) # Aprox 20 botellas por kg
-                tokens_ganados = botellas_detectadas * 0.5 # 0.5 tokens por botella
-                
-                # Crear transacción
-                transaccion_data = {
-                    "usuario": "Francisco Cevallos",
-                    "accion": "Reciclaje PET",
-                    "cantidad": botellas_detectadas,
-                    "peso_kg": peso_detectado,
-                    "tokens": tokens_ganados,
-                    "ubicacion": "Sensor_ITSO_01"
-                }
-                
-                # 1. Agregar a Blockchain
-                nuevo_bloque = EcoBlock(
-                    len(st.session_state.blockchain.chain), 
-                    datetime.now(), 
-                    transaccion_data, 
-                    ""
-                )
-                bloque_minado = st.session_state.blockchain.add_block(nuevo_bloque)
-                
-                # 2. Actualizar Estado del Usuario
-                st.session_state.user_stats['botellas'] += botellas_detectadas
-                st.session_state.user_stats['tokens'] += tokens_ganados
-                st.session_state.user_stats['co2_ahorrado'] += (peso_detectado * 1.5) # Factor conversión ficticio
-                
-                # 3. Guardar historial local para visualización
-                st.session_state.transactions.append(transaccion_data)
-                
-                st.balloons()
-                st.success(f"¡Reciclaje Exitoso! El sensor detectó **{botellas_detectadas} botellas** ({peso_detectado}kg).")
-                st.info(f"Has ganado **{tokens_ganados} ECOG**.")
-                
-                with st.expander("Ver Detalles Técnicos (IoT & Blockchain)"):
-                    st.json(transaccion_data)
-                    st.write(f"**Hash del Bloque:** {bloque_minado.hash}")
+            lectura = st.session_state.sensores.read(USUARIO, "Sensor_ITSO_01")
+            ticket_id = ingesta.submit(lectura)
+            st.session_state.tickets.append(ticket_id)
+            st.success(f"Lectura recibida del sensor: **{lectura.peso_kg} kg** (ticket #{ticket_id}).")
+
+        # Estado de los últimos depósitos (la interfaz consulta, no espera)
+        if st.session_state.tickets:
+            st.button("🔄 Actualizar estado")
+            for ticket_id in reversed(st.session_state.tickets[-5:]):
+                ticket = ingesta.status(ticket_id)
+                if ticket is None:
+                    continue
+                if ticket.status == CONFIRMADO:
+                    transaccion_data = reading_to_tx(ticket.reading)
+                    st.success(f"#{ticket_id}: **{transaccion_data['cantidad']} botellas** ({ticket.reading.peso_kg}kg), +{transaccion_data['tokens']} ECOG")
+                    with st.expander("Ver Detalles Técnicos (IoT & Blockchain)"):
+                        st.json(transaccion_data)
+                        st.write(f"**Hash del Bloque:** {blockchain.chain[ticket.block].hash}")
+                elif ticket.status == RECHAZADO:
+                    st.error(f"#{ticket_id}: rechazado ({ticket.error})")
+                else:
+                    st.info(f"#{ticket_id}: {ticket.status}...")
 
     with col2:
         st.image("https://img.freepik.com/vector-gratis/contenedor-reciclaje-plastico-estilo-realista_23-2147828062.jpg", width=300, caption="Contenedor Inteligente con Sensores IoT")
@@ -218,40 +240,122 @@ elif menu == "📍 Mapa Puntos":
     st.header("Red de Puntos Limpios en Guayaquil")
     st.markdown("Ubicación de los contenedores inteligentes aliados[cite: 133].")
     
-    # Coordenadas reales aproximadas de Guayaquil
+    # Centro y zoom del mapa: solo se dibujan los contenedores del recuadro visible
+    col_lat, col_lon, col_zoom = st.columns(3)
+    lat_min, lon_min, lat_max, lon_max = LIMITES_GUAYAQUIL
+    lat = col_lat.number_input("Latitud", value=-2.1980, min_value=lat_min, max_value=lat_max, format="%.4f", step=0.005)
+    lon = col_lon.number_input("Longitud", value=-79.8950, min_value=lon_min, max_value=lon_max, format="%.4f", step=0.005)
+    zoom = col_zoom.slider("Zoom", min_value=10, max_value=17, value=12)
+
+
+    visibles = puntos.in_bbox(*bbox_for_view(lat, lon, zoom))
     puntos_acopio = pd.DataFrame({
-        'lat': [-2.1894, -2.1450, -2.1980],
-        'lon': [-79.8891, -79.9000, -79.8950],
-        'nombre': ['Malecón 2000', 'Parque Samanes', 'ITSO (Campus)']
+        'lat': [p.lat for p in visibles],
+        'lon': [p.lon for p in visibles],
+        'nombre': [p.nombre for p in visibles],
+        'color': [telemetria.color(p.id, default=COLOR_ESTADO[DISPONIBLE if p.disponible else LLENO])
+                  for p in visibles],
     })
-    
-    st.map(puntos_acopio, zoom=12)
-    
-    st.table(puntos_acopio)
+    st.map(puntos_acopio, zoom=zoom, color='color')
+    st.caption(f"{len(visibles)} de {len(puntos)} contenedores en pantalla")
+
+    st.subheader("Contenedores disponibles más cercanos")
+    cercanos = puntos.nearest(lat, lon, k=5)
+    st.table(pd.DataFrame({
+        'nombre': [p.nombre for _, p in cercanos],
+        'distancia': [f"{d / 1000:.2f} km" for d, _ in cercanos],
+        'llenado': [f"{telemetria.status(p.id).fill_pct:.0f} %" if telemetria.status(p.id) else "—"
+                    for _, p in cercanos],
+    }))
+
+    st.subheader("Llenado por contenedor")
+    contenedor = st.selectbox("Contenedor", [p.id for p in puntos], format_func=lambda c: puntos.get(c).nombre)
+    historial = telemetria.history(contenedor, MINUTO)
+    if historial:
+        st.line_chart(pd.DataFrame({
+            "Minuto": pd.to_datetime(historial["start"], unit="s"),
+            "Llenado medio (%)": historial["fill_mean"],
+            "Llenado máximo (%)": historial["fill_max"],
+        }).set_index("Minuto"))
+
+# --- PÁGINA: IMPACTO (Analítica de la ciudad) ---
+elif menu == "📊 Impacto":
+    st.header("Impacto Ambiental de la Red")
+    st.markdown("Totales de toda la cadena, calculados sobre columnas y actualizados bloque a bloque.")
+
+    totales = blockchain.analytics.totals(vista.height)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("PET Recolectado", f"{totales['peso_kg']:.1f} kg")
+    col2.metric("Botellas", f"{totales['botellas']:,}")
+    col3.metric("CO2 Evitado", f"{totales['co2']:.1f} kg")
+    col4.metric("ECOG Emitidos (neto)", f"{totales['tokens']:.2f}")
+
+    por_dia = vista.impact("dia")
+    if not por_dia.empty:
+        st.subheader("Evolución diaria")
+        st.bar_chart(por_dia[["botellas"]])
+        st.line_chart(por_dia[["co2"]].cumsum().rename(columns={"co2": "CO2 acumulado (kg)"}))
+
+    col_sensor, col_usuario = st.columns(2)
+    with col_sensor:
+        st.subheader("Por contenedor")
+        st.dataframe(vista.impact("sensor").sort_values("peso_kg", ascending=False), use_container_width=True)
+    with col_usuario:
+        st.subheader("Por ciudadano")
+        st.dataframe(vista.impact("usuario").sort_values("botellas", ascending=False).head(20), use_container_width=True)
 
 # --- PÁGINA: BILLETERA (Ledger Blockchain) ---
 elif menu == "💰 Billetera Token":
     st.header("Billetera EcoToken (Blockchain Ledger)")
     st.markdown("Registro inmutable y transparente de todas tus transacciones.")
     
-    st.metric(label="Saldo Disponible", value=f"{st.session_state.user_stats['tokens']:.2f} ECOG")
+    st.metric(label="Saldo Disponible", value=f"{user_stats.tokens:.2f} ECOG")
     
     st.subheader("Explorador de Bloques")
     
-    if len(st.session_state.blockchain.chain) > 1:
-        # Convertir la cadena de bloques a un formato legible para tabla
-        chain_data = []
-        for block in st.session_state.blockchain.chain:
-            chain_data.append({
+    if len(vista) > 1:
+        explorer = blockchain.explorer
+        fcol1, fcol2 = st.columns(2)
+        with fcol1:
+            filtro_accion = st.selectbox("Acción", ["Todas"] + explorer.actions())
+        with fcol2:
+            tamano_pagina = st.selectbox("Bloques por página", [10, 25, 50, 100])
+        rango_fechas = st.date_input("Rango de fechas", value=())
+
+        # Solo se construyen las filas de la página visible
+        pagina = vista.page(
+            st.session_state.get("pagina_billetera", 1) - 1,
+            tamano_pagina,
+            lambda block: {
                 "Índice": block.index,
                 "Timestamp": block.timestamp,
-                "Datos": str(block.data),
+                "Datos": f"{len(block.data)} transacciones" if isinstance(block.data, list) else str(block.data),
                 "Hash Actual": block.hash[:15] + "...", # Recortado para visualización
                 "Hash Anterior": block.previous_hash[:15] + "..."
-            })
-        
-        df_chain = pd.DataFrame(chain_data)
-        st.dataframe(df_chain, use_container_width=True)
+            },
+            accion=None if filtro_accion == "Todas" else filtro_accion,
+            desde=rango_fechas[0] if len(rango_fechas) > 0 else None,
+            hasta=f"{rango_fechas[1]} 23:59:59.999999" if len(rango_fechas) > 1 else None,
+            newest_first=False,
+        )
+        st.dataframe(pd.DataFrame(pagina.columns), use_container_width=True)
+        st.session_state.pagina_billetera = pagina.page + 1  # ajustada si cambió el filtro
+        st.number_input(f"Página (de {pagina.pages})", min_value=1, max_value=pagina.pages, key="pagina_billetera")
+        st.caption(f"{pagina.total} bloques coinciden con el filtro.")
+
+        with st.expander("🔍 Verificar inclusión de una transacción (Merkle)"):
+            pcol1, pcol2 = st.columns(2)
+            with pcol1:
+                altura = st.number_input("Bloque", min_value=1, max_value=len(vista) - 1)
+            with pcol2:
+                posicion = st.number_input("Transacción", min_value=0,
+                                           max_value=len(vista[altura].transactions()) - 1)
+            prueba = blockchain.get_proof(altura, posicion)
+            st.json(prueba)
+            if verify_inclusion(prueba):
+                st.success("La transacción está incluida en el bloque (raíz de Merkle y hash de la cabecera).")
+            else:
+                st.error("La prueba de inclusión no es válida.")
     else:
         st.info("Aún no hay transacciones. Ve a la sección 'Reciclar' para generar tu primer bloque.")
 
@@ -260,32 +364,43 @@ elif menu == "🛒 Marketplace":
     st.header("Canje de Recompensas")
     st.markdown("Utiliza tus EcoTokens en comercios locales aliados[cite: 133].")
     
-    col1, col2, col3 = st.columns(3)
-    
-    premios = [
-        {"nombre": "Pasaje Metrovía", "costo": 3.0, "icon": "🚌"},
-        {"nombre": "Cupón Sweet & Coffee", "costo": 10.0, "icon": "☕"},
-        {"nombre": "Descuento Mi Comisariato", "costo": 20.0, "icon": "🛒"}
-    ]
-    
-    for i, premio in enumerate(premios):
-        with [col1, col2, col3][i]:
-            st.markdown(f"<div class='metric-card'><h1>{premio['icon']}</h1><h3>{premio['nombre']}</h3><p style='color:green; font-weight:bold;'>{premio['costo']} ECOG</p></div>", unsafe_allow_html=True)
+    premios = list(canjes.catalog.values())
+    columnas = st.columns(len(premios))
+
+    # Versión de los canjes del usuario que se mostró en la recarga anterior:
+    # si otra pestaña canjeó entretanto, el canje se rechaza como conflicto
+    version_vista = st.session_state.get("version_canjes", canjes.version(USUARIO))
+    claves = st.session_state.setdefault("claves_canje", {})
+
+    for columna, premio in zip(columnas, premios):
+        with columna:
+            stock = canjes.stock(premio.id)
+            disponibles = "" if stock is None else f"<small>{stock} disponibles</small>"
+            st.markdown(f"<div class='metric-card'><h1>{premio.icon}</h1><h3>{premio.nombre}</h3><p style='color:green; font-weight:bold;'>{premio.costo} ECOG</p>{disponibles}</div>", unsafe_allow_html=True)
             
-            if st.button(f"Canjear {premio['nombre']}", key=f"btn_{i}"):
-                if st.session_state.user_stats['tokens'] >= premio['costo']:
-                    # Descontar tokens
-                    st.session_state.user_stats['tokens'] -= premio['costo']
-                    # Registrar transacción de gasto en blockchain
-                    tx_gasto = {"usuario": "Francisco", "accion": f"Canje: {premio['nombre']}", "costo": -premio['costo']}
-                    nuevo_bloque = EcoBlock(len(st.session_state.blockchain.chain), datetime.now(), tx_gasto, "")
-                    st.session_state.blockchain.add_block(nuevo_bloque)
-                    
-                    st.success(f"¡Canjeaste {premio['nombre']} exitosamente!")
-                    st.balloons()
+            # Una clave de idempotencia por intento: un doble clic no canjea dos veces
+            clave = claves.setdefault(premio.id, uuid.uuid4().hex)
+            if st.button(f"Canjear {premio.nombre}", key=f"btn_{premio.id}"):
+                resultado = canjes.redeem(USUARIO, premio.id, clave, version_vista)
+                if resultado.estado == CANJEADO:
+                    del claves[premio.id]
+                    st.success(f"¡Canjeaste {premio.nombre} exitosamente!")
+                    if not resultado.repetido:
+                        st.balloons()
+                elif resultado.estado == CONFLICTO:
+                    st.warning("Tu saldo cambió desde otra sesión; revisa y vuelve a intentar.")
+                elif resultado.estado == AGOTADO:
+                    st.error("Premio agotado.")
                 else:
                     st.error("Saldo insuficiente para este premio.")
 
+    st.session_state.version_canjes = canjes.version(USUARIO)
+
+metrics.observe_since("ecog_page_seconds", inicio_pagina, app="eco_guayaquil", page=menu)
+
 # Pie de página
 st.markdown("---")
-st.caption("Desarrollado para el Trabajo de Titulación de Maestría en Herramientas Digitales - ITSO [cite: 1]")
\ No newline at end of file
+st.caption("Desarrollado para el Trabajo de Titulación de Maestría en Herramientas Digitales - ITSO [cite: 1]")
+
+metrics.observe_since("ecog_rerun_seconds", inicio_recarga, app="eco_guayaquil", page=menu)
+metrics.export()
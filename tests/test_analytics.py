@@ -0,0 +1,83 @@
+# ==========================================
+# PRUEBAS: ANALÍTICA DE IMPACTO
+# ==========================================
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from eco_core.analytics import DIMENSIONES, METRICAS, SIN_SENSOR, dia_de
+from eco_core.balances import movement_from_tx
+from eco_core.block import EcoBlock
+from eco_core.ledger import EcoBlockchain
+
+INICIO = datetime(2026, 3, 1, 9, 0)
+
+
+def poblar(ledger, bloques, rnd, desde=0):
+    for i in range(desde, desde + bloques):
+        txs = []
+        for _ in range(rnd.randint(1, 4)):
+            usuario = f"u{rnd.randrange(6)}"
+            if rnd.random() < 0.2:
+                txs.append({"usuario": usuario, "accion": "Canje", "costo": -rnd.choice([5.0, 10.0])})
+            else:
+                peso = rnd.choice([0.0, round(rnd.uniform(0.1, 3.0), 2)])
+                txs.append({"usuario": usuario, "accion": "Reciclaje PET", "cantidad": rnd.randint(1, 30),
+                            "peso_kg": peso, "tokens": 0.5, "ubicacion": rnd.choice(["S1", "S2", None])})
+        ledger.add_block(EcoBlock(None, INICIO + timedelta(hours=7 * i), txs))
+
+
+def ingenuo(ledger, dimension, height=None):
+    # Referencia: suma transacción por transacción
+    sumas = defaultdict(lambda: defaultdict(float))
+    for block in ledger.chain[:height]:
+        for tx in block.transactions():
+            m = movement_from_tx(tx)
+            if not m:
+                continue
+            clave = {"usuario": m.usuario, "sensor": tx.get("ubicacion") or SIN_SENSOR,
+                     "dia": dia_de(block.timestamp)}[dimension]
+            sumas[clave]["transacciones"] += 1
+            for metrica in METRICAS:
+                sumas[clave][metrica] += getattr(m, metrica)
+    return sumas
+
+
+def comparar(resultado, esperado):
+    assert sorted(resultado.claves, key=str) == sorted(esperado, key=str)
+    for i, clave in enumerate(resultado.claves):
+        assert resultado.transacciones[i] == esperado[clave]["transacciones"]
+        for metrica in METRICAS:
+            assert getattr(resultado, metrica)[i] == pytest.approx(esperado[clave][metrica])
+
+
+def test_agregados_como_suma_ingenua():
+    rnd = random.Random(3)
+    ledger = EcoBlockchain()
+    poblar(ledger, 60, rnd)
+    for dimension in DIMENSIONES:
+        comparar(ledger.analytics.aggregate(dimension), ingenuo(ledger, dimension))
+        # A una altura anterior (vista antigua) también, aunque ya se haya acumulado más
+        comparar(ledger.analytics.aggregate(dimension, height=25), ingenuo(ledger, dimension, 25))
+    dias = ledger.analytics.aggregate("dia").claves
+    assert dias == sorted(dias)
+    totales = ledger.analytics.totals()
+    for metrica in METRICAS:
+        assert totales[metrica] == pytest.approx(sum(s[metrica] for s in ingenuo(ledger, "sensor").values()))
+
+
+def test_cache_se_invalida_al_cambiar_la_altura():
+    rnd = random.Random(4)
+    ledger = EcoBlockchain()
+    poblar(ledger, 20, rnd)
+    antes = ledger.analytics.aggregate("usuario")
+    assert ledger.analytics.aggregate("usuario") is antes   # misma altura: desde la caché
+    poblar(ledger, 10, rnd, desde=20)
+    despues = ledger.analytics.aggregate("usuario")
+    assert despues is not antes
+    assert sum(despues.transacciones) > sum(antes.transacciones)
+    comparar(despues, ingenuo(ledger, "usuario"))
+    # La altura antigua sigue dando el resultado de entonces
+    comparar(ledger.analytics.aggregate("usuario", height=21), ingenuo(ledger, "usuario", 21))
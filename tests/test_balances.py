@@ -0,0 +1,63 @@
+# ==========================================
+# PRUEBAS: SALDOS Y VISTAS A ALTURA FIJA
+# ==========================================
+import random
+
+import pytest
+
+from eco_core.ledger import EcoBlockchain
+
+
+def deposito(usuario, botellas, tokens):
+    return {"usuario": usuario, "accion": "Reciclaje PET", "cantidad": botellas, "tokens": tokens}
+
+
+def recorrer(chain):
+    # Saldos por usuario calculados recorriendo la cadena, como referencia
+    saldos = {}
+    for block in chain:
+        for tx in block.transactions():
+            if isinstance(tx, dict) and "usuario" in tx:
+                saldos[tx["usuario"]] = saldos.get(tx["usuario"], 0.0) + tx.get("tokens", 0.0) + tx.get("costo", 0.0)
+    return saldos
+
+
+def test_saldos_coinciden_con_recorrer_la_cadena():
+    rnd = random.Random(3)
+    ledger = EcoBlockchain()
+    for _ in range(200):
+        usuario = f"u{rnd.randrange(10)}"
+        if rnd.random() < 0.5:
+            ledger.commit_batch([deposito(usuario, 2, 1.0), deposito(f"u{rnd.randrange(10)}", 4, 2.0)])
+        else:
+            ledger.add_transaction_block({"usuario": usuario, "accion": "Canje", "costo": -0.5})
+    for usuario, saldo in recorrer(ledger.chain).items():
+        assert ledger.balances.balance(usuario) == pytest.approx(saldo)
+
+
+def test_vista_fija_la_altura():
+    ledger = EcoBlockchain()
+    ledger.commit_batch([deposito("u", 4, 2.0)])
+    vista = ledger.snapshot()
+    ledger.commit_batch([deposito("u", 6, 3.0)])
+
+    assert len(vista) == 2
+    assert vista.balance("u") == 2.0
+    assert vista.totals("u").botellas == 4
+    assert ledger.snapshot().totals("u").botellas == 10
+    assert vista.series("u")[1].tolist() == [2.0]
+
+
+def test_vista_admite_slices_dentro_de_su_altura():
+    ledger = EcoBlockchain()
+    for i in range(5):
+        ledger.add_transaction_block(deposito("u", 1, 1.0))
+    vista = ledger.snapshot()
+    ledger.add_transaction_block(deposito("u", 1, 1.0))
+
+    assert [b.index for b in vista[1:3]] == [1, 2]
+    assert [b.index for b in vista[-2:]] == [4, 5]
+    assert [b.index for b in vista[::2]] == [0, 2, 4]
+    assert vista[-1].index == 5
+    with pytest.raises(IndexError):
+        vista[6]
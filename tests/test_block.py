@@ -0,0 +1,75 @@
+# ==========================================
+# PRUEBAS: CODIFICACIÓN Y HASH DEL BLOQUE
+# ==========================================
+import pytest
+
+from eco_core.block import EcoBlock, hash_raw
+from eco_core.encoding import canonical_json
+
+TS = "2026-01-01 10:00:00"
+PREVIO = "ab" * 32
+TX = {"usuario": "ana", "accion": "Reciclaje PET", "cantidad": 4, "tokens": 2.0}
+LOTE = [{"usuario": "ana", "cantidad": 4}, {"usuario": "luis", "cantidad": 1}]
+
+
+def test_hash_fijado():
+    # Cambiar el formato binario rompe todas las cadenas ya guardadas
+    bloque = EcoBlock(3, TS, TX, PREVIO)
+    assert bloque.encode() == (b"ECOB1\x03\x00\x00\x00\x00\x00\x00\x00\x13\x00@\x00D\x00\x00\x00"
+                               + TS.encode() + PREVIO.encode() + b"\x00" + canonical_json(TX))
+    assert bloque.hash == "650dfb8af79e4b4782f09c7bf1b11a345f32f425e14f4439f6b3513bab65e293"
+    assert EcoBlock(4, TS, LOTE, "cd" * 32).hash == "78a3cf0f7db760386f7a841d54c52be5a905fec9525cb60d2198eb6a64e3716b"
+
+
+def test_hash_no_depende_del_orden_de_las_claves():
+    invertida = dict(reversed(list(TX.items())))
+    assert list(invertida) != list(TX)
+    assert EcoBlock(3, TS, invertida, PREVIO).hash == EcoBlock(3, TS, TX, PREVIO).hash
+    lote_invertido = [dict(reversed(list(tx.items()))) for tx in LOTE]
+    assert EcoBlock(4, TS, lote_invertido, PREVIO).hash == EcoBlock(4, TS, LOTE, PREVIO).hash
+
+
+@pytest.mark.parametrize("cambio", [
+    {"index": 4},
+    {"timestamp": "2026-01-01 10:00:01"},
+    {"previous_hash": "ac" * 32},
+    {"data": dict(TX, usuario="ana2")},
+    {"data": dict(TX, accion="Reciclaje Vidrio")},
+    {"data": dict(TX, cantidad=5)},
+    {"data": dict(TX, tokens=2.5)},
+    {"data": dict(TX, extra=None)},
+])
+def test_hash_cambia_con_cualquier_campo(cambio):
+    campos = dict(index=3, timestamp=TS, data=TX, previous_hash=PREVIO)
+    original = EcoBlock(**campos)
+    assert EcoBlock(**dict(campos, **cambio)).hash != original.hash
+
+
+def test_lote_cambia_con_cualquier_transaccion_u_orden():
+    original = EcoBlock(4, TS, LOTE, PREVIO).hash
+    assert EcoBlock(4, TS, [LOTE[0], dict(LOTE[1], cantidad=2)], PREVIO).hash != original
+    assert EcoBlock(4, TS, LOTE[::-1], PREVIO).hash != original
+    assert EcoBlock(4, TS, LOTE[:1], PREVIO).hash != original
+
+
+def test_cambiar_el_enlace_invalida_el_hash_en_cache():
+    bloque = EcoBlock(3, TS, TX, PREVIO)
+    antes = bloque.hash
+    bloque.previous_hash = "ac" * 32
+    assert bloque.hash != antes
+    # Editar los datos no invalida la caché, pero calculate_hash lo detecta
+    bloque.data = dict(TX, cantidad=40)
+    assert bloque.calculate_hash() != bloque.hash
+
+
+def test_hash_desde_json_guardado():
+    for data in (TX, LOTE, "Bloque Génesis - EcoGuayaquil"):
+        bloque = EcoBlock(7, TS, data, PREVIO)
+        assert hash_raw(7, TS, PREVIO, canonical_json(data)) == bloque.hash
+
+
+def test_slots_rechazan_atributos_sueltos():
+    bloque = EcoBlock(3, TS, TX, PREVIO)
+    assert not hasattr(bloque, "__dict__")
+    with pytest.raises(AttributeError):
+        bloque.nonce = 1
@@ -0,0 +1,97 @@
+# ==========================================
+# PRUEBAS: DETECCIÓN DE LECTURAS DUPLICADAS
+# ==========================================
+from datetime import datetime, timedelta
+
+from eco_core.dedupe import BloomFilter, DedupeIndex
+from eco_core.ingest import DUPLICADA, RECHAZADO, IngestionService, SensorReading
+
+INICIO = datetime(2026, 3, 1, 9, 0)
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def lectura(n, reading_id=None, sensor="Sensor_01"):
+    return SensorReading(sensor, "u", 1.0, timestamp=str(INICIO + timedelta(seconds=n)),
+                         reading_id=f"r{n}" if reading_id is None else reading_id)
+
+
+def test_duplicado_en_la_ventana():
+    index = DedupeIndex(window=60, clock=Reloj())
+    assert index.check_and_add(lectura(1))
+    assert not index.check_and_add(lectura(1))
+    assert index.check_and_add(lectura(2))
+    # Mismo reading_id de otro sensor: es otra lectura
+    assert index.check_and_add(lectura(1, sensor="Sensor_02"))
+    assert index.duplicates == 1
+
+
+def test_lectura_sin_identificador_no_se_deduplica():
+    index = DedupeIndex(clock=Reloj())
+    sin_id = SensorReading("Sensor_01", "u", 1.0, timestamp=str(INICIO))
+    assert index.check_and_add(sin_id) and index.check_and_add(sin_id)
+
+
+def test_al_vencer_la_ventana_pasa_al_filtro():
+    reloj = Reloj()
+    index = DedupeIndex(window=60, clock=reloj)
+    for n in range(100):
+        assert index.check_and_add(lectura(n))
+    reloj.ahora = 61.0
+    assert index.check_and_add(lectura(1000))
+    # Las claves vencidas salieron del conjunto exacto...
+    assert len(index) == 1
+    # ...pero un reintento tardío sigue rechazándose gracias al filtro
+    assert not index.check_and_add(lectura(5))
+    assert not index.check_and_add(lectura(99))
+
+
+def test_lectura_nueva_no_consulta_el_filtro():
+    reloj = Reloj()
+    # Filtro diminuto y saturado: casi todo parece estar en él
+    index = DedupeIndex(window=1, bloom_capacity=4, error_rate=0.5, clock=reloj)
+    for n in range(50):
+        index.check_and_add(lectura(n))
+        reloj.ahora += 2
+    # Una lectura posterior a todo lo archivado nunca es un falso positivo
+    assert all(index.check_and_add(lectura(n)) for n in range(1000, 1100))
+
+
+def test_max_recent_acota_la_memoria():
+    index = DedupeIndex(window=3600, max_recent=10, clock=Reloj())
+    for n in range(100):
+        index.check_and_add(lectura(n))
+    assert len(index) == 10
+    assert not index.check_and_add(lectura(0))
+
+
+def test_forget_permite_reintentar():
+    index = DedupeIndex(clock=Reloj())
+    assert index.check_and_add(lectura(1))
+    index.forget(lectura(1))
+    assert index.check_and_add(lectura(1))
+
+
+def test_filtro_de_bloom_sin_falsos_negativos():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    claves = [f"k{i}" for i in range(1000)]
+    for clave in claves:
+        bloom.add(clave)
+    assert all(clave in bloom for clave in claves)
+    falsos = sum(f"otra{i}" in bloom for i in range(10_000))
+    assert falsos < 300
+    assert bloom.full()
+
+
+def test_ingesta_rechaza_el_duplicado_con_ticket():
+    service = IngestionService(lambda lecturas: None, dedupe=DedupeIndex(clock=Reloj()))
+    primero = service.status(service.submit(lectura(1)))
+    repetido = service.status(service.submit(lectura(1)))
+    assert primero.status != RECHAZADO
+    assert repetido.status == RECHAZADO and repetido.error == DUPLICADA
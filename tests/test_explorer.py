@@ -0,0 +1,26 @@
+# ==========================================
+# PRUEBAS: EXPLORADOR DE BLOQUES
+# ==========================================
+import pytest
+
+from eco_core.explorer import BlockExplorer, block_keys
+from eco_core.ledger import EcoBlockchain
+
+
+def deposito(usuario, botellas, tokens):
+    return {"usuario": usuario, "accion": "Reciclaje PET", "cantidad": botellas, "tokens": tokens}
+
+
+def test_explorador_pagina_y_rechaza_tamano_cero():
+    ledger = EcoBlockchain()
+    for i in range(25):
+        ledger.add_transaction_block(deposito(f"u{i % 2}", 1, 1.0))
+    explorer = BlockExplorer(ledger.chain, block_keys)
+    for block in ledger.chain:
+        explorer.apply(block)
+
+    pagina = explorer.page(0, 10, lambda b: {"i": b.index}, usuario="u0", newest_first=False)
+    assert pagina.total == 13 and pagina.pages == 2
+    assert pagina.columns["i"] == [1, 3, 5, 7, 9, 11, 13, 15, 17, 19]
+    with pytest.raises(ValueError):
+        explorer.page(0, 0, lambda b: {"i": b.index})
@@ -0,0 +1,100 @@
+# ==========================================
+# PRUEBAS: EXPORTACIÓN DEL LEDGER
+# ==========================================
+import csv
+import gzip
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from eco_core.block import EcoBlock
+from eco_core.export import export, export_store
+from eco_core.ledger import EcoBlockchain
+from eco_core.store import LedgerStore
+
+INICIO = datetime(2026, 1, 1, 8, 0)
+
+
+def poblar(ledger):
+    # Un bloque cada 6 horas durante 10 días
+    for i in range(40):
+        txs = [{"usuario": f"u{(i + j) % 4}", "accion": "Reciclaje PET", "cantidad": j + 1, "tokens": 0.5}
+               for j in range(3)]
+        ledger.add_block(EcoBlock(None, INICIO + timedelta(hours=6 * i), txs))
+
+
+def esperado(ledger, usuarios=None, desde=None, hasta=None):
+    # Referencia: recorrido completo de la cadena
+    filas = []
+    for block in ledger.chain:
+        for posicion, tx in enumerate(block.transactions()):
+            if usuarios and not (isinstance(tx, dict) and tx.get("usuario") in usuarios):
+                continue
+            if desde and block.timestamp < desde:
+                continue
+            if hasta and block.timestamp > hasta:
+                continue
+            filas.append((block.index, posicion))
+    return filas
+
+
+@pytest.fixture
+def ledger():
+    ledger = EcoBlockchain()
+    poblar(ledger)
+    return ledger
+
+
+def test_jsonl_con_filtros(ledger, tmp_path):
+    path = str(tmp_path / "salida.jsonl.gz")
+    n = export(ledger.snapshot(), path, usuarios=["u1"], desde="2026-01-03", hasta=date(2026, 1, 5), chunk=7)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        filas = [json.loads(line) for line in f]
+    assert n == len(filas)
+    assert [(f["altura"], f["posicion"]) for f in filas] == esperado(
+        ledger, {"u1"}, "2026-01-03", "2026-01-05 23:59:59.999999")
+    assert {f["usuario"] for f in filas} == {"u1"}
+
+
+def test_limites_iso_con_t(ledger, tmp_path):
+    # "2026-01-03T14:00" es la hora 14:00, no todo el 3 de enero
+    path = str(tmp_path / "salida.jsonl")
+    export(ledger.snapshot(), path, desde="2026-01-03T14:00", hasta="2026-01-05T08:00")
+    with open(path, encoding="utf-8") as f:
+        filas = [json.loads(line) for line in f]
+    assert [(f["altura"], f["posicion"]) for f in filas] == esperado(
+        ledger, None, "2026-01-03 14:00:00", "2026-01-05 08:00:00")
+    assert str(ledger.chain[filas[0]["altura"]].timestamp) == "2026-01-03 14:00:00"
+    assert str(ledger.chain[filas[-1]["altura"]].timestamp) == "2026-01-05 08:00:00"
+    with pytest.raises(ValueError):
+        export(ledger.snapshot(), path, desde="3 de enero")
+
+
+def test_csv_completo(ledger, tmp_path):
+    path = str(tmp_path / "salida.csv")
+    n = export(ledger.chain, path)
+    with open(path, newline="", encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))
+    assert n == len(filas) == len(esperado(ledger))
+    # El génesis no es una transacción en formato diccionario: va a "dato"
+    assert filas[0]["dato"] == ledger.chain[0].data
+
+
+def test_parquet_desde_almacen(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    persistente = EcoBlockchain(LedgerStore(tmp_path / "ledger"))
+    poblar(persistente)
+    total = len(esperado(persistente))
+    persistente.store.close()
+
+    path = str(tmp_path / "salida.parquet")
+    assert export_store(str(tmp_path / "ledger"), path, chunk=16) == total
+    tabla = pq.read_table(path)
+    assert tabla.num_rows == total
+    assert tabla.column("cantidad").to_pylist()[1:4] == [1.0, 2.0, 3.0]
+
+
+def test_formato_desconocido(ledger, tmp_path):
+    with pytest.raises(ValueError):
+        export(ledger.chain, str(tmp_path / "salida.xml"))
@@ -0,0 +1,42 @@
+# ==========================================
+# PRUEBAS: ÍNDICE ESPACIAL DE PUNTOS DE RECOLECCIÓN
+# ==========================================
+import math
+import random
+
+from eco_core.geo import CollectionPoint, GridIndex, distance_m
+
+
+def test_vecinos_mas_cercanos_como_fuerza_bruta():
+    rnd = random.Random(1)
+    puntos = [CollectionPoint(f"p{i}", "n", -2.2 + rnd.uniform(-0.1, 0.1), -79.9 + rnd.uniform(-0.1, 0.1), True)
+              for i in range(500)]
+    grid = GridIndex(puntos)
+    # Quitar puntos (también del borde) no debe romper la búsqueda por anillos
+    extremo = min(puntos, key=lambda p: p.lat)
+    for p in puntos[::3] + [extremo]:
+        if grid.get(p.id) is not None:
+            grid.remove(p.id)
+    quedan = [p for p in puntos if grid.get(p.id) is not None]
+    for _ in range(100):
+        lat, lon = -2.2 + rnd.uniform(-0.3, 0.3), -79.9 + rnd.uniform(-0.3, 0.3)
+        esperados = sorted(quedan, key=lambda p: distance_m(lat, lon, p.lat, p.lon))[:5]
+        obtenidos = [p for _, p in grid.nearest(lat, lon, k=5)]
+        assert [p.id for p in obtenidos] == [p.id for p in esperados]
+    assert math.isclose(grid.nearest(-2.2, -79.9, k=1)[0][0],
+                        min(distance_m(-2.2, -79.9, p.lat, p.lon) for p in quedan))
+
+
+def test_consulta_lejana_o_con_pocos_disponibles():
+    rnd = random.Random(2)
+    puntos = [CollectionPoint(f"p{i}", "n", -2.2 + rnd.uniform(-0.1, 0.1), -79.9 + rnd.uniform(-0.1, 0.1), i < 3)
+              for i in range(300)]
+    grid = GridIndex(puntos)
+    for lat, lon in [(0.0, -75.0), (10.0, -70.0), (-2.2, -79.9)]:
+        # Lejos de la ciudad y con solo 3 puntos disponibles para k=5: no se
+        # recorren los miles de anillos vacíos hasta el borde del recuadro
+        obtenidos = [p.id for _, p in grid.nearest(lat, lon, k=5)]
+        esperados = sorted(puntos[:3], key=lambda p: distance_m(lat, lon, p.lat, p.lon))
+        assert obtenidos == [p.id for p in esperados]
+        cercanos = sorted(puntos, key=lambda p: distance_m(lat, lon, p.lat, p.lon))[:5]
+        assert [p.id for _, p in grid.nearest(lat, lon, k=5, solo_disponibles=False)] == [p.id for p in cercanos]
@@ -0,0 +1,36 @@
+# ==========================================
+# PRUEBAS: IMPORTACIÓN PEREZOSA DEL NÚCLEO
+# ==========================================
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Un intérprete limpio: en el proceso de pytest otras pruebas ya cargaron numpy
+SCRIPT = """
+import sys
+
+pesados = lambda: sorted(m for m in ("numpy", "pandas") if m in sys.modules)
+import eco_core
+from eco_core import EcoBlockchain, LedgerStore
+
+ledger = EcoBlockchain(LedgerStore(sys.argv[1]))
+ledger.commit_batch([{"usuario": "u", "accion": "Reciclaje PET", "cantidad": 3, "tokens": 1.5}])
+ledger.snapshot().balance("u")
+ledger.leaderboard.top(5)
+ledger.save_snapshot()
+print("antes", pesados())
+ledger.snapshot().impact("usuario")
+print("despues", pesados())
+"""
+
+
+def test_ledger_no_carga_numpy_ni_pandas(tmp_path):
+    resultado = subprocess.run([sys.executable, "-c", SCRIPT, str(tmp_path)], cwd=RAIZ,
+                               capture_output=True, text=True, timeout=120)
+    assert resultado.returncode == 0, resultado.stderr
+    antes, despues = resultado.stdout.splitlines()
+    assert antes == "antes []"
+    # Recién la analítica trae numpy
+    assert "numpy" in despues
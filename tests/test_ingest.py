@@ -0,0 +1,97 @@
+# ==========================================
+# PRUEBAS: INGESTA IoT POR LOTES
+# ==========================================
+import time
+
+import pytest
+
+from eco_core.ingest import CONFIRMADO, RECHAZADO, IngestionService, SensorReading, reading_to_tx
+from eco_core.ledger import EcoBlockchain
+from eco_core.store import LedgerStore
+
+
+def esperar(service, ticket_ids, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        tickets = [service.status(t) for t in ticket_ids]
+        if all(t.status != "en cola" for t in tickets):
+            return tickets
+        time.sleep(0.01)
+    raise AssertionError("la ingesta no confirmó a tiempo")
+
+
+@pytest.fixture
+def ingesta():
+    ledger = EcoBlockchain()
+    service = IngestionService(lambda lecturas: ledger.commit_batch([reading_to_tx(r) for r in lecturas]),
+                               batch_wait=0.01).start()
+    yield ledger, service
+    service.stop(timeout=5.0)
+
+
+def lectura(peso=1.0, usuario="u", cantidad=None):
+    return SensorReading("Sensor_01", usuario, peso, cantidad, "2026-01-01 10:00:00")
+
+
+def test_lecturas_se_confirman_en_lotes(ingesta):
+    ledger, service = ingesta
+    tickets = esperar(service, [service.submit(lectura()) for _ in range(20)])
+    assert {t.status for t in tickets} == {CONFIRMADO}
+    assert len(ledger.chain) < 21
+    assert sum(len(b.transactions()) for b in ledger.chain[1:]) == 20
+    assert ledger.balances.balance("u") == pytest.approx(20 * 10.0)
+
+
+@pytest.mark.parametrize("mala", [
+    lectura(peso=None),
+    lectura(peso="1.5"),
+    lectura(peso=0.0),
+    lectura(peso=500.0),
+    lectura(cantidad=-1),
+    lectura(cantidad=3.0),
+    lectura(cantidad=True),
+    lectura(usuario=""),
+])
+def test_lectura_invalida_se_rechaza_con_ticket(ingesta, mala):
+    ledger, service = ingesta
+    ticket = service.status(service.submit(mala))
+    assert ticket.status == RECHAZADO
+    assert ticket.error
+    assert len(ledger.chain) == 1
+
+
+def test_lote_fallido_rechaza_sus_tickets():
+    def commit(lecturas):
+        raise RuntimeError("disco lleno")
+
+    service = IngestionService(commit, batch_wait=0.01).start()
+    try:
+        ticket, = esperar(service, [service.submit(lectura())])
+        assert ticket.status == RECHAZADO
+        assert "disco lleno" in ticket.error
+    finally:
+        service.stop(timeout=5.0)
+
+
+@pytest.mark.parametrize("persistente", [False, True])
+def test_indice_que_falla_no_deja_el_bloque_a_medias(tmp_path, monkeypatch, persistente):
+    ledger = EcoBlockchain(LedgerStore(tmp_path) if persistente else None)
+    ledger.commit_batch([reading_to_tx(lectura())])
+    altura, saldo = ledger.height, ledger.balances.balance("u")
+
+    def falla(block):
+        raise TypeError("puntaje no entero")
+
+    # Los saldos ya acreditaron el bloque cuando la clasificación falla
+    monkeypatch.setattr(ledger.leaderboard, "apply", falla)
+    with pytest.raises(TypeError):
+        ledger.commit_batch([reading_to_tx(lectura())])
+    assert len(ledger.chain) == ledger.height == altura
+    assert ledger.balances.balance("u") == saldo
+    assert ledger.is_chain_valid(full=True)
+
+    # El reintento se acredita una sola vez
+    ledger.commit_batch([reading_to_tx(lectura())])
+    assert ledger.height == altura + 1
+    assert ledger.balances.balance("u") == pytest.approx(saldo + 10.0)
+    assert ledger.leaderboard.rank("u")[2] == 2 * reading_to_tx(lectura())["cantidad"]
@@ -0,0 +1,64 @@
+# ==========================================
+# PRUEBAS: NIVELES Y CLASIFICACIÓN
+# ==========================================
+import random
+import sys
+
+from eco_core.block import EcoBlock
+from eco_core.leaderboard import NIVELES, Ranking, calcular_nivel
+from eco_core.ledger import EcoBlockchain
+
+
+def test_nivel_con_conteo_negativo():
+    assert calcular_nivel(-5) == calcular_nivel(0)
+    nombre, meta = calcular_nivel(-5)
+    assert nombre == NIVELES[0][1] and meta > 0
+
+
+def test_clasificacion_con_empates_y_semanas():
+    ledger = EcoBlockchain()
+    ledger.commit_batch([{"usuario": "ana", "cantidad": 10, "ubicacion": "S1"},
+                         {"usuario": "beto", "cantidad": 10, "ubicacion": "S2"},
+                         {"usuario": "caro", "cantidad": 4, "ubicacion": "S1"},
+                         {"usuario": "ana", "cantidad": 0}])
+    board = ledger.leaderboard
+    assert board.top(3) == [(1, "ana", 10), (1, "beto", 10), (3, "caro", 4)]
+    assert board.rank("caro") == (3, 3, 4)
+    assert board.rank("nadie") is None
+    assert board.top(5, sensor="S1") == [(1, "ana", 10), (2, "caro", 4)]
+    assert [u for _, u, _ in board.top(5, semana="actual")] == ["ana", "beto", "caro"]
+
+
+def test_posiciones_como_fuerza_bruta():
+    rnd = random.Random(5)
+    ranking = Ranking()
+    puntajes = {}
+    for _ in range(2000):
+        usuario = f"u{rnd.randrange(50)}"
+        botellas = rnd.choice([rnd.randint(-20, 40), rnd.randint(1, 10 ** 12)])
+        ranking.add(usuario, botellas)
+        puntajes[usuario] = puntajes.get(usuario, 0) + botellas
+        if puntajes[usuario] <= 0:
+            del puntajes[usuario]
+    for usuario, score in puntajes.items():
+        assert ranking.rank(usuario) == 1 + sum(s > score for s in puntajes.values())
+    # Reconstruido desde un snapshot da las mismas posiciones
+    copia = Ranking.from_scores(ranking.scores())
+    assert [copia.rank(u) for u in puntajes] == [ranking.rank(u) for u in puntajes]
+
+
+def test_puntaje_enorme_o_no_entero():
+    ledger = EcoBlockchain()
+    ledger.commit_batch([{"usuario": "ana", "cantidad": sys.maxsize},
+                         {"usuario": "beto", "cantidad": 3},
+                         {"usuario": "dani", "cantidad": True}])
+    board = ledger.leaderboard
+    # La memoria no crece con el puntaje
+    assert len(board.city._sorted) == 2
+    assert board.top(5) == [(1, "ana", sys.maxsize), (2, "beto", 3)]
+    assert board.rank("beto") == (2, 2, 3)
+    assert board.rank("dani") is None
+    # Un bloque ya sellado con cantidades no enteras se aplica sin puntuarlas
+    board.apply(EcoBlock(2, "2026-01-01 10:00:00", [{"usuario": "caro", "cantidad": "7"},
+                                                    {"usuario": "caro", "cantidad": 2.5}]))
+    assert board.rank("caro") is None and board.height == 3
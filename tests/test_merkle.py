@@ -0,0 +1,76 @@
+# ==========================================
+# PRUEBAS: PRUEBAS DE INCLUSIÓN (MERKLE)
+# ==========================================
+import time
+
+import pytest
+
+from eco_core.block import verify_inclusion
+from eco_core.ledger import EcoBlockchain
+from eco_core.merkle import SealPolicy, merkle_proof, merkle_root, verify_proof
+
+
+def txs(n):
+    return [{"usuario": f"u{i}", "accion": "Reciclaje PET", "tokens": 0.5 * i} for i in range(n)]
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 7, 32, 33])
+def test_prueba_de_cada_posicion(n):
+    lote = txs(n)
+    root = merkle_root(lote)
+    for posicion, tx in enumerate(lote):
+        assert verify_proof(tx, merkle_proof(lote, posicion), root)
+
+
+def test_prueba_no_sirve_para_otra_transaccion():
+    lote = txs(8)
+    assert not verify_proof(lote[4], merkle_proof(lote, 3), merkle_root(lote))
+
+
+def test_listas_distintas_raices_distintas():
+    # Un nodo sin pareja sube sin duplicarse: [a, b, c] no equivale a [a, b, c, c]
+    lote = txs(3)
+    assert merkle_root(lote) != merkle_root(lote + lote[-1:])
+
+
+def test_inclusion_en_bloque_por_lotes_y_simple():
+    ledger = EcoBlockchain()
+    ledger.commit_batch(txs(5))
+    ledger.add_transaction_block({"usuario": "x", "tokens": 2.0})
+    assert all(verify_inclusion(ledger.get_proof(1, i)) for i in range(5))
+    assert verify_inclusion(ledger.get_proof(2, 0))
+    assert verify_inclusion(ledger.get_proof(0, 0))
+
+
+def test_transaccion_alterada_no_verifica():
+    ledger = EcoBlockchain()
+    ledger.commit_batch(txs(5))
+    ledger.chain[1].data[3]["tokens"] = 99.0
+    # La raíz recalculada ya no reconstruye el hash guardado del bloque
+    assert not verify_inclusion(ledger.get_proof(1, 3))
+    assert not verify_inclusion(ledger.get_proof(1, 0))
+    assert not ledger.is_chain_valid(full=True)
+
+
+def test_prueba_alterada_no_verifica():
+    ledger = EcoBlockchain()
+    ledger.commit_batch(txs(4))
+    prueba = ledger.get_proof(1, 2)
+    prueba["tx"] = dict(prueba["tx"], tokens=100.0)
+    assert not verify_inclusion(prueba)
+    prueba = ledger.get_proof(1, 2)
+    prueba["merkle_root"] = merkle_root(txs(3))
+    assert not verify_inclusion(prueba)
+
+
+def test_el_hilo_de_sellado_cierra_el_lote_por_antiguedad():
+    ledger = EcoBlockchain(seal_policy=SealPolicy(max_txs=100, max_age=0.05)).start_sealer(interval=0.01)
+    try:
+        ledger.add_transaction({"usuario": "u", "tokens": 1.0})
+        limite = time.monotonic() + 2.0
+        while ledger.pending and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert ledger.pending == []
+        assert len(ledger.chain) == 2
+    finally:
+        ledger.stop_sealer()
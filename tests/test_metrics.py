@@ -0,0 +1,78 @@
+# ==========================================
+# PRUEBAS: MÉTRICAS DE TIEMPO
+# ==========================================
+import pytest
+
+from eco_core import metrics
+
+
+@pytest.fixture
+def activadas(monkeypatch):
+    registro = metrics.Registry()
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    monkeypatch.setattr(metrics, "REGISTRY", registro)
+    return registro
+
+
+def test_desactivadas_no_envuelven_ni_registran(monkeypatch):
+    registro = metrics.Registry()
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    monkeypatch.setattr(metrics, "REGISTRY", registro)
+
+    def consulta(x):
+        return x * 2
+
+    assert metrics.timed("consulta")(consulta) is consulta
+    assert metrics.timer("ecog_section_seconds", section="css") is metrics._NULL
+    with metrics.timer("ecog_section_seconds", section="css"):
+        pass
+    metrics.observe("ecog_page_seconds", 0.1, page="inicio")
+    metrics.observe_since("ecog_page_seconds", metrics.clock(), page="inicio")
+    assert registro.render() == "\n"
+
+
+def test_cubetas_suma_y_conteo():
+    histograma = metrics.Histogram("ecog_prueba_seconds", "Prueba.", buckets=(0.01, 0.1, 1.0))
+    for valor in (0.005, 0.01, 0.05, 0.5, 3.0):
+        histograma.observe(valor, page="mapa")
+    histograma.observe(0.02, page="inicio")
+    lineas = histograma.render()
+    assert lineas[:2] == ["# HELP ecog_prueba_seconds Prueba.", "# TYPE ecog_prueba_seconds histogram"]
+    # Series ordenadas por etiquetas; las cubetas son acumuladas y `le` es inclusivo
+    assert lineas[2:] == [
+        'ecog_prueba_seconds_bucket{page="inicio",le="0.01"} 0',
+        'ecog_prueba_seconds_bucket{page="inicio",le="0.1"} 1',
+        'ecog_prueba_seconds_bucket{page="inicio",le="1.0"} 1',
+        'ecog_prueba_seconds_bucket{page="inicio",le="+Inf"} 1',
+        'ecog_prueba_seconds_sum{page="inicio"} 0.02',
+        'ecog_prueba_seconds_count{page="inicio"} 1',
+        'ecog_prueba_seconds_bucket{page="mapa",le="0.01"} 2',
+        'ecog_prueba_seconds_bucket{page="mapa",le="0.1"} 3',
+        'ecog_prueba_seconds_bucket{page="mapa",le="1.0"} 4',
+        'ecog_prueba_seconds_bucket{page="mapa",le="+Inf"} 5',
+        f'ecog_prueba_seconds_sum{{page="mapa"}} {0.005 + 0.01 + 0.05 + 0.5 + 3.0!r}',
+        'ecog_prueba_seconds_count{page="mapa"} 5',
+    ]
+
+
+def test_activadas_registran_llamadas_y_exportan(activadas, tmp_path):
+    @metrics.timed("consulta")
+    def consulta(x):
+        if x < 0:
+            raise ValueError(x)
+        return x * 2
+
+    assert consulta(2) == 4
+    with pytest.raises(ValueError):
+        consulta(-1)
+    with metrics.timer("ecog_section_seconds", section='css "base"'):
+        pass
+    path = tmp_path / "ecog.prom"
+    metrics.write_textfile(str(path))
+    texto = path.read_text(encoding="utf-8")
+    assert texto == activadas.render()
+    # También las llamadas que lanzan excepción cuentan
+    assert 'ecog_backend_seconds_count{call="consulta"} 2\n' in texto
+    assert 'ecog_backend_seconds_bucket{call="consulta",le="+Inf"} 2\n' in texto
+    assert "# HELP ecog_backend_seconds Duración de las llamadas al backend del ledger.\n" in texto
+    assert 'ecog_section_seconds_count{section="css \\"base\\""} 1\n' in texto
@@ -0,0 +1,89 @@
+# ==========================================
+# PRUEBAS: CANJES (IDEMPOTENCIA, INVENTARIO, VERSIONES)
+# ==========================================
+import threading
+
+from eco_core.ledger import EcoBlockchain
+from eco_core.redemption import (AGOTADO, CANJEADO, CONFLICTO, DESCONOCIDO, SALDO_INSUFICIENTE, Prize,
+                                 RedemptionEngine)
+from eco_core.store import LedgerStore
+
+CATALOGO = (Prize("pasaje", "Pasaje", 3.0), Prize("cafe", "Café", 2.0, stock=2))
+
+
+def ledger_con_saldo(store=None, tokens=10.0):
+    ledger = EcoBlockchain(store)
+    ledger.commit_batch([{"usuario": "u", "accion": "Reciclaje PET", "cantidad": 20, "tokens": tokens}])
+    return ledger
+
+
+def test_canje_debita_en_un_bloque_ya_anadido():
+    ledger = ledger_con_saldo()
+    engine = RedemptionEngine(ledger, CATALOGO)
+    resultado = engine.redeem("u", "pasaje", "k1")
+    assert resultado.estado == CANJEADO and not resultado.repetido
+    # El bloque existe al confirmar el canje: nada queda en espera
+    assert ledger.pending == []
+    assert ledger.chain[-1].transactions()[-1]["clave"] == "k1"
+    assert ledger.balances.balance("u") == 7.0
+
+
+def test_misma_clave_no_debita_dos_veces():
+    ledger = ledger_con_saldo()
+    engine = RedemptionEngine(ledger, CATALOGO)
+    engine.redeem("u", "pasaje", "k1")
+    repetido = engine.redeem("u", "pasaje", "k1")
+    assert repetido.estado == CANJEADO and repetido.repetido
+    assert ledger.balances.balance("u") == 7.0
+
+
+def test_idempotencia_tras_reiniciar(tmp_path):
+    ledger = ledger_con_saldo(LedgerStore(tmp_path))
+    assert RedemptionEngine(ledger, CATALOGO).redeem("u", "cafe", "k1").estado == CANJEADO
+    ledger.store.close()
+
+    # Nuevo proceso: el canje sigue en la cadena y la clave se reconoce
+    ledger = EcoBlockchain(LedgerStore(tmp_path))
+    engine = RedemptionEngine(ledger, CATALOGO)
+    assert ledger.balances.balance("u") == 8.0
+    assert engine.stock("cafe") == 1
+    assert engine.version("u") == 1
+    repetido = engine.redeem("u", "cafe", "k1")
+    assert repetido.estado == CANJEADO and repetido.repetido
+    assert ledger.balances.balance("u") == 8.0
+    ledger.store.close()
+
+
+def test_rechazos():
+    ledger = ledger_con_saldo(tokens=4.0)
+    engine = RedemptionEngine(ledger, CATALOGO)
+    assert engine.redeem("u", "nada", "k0").estado == DESCONOCIDO
+    assert engine.redeem("u", "pasaje", "k1", expected_version=3).estado == CONFLICTO
+    assert engine.redeem("u", "cafe", "k2").estado == CANJEADO
+    assert engine.redeem("u", "pasaje", "k3").estado == SALDO_INSUFICIENTE
+    # Un rechazo no se recuerda: con más saldo, la misma clave se acepta
+    ledger.commit_batch([{"usuario": "u", "tokens": 10.0}])
+    assert engine.redeem("u", "pasaje", "k3").estado == CANJEADO
+    assert engine.redeem("u", "cafe", "k4").estado == CANJEADO
+    assert engine.redeem("u", "cafe", "k5").estado == AGOTADO
+
+
+def test_canjes_concurrentes_no_gastan_de_mas():
+    ledger = ledger_con_saldo(tokens=30.0)
+    engine = RedemptionEngine(ledger, CATALOGO)
+    resultados = []
+
+    def cliente(n):
+        for i in range(20):
+            resultados.append(engine.redeem("u", "pasaje", f"{n}-{i}"))
+
+    hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    aceptados = [r for r in resultados if r.estado == CANJEADO]
+    assert len(aceptados) == 10
+    assert ledger.balances.balance("u") == 0.0
+    canjes = [tx for b in ledger.chain for tx in b.transactions() if isinstance(tx, dict) and "premio" in tx]
+    assert len(canjes) == 10
@@ -0,0 +1,140 @@
+# ==========================================
+# PRUEBAS: REPLICACIÓN LÍDER / SEGUIDOR Y TRUNCADO DEL LEDGER
+# ==========================================
+import json
+import urllib.request
+
+import pytest
+
+from eco_core.block import EcoBlock
+from eco_core.ledger import EcoBlockchain
+from eco_core.replication import Follower, serve
+from eco_core.store import LedgerStore
+
+
+def depositar(ledger, bloques, usuario="u", tokens=1.0):
+    for _ in range(bloques):
+        ledger.commit_batch([{"usuario": usuario, "accion": "Reciclaje PET", "cantidad": 2, "tokens": tokens}])
+
+
+def copia(ledger, hasta):
+    # Réplica en memoria con los mismos bloques [0, hasta) que `ledger`
+    replica = EcoBlockchain()
+    replica.truncate(0)
+    for i in range(hasta):
+        block = ledger.chain[i]
+        clon = EcoBlock(block.index, block.timestamp, block.data, block.previous_hash)
+        clon.hash = block.hash
+        replica.append_block(clon)
+    return replica
+
+
+@pytest.fixture
+def lider(tmp_path):
+    ledger = EcoBlockchain(LedgerStore(tmp_path / "lider"))
+    depositar(ledger, 150)
+    server = serve(ledger, port=0)
+    yield ledger, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    ledger.store.close()
+
+
+def mismos_bloques(a, b):
+    return len(a.chain) == len(b.chain) and all(a.chain[i].hash == b.chain[i].hash for i in range(len(a.chain)))
+
+
+def test_seguidor_vacio_se_pone_al_dia(lider, tmp_path):
+    ledger, url = lider
+    replica = EcoBlockchain(LedgerStore(tmp_path / "replica"))
+    replica.truncate(0)   # sin génesis propio: todo viene del líder
+    follower = Follower(replica, url, batch=40)
+    assert follower.sync() == 151
+    assert mismos_bloques(replica, ledger)
+    assert replica.balances.balance("u") == ledger.balances.balance("u")
+    assert follower.sync() == 0
+    replica.store.close()
+
+
+def test_seguidor_descarta_su_rama_tras_un_fork(lider):
+    ledger, url = lider
+    replica = copia(ledger, 120)
+    # La réplica siguió escribiendo por su cuenta: su rama diverge en 120
+    depositar(replica, 40, usuario="intruso", tokens=50.0)
+    follower = Follower(replica, url)
+    follower.sync()
+    assert follower.truncated == 40
+    assert mismos_bloques(replica, ledger)
+    assert replica.balances.balance("intruso") == 0.0
+    assert replica.is_chain_valid(full=True)
+
+    # El líder avanza: la siguiente ronda solo trae la cola
+    depositar(ledger, 10)
+    assert follower.sync() == 10
+    assert mismos_bloques(replica, ledger)
+
+
+def test_ancestro_comun_exacto(lider):
+    ledger, url = lider
+    for divergencia in (1, 63, 64, 65, 149):
+        replica = copia(ledger, divergencia)
+        depositar(replica, 30, usuario="otro")
+        assert Follower(replica, url).common_ancestor(len(ledger.chain)) == divergencia
+
+
+def test_bloque_alterado_se_rechaza(lider):
+    ledger, url = lider
+    replica = copia(ledger, 10)
+
+    class Manipulado(Follower):
+        def _open(self, path):
+            response = super()._open(path)
+            if not path.startswith("/bloques"):
+                return response
+            lineas = [json.loads(line) for line in response]
+            lineas[0]["data"][0]["tokens"] = 1000.0
+            return _Respuesta(lineas)
+
+    with pytest.raises(ValueError):
+        Manipulado(replica, url).sync()
+    assert len(replica.chain) == 10
+
+
+def test_saldo_servido_por_la_replica(lider):
+    ledger, url = lider
+    with urllib.request.urlopen(f"{url}/saldo?usuario=u") as response:
+        saldo = json.loads(response.read())
+    assert saldo["altura"] == len(ledger.chain)
+    assert saldo["tokens"] == ledger.balances.balance("u")
+
+
+def test_truncar_almacen_y_volver_a_crecer(tmp_path):
+    ledger = EcoBlockchain(LedgerStore(tmp_path, segment_bytes=2048))
+    depositar(ledger, 60)
+    ledger.truncate(25)
+    assert len(ledger.chain) == ledger.height == 25
+    assert ledger.balances.balance("u") == 24.0
+    depositar(ledger, 5, usuario="v")
+    ledger.store.close()
+
+    reabierto = EcoBlockchain(LedgerStore(tmp_path, segment_bytes=2048))
+    assert len(reabierto.chain) == 30
+    assert reabierto.balances.balance("v") == 5.0
+    assert reabierto.is_chain_valid(full=True)
+    with pytest.raises(ValueError):
+        reabierto.truncate(31)
+    reabierto.store.close()
+
+
+class _Respuesta:
+    def __init__(self, lineas):
+        self.lineas = [json.dumps(line).encode() + b"\n" for line in lineas]
+
+    def __iter__(self):
+        return iter(self.lineas)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,121 @@
+# ==========================================
+# PRUEBAS: SNAPSHOTS DE LOS ÍNDICES Y SEGMENTOS ARCHIVADOS
+# ==========================================
+import os
+import random
+
+import pytest
+
+from eco_core import snapshots
+from eco_core.ledger import EcoBlockchain
+from eco_core.redemption import RedemptionEngine
+from eco_core.store import LedgerStore
+
+
+def poblar(ledger, bloques, seed=0):
+    rnd = random.Random(seed)
+    for i in range(bloques):
+        usuario = f"u{rnd.randrange(20)}"
+        ledger.commit_batch([{"usuario": usuario, "accion": "Reciclaje PET", "cantidad": rnd.randint(1, 9),
+                              "peso_kg": 0.5, "tokens": 1.0, "ubicacion": f"S{rnd.randrange(3)}"}])
+        if i % 25 == 0:
+            RedemptionEngine(ledger).redeem(usuario, "metrovia", f"clave-{i}")
+
+
+def resumen(ledger):
+    usuarios = [f"u{i}" for i in range(20)]
+    return (
+        ledger.height,
+        [ledger.balances.get(u) for u in usuarios],
+        [ledger.snapshot().series(u)[1].tolist() for u in usuarios],
+        ledger.leaderboard.top(20),
+        ledger.explorer.page(0, 50, lambda b: {"i": b.index}, usuario="u3").columns,
+        dict(ledger.redemptions.claves),
+    )
+
+
+def test_arranque_desde_snapshot_igual_a_reprocesar(tmp_path):
+    ledger = EcoBlockchain(LedgerStore(tmp_path))
+    poblar(ledger, 120)
+    altura_snapshot = ledger.save_snapshot()
+    poblar(ledger, 30, seed=1)   # cola posterior al snapshot
+    esperado = resumen(ledger)
+    ledger.store.close()
+
+    desde_snapshot = EcoBlockchain(LedgerStore(tmp_path))
+    assert desde_snapshot._snapshot_height == altura_snapshot < len(desde_snapshot.chain)
+    assert resumen(desde_snapshot) == esperado
+    assert desde_snapshot.is_chain_valid(full=True)
+    desde_snapshot.store.close()
+
+    for name in os.listdir(snapshots.snapshot_dir(tmp_path)):
+        os.remove(os.path.join(snapshots.snapshot_dir(tmp_path), name))
+    reprocesado = EcoBlockchain(LedgerStore(tmp_path))
+    assert reprocesado._snapshot_height == 0
+    assert resumen(reprocesado) == esperado
+    reprocesado.store.close()
+
+
+def test_analitica_restaurada(tmp_path):
+    pytest.importorskip("numpy")
+    ledger = EcoBlockchain(LedgerStore(tmp_path))
+    poblar(ledger, 60)
+    ledger.save_snapshot()
+    esperado = ledger.analytics.totals()
+    ledger.store.close()
+
+    reabierto = EcoBlockchain(LedgerStore(tmp_path))
+    assert reabierto.analytics.totals() == pytest.approx(esperado)
+    reabierto.store.close()
+
+
+def test_snapshot_danado_se_ignora(tmp_path):
+    ledger = EcoBlockchain(LedgerStore(tmp_path))
+    poblar(ledger, 40)
+    ledger.save_snapshot()
+    esperado = resumen(ledger)
+    ledger.store.close()
+
+    directorio = snapshots.snapshot_dir(tmp_path)
+    path = os.path.join(directorio, os.listdir(directorio)[0])
+    with open(path, "r+b") as f:
+        f.seek(-10, os.SEEK_END)
+        f.write(b"\x00" * 6)
+
+    reabierto = EcoBlockchain(LedgerStore(tmp_path))
+    assert reabierto._snapshot_height == 0
+    assert resumen(reabierto) == esperado
+    reabierto.store.close()
+
+
+def test_snapshot_de_otra_historia_se_ignora(tmp_path):
+    ledger = EcoBlockchain(LedgerStore(tmp_path))
+    poblar(ledger, 40)
+    ledger.save_snapshot()
+    # La cadena se recorta por debajo del snapshot y crece distinta
+    ledger.truncate(20)
+    poblar(ledger, 30, seed=7)
+    esperado = resumen(ledger)
+    ledger.store.close()
+
+    reabierto = EcoBlockchain(LedgerStore(tmp_path))
+    assert reabierto._snapshot_height <= 20
+    assert resumen(reabierto) == esperado
+    reabierto.store.close()
+
+
+def test_segmentos_archivados_se_siguen_leyendo(tmp_path):
+    ledger = EcoBlockchain(LedgerStore(tmp_path, segment_bytes=4096))
+    poblar(ledger, 200)
+    hashes = [b.hash for b in ledger.chain]
+    ledger.save_snapshot(archive=True)
+    assert any(name.endswith(".log.z") for name in os.listdir(tmp_path))
+    assert [b.hash for b in ledger.chain] == hashes
+    assert ledger.is_chain_valid(full=True)
+    ledger.store.close()
+
+    reabierto = EcoBlockchain(LedgerStore(tmp_path, segment_bytes=4096))
+    assert reabierto.chain[3].hash == hashes[3]
+    poblar(reabierto, 5, seed=2)
+    assert reabierto.is_chain_valid(full=True)
+    reabierto.store.close()
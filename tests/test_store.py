@@ -0,0 +1,93 @@
+# ==========================================
+# PRUEBAS: ALMACÉN PERSISTENTE DEL LEDGER
+# ==========================================
+import os
+
+import pytest
+
+from eco_core.block import EcoBlock
+from eco_core.ledger import EcoBlockchain
+from eco_core.store import INDEX_FILE, LedgerStore, _segment_name
+
+
+def deposito(usuario, tokens):
+    return {"usuario": usuario, "accion": "Reciclaje PET", "cantidad": 2, "tokens": tokens}
+
+
+def ledger_con(path, bloques, **store_kwargs):
+    store = LedgerStore(path, **store_kwargs)
+    ledger = EcoBlockchain(store)
+    for i in range(bloques):
+        ledger.add_transaction_block(deposito(f"u{i % 3}", 1.0))
+    return ledger
+
+
+def test_reabrir_conserva_cadena_y_saldos(tmp_path):
+    ledger = ledger_con(tmp_path, 20)
+    hashes = [b.hash for b in ledger.chain]
+    ledger.store.close()
+
+    reabierto = EcoBlockchain(LedgerStore(tmp_path))
+    assert [b.hash for b in reabierto.chain] == hashes
+    assert reabierto.balances.balance("u0") == 7.0
+    assert reabierto.is_chain_valid(full=True)
+    reabierto.store.close()
+
+
+def test_recupera_registro_a_medio_escribir(tmp_path):
+    ledger = ledger_con(tmp_path, 10)
+    ledger.store.close()
+    # Caída durante una escritura: bytes sueltos al final del segmento y
+    # una entrada de índice incompleta
+    with open(os.path.join(tmp_path, _segment_name(0)), "ab") as f:
+        f.write(b"\x99" * 37)
+    with open(os.path.join(tmp_path, INDEX_FILE), "ab") as f:
+        f.write(b"\x01\x02\x03")
+
+    store = LedgerStore(tmp_path)
+    assert len(store) == 11
+    reabierto = EcoBlockchain(store)
+    assert reabierto.is_chain_valid(full=True)
+    reabierto.add_transaction_block(deposito("u9", 5.0))
+    store.close()
+
+    store = LedgerStore(tmp_path)
+    assert len(store) == 12
+    assert EcoBlockchain(store).balances.balance("u9") == 5.0
+    store.close()
+
+
+def test_recupera_indice_que_apunta_a_registro_corrupto(tmp_path):
+    ledger = ledger_con(tmp_path, 5)
+    ledger.store.close()
+    # El último registro quedó con el CRC roto: se descarta ese bloque
+    path = os.path.join(tmp_path, _segment_name(0))
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        ultimo = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([ultimo[0] ^ 0xFF]))
+
+    store = LedgerStore(tmp_path)
+    assert len(store) == 5
+    assert EcoBlockchain(store).is_chain_valid(full=True)
+    store.close()
+
+
+def test_segmentos_rotan_y_se_leen(tmp_path):
+    ledger = ledger_con(tmp_path, 50, segment_bytes=2048)
+    hashes = [b.hash for b in ledger.chain]
+    ledger.store.close()
+
+    assert len([n for n in os.listdir(tmp_path) if n.startswith("seg-")]) > 1
+    store = LedgerStore(tmp_path)
+    assert [r.hash for r in store.iter_records()] == hashes
+    store.close()
+
+
+def test_solo_lectura_no_escribe(tmp_path):
+    ledger_con(tmp_path, 3).store.close()
+    with LedgerStore(tmp_path, readonly=True) as store:
+        assert len(store) == 4
+        with pytest.raises(PermissionError):
+            store.append(EcoBlock(4, "t", {}, "x").to_record())
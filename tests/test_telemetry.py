@@ -0,0 +1,76 @@
+# ==========================================
+# PRUEBAS: TELEMETRÍA DE LLENADO
+# ==========================================
+import time
+
+import pytest
+
+from eco_core.telemetry import (DIA, HORA, LLENO, MINUTO, SIN_SENAL, SimulatedFillFeed, TelemetryStore,
+                                estado_llenado)
+
+T0 = 1_700_000_000.0 - 1_700_000_000.0 % DIA   # inicio de un día
+
+
+def test_bufer_crudo_acotado_tras_desbordarse():
+    store = TelemetryStore(raw_capacity=16, resumenes=((MINUTO, 4),))
+    for i in range(100):
+        store.record("c1", i % 100, 1.0, T0 + 30 * i)
+    crudo = store.history("c1")
+    # Solo las 16 lecturas más recientes, de la más antigua a la más reciente
+    assert crudo["timestamp"] == [T0 + 30 * i for i in range(84, 100)]
+    assert crudo["fill_pct"] == [float(i) for i in range(84, 100)]
+    # El resumen por minuto tampoco pasa de su capacidad
+    assert len(store.history("c1", MINUTO)["start"]) == 4
+
+
+def test_resumenes_promedian_y_toman_maximos():
+    store = TelemetryStore()
+    lecturas = [(T0 + 10, 20.0, 5.0), (T0 + 20, 40.0, 9.0), (T0 + 50, 30.0, 7.0),   # minuto 0
+                (T0 + 70, 80.0, 2.0),                                             # minuto 1
+                (T0 + 3600, 10.0, 1.0)]                                           # hora 1
+    for timestamp, fill, peso in lecturas:
+        store.record("c1", fill, peso, timestamp)
+    # Lectura atrasada: entra en su minuto aunque ya haya llegado una posterior
+    store.record("c1", 60.0, 3.0, T0 + 5)
+
+    minutos = store.history("c1", MINUTO)
+    assert minutos["start"] == [T0, T0 + 60, T0 + 3600]
+    assert minutos["count"] == [4, 1, 1]
+    assert minutos["fill_mean"] == pytest.approx([37.5, 80.0, 10.0])
+    assert minutos["fill_max"] == [60.0, 80.0, 10.0]
+    assert minutos["peso_max"] == [9.0, 2.0, 1.0]
+
+    horas = store.history("c1", HORA)
+    assert horas["count"] == [5, 1]
+    assert horas["fill_mean"] == pytest.approx([46.0, 10.0])
+    assert store.history("c1", DIA)["fill_max"] == [80.0]
+
+
+def test_ultimo_estado_por_contenedor():
+    cambios = []
+    store = TelemetryStore(on_change=lambda c, estado: cambios.append((c, estado)))
+    store.record("c1", 50.0, 1.0, T0)
+    store.record("c2", 95.0, 20.0, T0)
+    store.record("c1", 92.0, 18.0, T0 + 10)
+    store.record("c1", 10.0, 1.0, T0 + 5)   # atrasada: no cambia el estado
+    assert store.status("c1", now=T0 + 20).fill_pct == 92.0
+    assert store.status("c1", now=T0 + 20).estado == LLENO
+    assert store.status("c2", now=T0 + 20).peso_kg == 20.0
+    assert store.status("c3") is None
+    assert store.status("c2", now=T0 + 3600).estado == SIN_SENAL
+    assert cambios == [("c1", estado_llenado(50.0)), ("c2", LLENO), ("c1", LLENO)]
+    with pytest.raises(ValueError):
+        store.record("c1", 120.0, 1.0)
+
+
+def test_llenado_simulado_reporta_en_segundo_plano():
+    store = TelemetryStore()
+    feed = SimulatedFillFeed(["c1", "c2"], seed=1).start(store, interval=0.01)
+    try:
+        limite = time.monotonic() + 5.0
+        while len(store.history("c1").get("timestamp", [])) < 3:
+            assert time.monotonic() < limite, "el simulador no reportó a tiempo"
+            time.sleep(0.01)
+    finally:
+        feed.stop(timeout=5.0)
+    assert set(store.containers()) == {"c1", "c2"}
@@ -0,0 +1,57 @@
+# ==========================================
+# PRUEBAS: VALIDACIÓN INCREMENTAL Y BÚSQUEDA DEL BLOQUE ALTERADO
+# ==========================================
+from eco_core.ledger import EcoBlockchain
+
+
+def cadena(bloques=300):
+    ledger = EcoBlockchain()
+    for i in range(bloques):
+        ledger.add_transaction_block({"usuario": "u", "accion": "Reciclaje PET", "tokens": 1.0, "n": i})
+    assert ledger.is_chain_valid()
+    return ledger
+
+
+def reencadenar(ledger, desde):
+    # Reescritura completa de la historia a partir de `desde`
+    for i in range(desde, len(ledger.chain)):
+        block = ledger.chain[i]
+        if i > desde:
+            block.previous_hash = ledger.chain[i - 1].hash
+        block.hash = block.calculate_hash()
+
+
+def test_bloque_nuevo_valido():
+    ledger = cadena(10)
+    ledger.add_transaction_block({"usuario": "u", "tokens": 1.0})
+    assert ledger.is_chain_valid()
+    assert ledger.find_first_invalid() is None
+
+
+def test_edicion_en_sitio_de_bloque_ya_verificado():
+    ledger = cadena()
+    ledger.chain[10].data["tokens"] = 50.0
+    assert not ledger.is_chain_valid()
+    assert ledger.find_first_invalid() == 10
+
+
+def test_edicion_en_sitio_la_detecta_el_barrido():
+    ledger = cadena(1000)
+    ledger.chain[900].data["tokens"] = 50.0
+    vueltas = len(ledger.chain) // ledger.REVERIFY_BATCH + 1
+    assert not all(ledger.is_chain_valid() for _ in range(vueltas))
+    assert ledger.find_first_invalid() == 900
+
+
+def test_reescritura_senala_el_primer_bloque_y_no_el_checkpoint():
+    ledger = cadena()
+    ledger.chain[100].data["tokens"] = 50.0
+    reencadenar(ledger, 100)
+    assert not ledger.is_chain_valid(full=True)
+    assert ledger.find_first_invalid() == 100
+
+
+def test_edicion_despues_del_ultimo_checkpoint():
+    ledger = cadena()
+    ledger.chain[290].data["tokens"] = 50.0
+    assert ledger.find_first_invalid() == 290